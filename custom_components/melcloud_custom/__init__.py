@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import timedelta
+from datetime import datetime, timedelta
+from functools import partial
 import logging
-from typing import Any, Dict, Optional
+from time import monotonic
+from typing import Any, Optional
 
-from aiohttp import ClientConnectionError, ClientResponseError
-from pymelcloud import Device, get_devices
+from aiohttp import ClientConnectionError, ClientResponseError, ClientSession
+from pymelcloud import DEVICE_TYPE_ATA, DEVICE_TYPE_ATW, Device
 from pymelcloud.atw_device import Zone
 from pymelcloud.client import BASE_URL
+from pymelcloud.device import EFFECTIVE_FLAGS, HAS_PENDING_COMMAND, PROPERTY_POWER
 import voluptuous as vol
 
 from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
@@ -22,22 +25,74 @@ from homeassistant.const import (
     CONF_USERNAME,
     Platform,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from homeassistant.helpers.typing import ConfigType
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import UpdateFailed
 
+from .api import (
+    DEVICE_CLASSES,
+    create_dedicated_session,
+    create_device,
+    get_devices,
+)
+from .breaker import CircuitOpenError
+from .capabilities import (
+    AtaCapabilities,
+    AtwCapabilities,
+    capability_signature,
+    device_capabilities,
+)
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_CONF_REFRESH_INTERVAL,
+    CONF_DEDICATED_SESSION,
     CONF_LANGUAGE,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_REQUEST_RATE,
+    CONF_SET_DEBOUNCE,
+    CONF_SETUP_CONCURRENCY,
+    CONF_SETUP_TIMEOUT,
+    DEFAULT_CONF_REFRESH_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_REQUEST_RATE,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SET_DEBOUNCE,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_SETUP_TIMEOUT,
     DOMAIN,
+    ENERGY_UPDATE_INTERVAL,
+    FAST_FOLLOW_DELAYS,
     LANGUAGES,
+    MEL_ACCOUNT,
     MEL_DEVICES,
+    MEL_PLATFORMS,
+    REQUEST_BURST,
+    SIGNAL_NEW_DEVICES,
     Language,
 )
+from .coordinator import (
+    AdaptivePolling,
+    MelCloudAccountCoordinator,
+    MelCloudDeviceCoordinator,
+    activity_signature,
+    device_conf_hash,
+    meter_values,
+    refresh_hints,
+    state_from_device_conf,
+)
+from .data import AtaDeviceData, AtwDeviceData, device_data
+from .scheduler import RequestPriority, RequestScheduler
+from .services import async_setup_services
+from .snapshot import DeviceSnapshot
 
 ATTR_STATE_DEVICE_ID = "device_id"
 ATTR_STATE_DEVICE_SERIAL = "device_serial"
@@ -68,6 +123,11 @@ PLATFORMS = [
     Platform.SENSOR,
     Platform.WATER_HEATER,
 ]
+# Platforms creating entities for each device type, account sensors aside
+DEVICE_TYPE_PLATFORMS = {
+    DEVICE_TYPE_ATA: {Platform.BINARY_SENSOR, Platform.CLIMATE, Platform.SENSOR},
+    DEVICE_TYPE_ATW: {Platform.CLIMATE, Platform.SENSOR, Platform.WATER_HEATER},
+}
 
 MELCLOUD_SCHEMA = vol.Schema(
     {
@@ -95,12 +155,16 @@ class MelCloudAuthentication:
         self._language = language
         self._context_key = None
 
-    async def login(self, hass: HomeAssistant):
+    async def login(
+        self, hass: HomeAssistant, scheduler: RequestScheduler | None = None
+    ):
         """Try login MelCloud with provided credential."""
         _LOGGER.debug("Login ...")
 
         self._context_key = None
         session = async_get_clientsession(hass)
+        if scheduler is not None:
+            await scheduler.acquire(RequestPriority.LOGIN)
 
         body = {
             "Email": self._email,
@@ -138,6 +202,7 @@ class MelCloudAuthentication:
 async def _async_migrate_config(
     hass: HomeAssistant,
     entry: ConfigEntry,
+    scheduler: RequestScheduler,
 ) -> None:
     """Migrate config entry storing token instead of username and password"""
     conf = entry.data
@@ -156,7 +221,7 @@ async def _async_migrate_config(
     mcauth = MelCloudAuthentication(username, conf[CONF_PASSWORD], mc_language)
     try:
         async with asyncio.timeout(10):
-            if not await mcauth.login(hass):
+            if not await mcauth.login(hass, scheduler):
                 raise ConfigEntryNotReady()
     except Exception as ex:
         raise ConfigEntryNotReady() from ex
@@ -168,6 +233,7 @@ async def _async_migrate_config(
 
 async def async_setup(hass: HomeAssistant, config: ConfigType):
     """Establish connection with MELCloud."""
+    async_setup_services(hass)
     if DOMAIN not in config:
         return True
 
@@ -186,107 +252,810 @@ async def async_setup(hass: HomeAssistant, config: ConfigType):
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Establish connection with MELCloud."""
     conf = entry.data
+    request_rate = entry.options.get(CONF_REQUEST_RATE, DEFAULT_REQUEST_RATE)
+    scheduler = RequestScheduler(request_rate / 60, REQUEST_BURST)
+    entry.async_on_unload(scheduler.shutdown)
+    _LOGGER.info("Configured request budget: %s requests per minute", request_rate)
+
     if CONF_TOKEN not in conf:
-        token = await _async_migrate_config(hass, entry)
+        token = await _async_migrate_config(hass, entry, scheduler)
     else:
         token = conf[CONF_TOKEN]
 
     update_seconds = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
     _LOGGER.info("Configured scan interval: %s seconds", update_seconds)
-
-    mel_devices = await mel_devices_setup(
-        hass, token, timedelta(seconds=update_seconds)
+    adaptive_polling = _get_adaptive_polling(entry)
+
+    device_snapshot = DeviceSnapshot(hass, entry.entry_id)
+    snapshot = await device_snapshot.async_load(_get_conf_refresh_interval(entry))
+
+    session = None
+    if entry.options.get(CONF_DEDICATED_SESSION, False):
+        _LOGGER.info("Using a dedicated HTTP session")
+        session = create_dedicated_session()
+        entry.async_on_unload(session.close)
+
+    mel_account = await mel_devices_setup(
+        hass,
+        token,
+        scheduler,
+        timedelta(seconds=update_seconds),
+        setup_concurrency=entry.options.get(
+            CONF_SETUP_CONCURRENCY, DEFAULT_SETUP_CONCURRENCY
+        ),
+        setup_timeout=entry.options.get(CONF_SETUP_TIMEOUT, DEFAULT_SETUP_TIMEOUT),
+        set_debounce=_get_set_debounce(entry),
+        conf_refresh_interval=_get_conf_refresh_interval(entry),
+        snapshot=snapshot,
+        session=session,
     )
 
+    mel_account.adaptive_polling = adaptive_polling
+    mel_account.client.token_manager.request_login = partial(
+        entry.async_start_reauth, hass
+    )
     entry.async_on_unload(entry.add_update_listener(update_listener))
+    entry.async_on_unload(mel_account.async_add_listener(mel_account.async_fan_out))
+    entry.async_on_unload(
+        mel_account.async_add_listener(
+            partial(_async_sync_device_list, hass, entry, mel_account)
+        )
+    )
+    entry.async_on_unload(
+        mel_account.client.breaker.async_add_listener(mel_account.async_breaker_changed)
+    )
+    entry.async_on_unload(
+        mel_account.async_add_listener(lambda: device_snapshot.async_save(mel_account))
+    )
     hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {}).update(
         {
-            MEL_DEVICES: mel_devices,
+            MEL_ACCOUNT: mel_account,
+            MEL_DEVICES: mel_account.mel_devices,
+            MEL_PLATFORMS: set(),
         }
     )
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await async_forward_device_platforms(hass, entry)
+    _async_remove_orphan_devices(hass, entry, mel_account)
+
+    if snapshot:
+        _LOGGER.debug("Devices restored from snapshot, reconciling with MELCloud")
+        entry.async_create_background_task(
+            hass,
+            _async_reconcile_snapshot(mel_account),
+            f"{DOMAIN} reconcile snapshot",
+        )
+    else:
+        device_snapshot.async_save(mel_account)
+
+    if "recorder" in hass.config.components:
+        await _async_setup_energy_reports(hass, entry, mel_account)
+        _async_setup_temperature_history(hass, entry, mel_account)
 
     return True
 
 
+async def _async_reconcile_snapshot(mel_account: MelCloudAccountCoordinator) -> None:
+    """Poll MELCloud after setting up the devices from the snapshot.
+
+    The saved state is not shown any longer if the poll fails: the devices
+    become unavailable until a poll succeeds.
+    """
+    await mel_account.async_refresh()
+    if not mel_account.last_update_success:
+        mel_account.async_set_devices_error(
+            mel_account.last_exception or UpdateFailed("MELCloud poll failed")
+        )
+
+
+async def _async_setup_energy_reports(
+    hass: HomeAssistant, entry: ConfigEntry, mel_account: MelCloudAccountCoordinator
+) -> None:
+    """Import the energy reports now and then every hour.
+
+    The energy module depends on the recorder, it is only imported when the
+    recorder is loaded.
+    """
+    from . import energy  # pylint: disable=import-outside-toplevel
+
+    energy_reports = energy.EnergyReports(hass, entry.entry_id, mel_account)
+    await energy_reports.async_load()
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            energy_reports.async_update,
+            ENERGY_UPDATE_INTERVAL,
+            name=f"{DOMAIN} energy reports",
+        )
+    )
+    entry.async_create_background_task(
+        hass, energy_reports.async_update(), f"{DOMAIN} energy reports"
+    )
+
+
+@callback
+def _async_setup_temperature_history(
+    hass: HomeAssistant, entry: ConfigEntry, mel_account: MelCloudAccountCoordinator
+) -> None:
+    """Fill the temperature statistics missed during a downtime, in background.
+
+    The history module depends on the recorder, it is only imported when the
+    recorder is loaded.
+    """
+    from . import history  # pylint: disable=import-outside-toplevel
+
+    temperature_history = history.TemperatureHistory(hass, mel_account)
+    entry.async_create_background_task(
+        hass, temperature_history.async_backfill(), f"{DOMAIN} temperature history"
+    )
+
+
+async def async_forward_device_platforms(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> None:
+    """Set up the platforms needed by the device types found, if not yet done.
+
+    Platforms without entities to create are not set up, nor imported.
+    """
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    forwarded: set[Platform] = entry_data[MEL_PLATFORMS]
+    needed = {Platform.SENSOR}
+    for device_type, mel_devices in entry_data[MEL_DEVICES].items():
+        if mel_devices:
+            needed |= DEVICE_TYPE_PLATFORMS[device_type]
+    platforms = [platform for platform in PLATFORMS if platform in needed - forwarded]
+    if not platforms:
+        return
+    forwarded.update(platforms)
+
+    async def _async_timed_setup(platform: Platform) -> str:
+        start = monotonic()
+        await hass.config_entries.async_forward_entry_setup(entry, platform)
+        return f"{platform} {monotonic() - start:.3f}s"
+
+    start = monotonic()
+    timings = await asyncio.gather(*map(_async_timed_setup, platforms))
+    _LOGGER.debug(
+        "Platforms set up in %.3fs: %s", monotonic() - start, ", ".join(timings)
+    )
+
+
+@callback
+def _async_sync_device_list(
+    hass: HomeAssistant, entry: ConfigEntry, mel_account: MelCloudAccountCoordinator
+) -> None:
+    """Add and remove devices following the device list of the last poll.
+
+    New devices are created from their device list entry and get their
+    entities right away, their full state is fetched in background. Removed
+    devices are dropped with their entities and registry devices. Other
+    devices are left untouched.
+    """
+    if not mel_account.last_update_success:
+        return
+    mel_devices = mel_account.mel_devices
+    known = {
+        mel_device.device_id
+        for mel_devices_type in mel_devices.values()
+        for mel_device in mel_devices_type
+    }
+    # Entries of unsupported device types are never created
+    listed = {
+        device_id
+        for device_id, device_conf in mel_account.data.items()
+        if device_conf.get("Device", {}).get("DeviceType") in DEVICE_CLASSES
+    }
+    if known == listed:
+        return
+
+    removed = known - listed
+    for mel_devices_type in mel_devices.values():
+        for mel_device in [d for d in mel_devices_type if d.device_id in removed]:
+            _LOGGER.info("Device %s removed from MELCloud", mel_device.name)
+            mel_device.async_shutdown()
+            mel_devices_type.remove(mel_device)
+            if mel_account.adaptive_polling:
+                mel_account.adaptive_polling.intervals.pop(mel_device.device_id, None)
+
+    set_debounce = _get_set_debounce(entry)
+    new_devices: dict[str, list[MelCloudDevice]] = {
+        device_type: [] for device_type in mel_devices
+    }
+    for device_id in sorted(listed - known):
+        device_conf = mel_account.data[device_id]
+        if not (
+            created := create_device(device_conf, mel_account.client, set_debounce)
+        ):
+            continue
+        device_type, device = created
+        _LOGGER.info("Device %s added to MELCloud", device.name)
+        mel_device = MelCloudDevice(device, set_debounce)
+        mel_device.async_create_coordinator(hass)
+        mel_device.async_apply_device_conf(device_conf)
+        mel_devices[device_type].append(mel_device)
+        new_devices[device_type].append(mel_device)
+        mel_device.async_track_refresh(
+            entry.async_create_background_task(
+                hass,
+                mel_device.coordinator.async_refresh(),
+                f"{DOMAIN} bootstrap {mel_device.name}",
+            )
+        )
+
+    mel_account.async_spread_refresh_phases()
+    if any(new_devices.values()):
+        async_dispatcher_send(
+            hass, SIGNAL_NEW_DEVICES.format(entry.entry_id), new_devices
+        )
+        entry.async_create_background_task(
+            hass,
+            async_forward_device_platforms(hass, entry),
+            f"{DOMAIN} forward platforms",
+        )
+    if removed:
+        _async_remove_orphan_devices(hass, entry, mel_account)
+
+
+@callback
+def _async_remove_orphan_devices(
+    hass: HomeAssistant, entry: ConfigEntry, mel_account: MelCloudAccountCoordinator
+) -> None:
+    """Remove the registry devices of an entry no longer found in MELCloud."""
+    identifiers = {(DOMAIN, entry.entry_id)}
+    for mel_devices_type in mel_account.mel_devices.values():
+        for mel_device in mel_devices_type:
+            identifiers |= mel_device.device_info["identifiers"]
+    for mel_device in mel_account.mel_devices.get(DEVICE_TYPE_ATW, []):
+        for zone in mel_device.device.zones:
+            identifiers |= mel_device.zone_device_info(zone)["identifiers"]
+
+    device_registry = dr.async_get(hass)
+    for device_entry in dr.async_entries_for_config_entry(
+        device_registry, entry.entry_id
+    ):
+        if device_entry.identifiers.isdisjoint(identifiers):
+            _LOGGER.debug("Removing orphaned device %s", device_entry.name)
+            device_registry.async_update_device(
+                device_entry.id, remove_config_entry_id=entry.entry_id
+            )
+
+
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(
-        config_entry, PLATFORMS
+        config_entry, hass.data[DOMAIN][config_entry.entry_id][MEL_PLATFORMS]
     ):
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        mel_devices = hass.data[DOMAIN].pop(config_entry.entry_id)[MEL_DEVICES]
+        for mel_devices_type in mel_devices.values():
+            for mel_device in mel_devices_type:
+                mel_device.async_shutdown()
         if not hass.data[DOMAIN]:
             hass.data.pop(DOMAIN)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the data stored for a config entry."""
+    await DeviceSnapshot(hass, entry.entry_id).async_remove()
+    if "recorder" in hass.config.components:
+        from . import energy  # pylint: disable=import-outside-toplevel
+
+        await energy.async_remove_energy_cursor(hass, entry.entry_id)
+
+
+def _get_set_debounce(entry: ConfigEntry) -> timedelta:
+    """Return the time writes are collected before sending them."""
+    return timedelta(seconds=entry.options.get(CONF_SET_DEBOUNCE, DEFAULT_SET_DEBOUNCE))
+
+
+def _get_conf_refresh_interval(entry: ConfigEntry) -> timedelta:
+    """Return the maximum time between two full refreshes of a device."""
+    return timedelta(
+        minutes=entry.options.get(
+            CONF_CONF_REFRESH_INTERVAL, DEFAULT_CONF_REFRESH_INTERVAL
+        )
+    )
+
+
+def _get_adaptive_polling(entry: ConfigEntry) -> AdaptivePolling | None:
+    """Return the adaptive polling configured for the entry, if enabled."""
+    if not entry.options.get(CONF_ADAPTIVE_POLLING, False):
+        return None
+
+    options = entry.options
+    min_seconds = options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL)
+    max_seconds = options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL)
+    _LOGGER.info(
+        "Adaptive polling enabled between %s and %s seconds", min_seconds, max_seconds
+    )
+    return AdaptivePolling(
+        options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+        min_seconds,
+        max_seconds,
+    )
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Update when config_entry options update."""
-    update_seconds = entry.options[CONF_SCAN_INTERVAL]
+    """Update when config_entry data or options update."""
+    mel_account: MelCloudAccountCoordinator = hass.data[DOMAIN][entry.entry_id][
+        MEL_ACCOUNT
+    ]
+    token_manager = mel_account.client.token_manager
+    if (token := entry.data.get(CONF_TOKEN)) and token != token_manager.token:
+        _LOGGER.info("Using the renewed MELCloud token")
+        token_manager.async_set_token(token)
+
+    update_seconds = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
     update_interval = timedelta(seconds=update_seconds)
     _LOGGER.info("Setting update interval to %s seconds", update_seconds)
 
-    mel_devices: dict[str, list[MelCloudDevice]] = hass.data[DOMAIN][
-        entry.entry_id
-    ].get(MEL_DEVICES, {})
-    for mel_devices_type in mel_devices.values():
-        for mel_device in mel_devices_type:
-            mel_device.set_coordinator_update_interval(update_interval)
+    mel_account.adaptive_polling = _get_adaptive_polling(entry)
+    mel_account.async_set_scan_interval(update_interval)
+
+    mel_account.conf_refresh_interval = _get_conf_refresh_interval(entry)
+    set_debounce = _get_set_debounce(entry)
+    for mel_devices in mel_account.mel_devices.values():
+        for mel_device in mel_devices:
+            mel_device.set_debounce = set_debounce
+
+    request_rate = entry.options.get(CONF_REQUEST_RATE, DEFAULT_REQUEST_RATE)
+    _LOGGER.info("Setting request budget to %s requests per minute", request_rate)
+    mel_account.client.scheduler.rate = request_rate / 60
 
 
 class MelCloudDevice:
     """MELCloud Device instance."""
 
-    def __init__(self, device: Device) -> None:
+    def __init__(
+        self,
+        device: Device,
+        set_debounce: timedelta = timedelta(seconds=DEFAULT_SET_DEBOUNCE),
+    ) -> None:
         """Construct a device wrapper."""
         self.device = device
         self.name = device.name
         self._extra_attributes = None
         self._dev_conf = None
-        self._coordinator: DataUpdateCoordinator | None = None
-
-    async def _async_update(self):
+        self._coordinator: MelCloudDeviceCoordinator | None = None
+        self.set_debounce = set_debounce
+        self.refresh_phase = 0.0
+        self._refreshed_at: float | None = None
+        self._refresh_hints: tuple[Any, ...] | None = None
+        self._conf_hash: int | None = None
+        self._meters: dict[str, Any] = {}
+        self._capabilities: AtaCapabilities | AtwCapabilities | None = None
+        self._capability_signature: tuple[Any, ...] | None = None
+        self._cloud_state: dict[str, Any] | None = None
+        self._optimistic: dict[asyncio.Future[bool], dict[str, Any]] = {}
+        self._pending_writes: dict[str, Any] = {}
+        self._pending_result: asyncio.Future[bool] | None = None
+        self._pending_confirm = False
+        self._write_tasks: set[asyncio.Task] = set()
+        self._refresh_tasks: set[asyncio.Task] = set()
+        self._shut_down = False
+        self._write_lock = asyncio.Lock()
+        self._follow_values: dict[str, Any] | None = None
+        self._follow_step = 0
+        self._follow_unsub: CALLBACK_TYPE | None = None
+
+    async def _async_update(self) -> AtaDeviceData | AtwDeviceData:
         """Pull the latest data from MELCloud."""
+        # pymelcloud fails looking up a device no longer in the device list
+        if self._shut_down:
+            raise UpdateFailed(f"{self.name} is no longer polled")
         self._dev_conf = None
+        self._mark_refreshed()
         await self.device.update()
-
-    async def async_create_coordinator(
-        self, hass: HomeAssistant, update_interval: timedelta
-    ) -> None:
+        self._cloud_state = self._followed_state(self.device._state)
+        self._update_state_view()
+        self._update_capabilities()
+        return device_data(self.device)
+
+    @callback
+    def async_create_coordinator(
+        self, hass: HomeAssistant
+    ) -> MelCloudDeviceCoordinator:
         """Get the coordinator for a specific device."""
         if self._coordinator:
-            return
+            return self._coordinator
 
-        coordinator = DataUpdateCoordinator(
+        self._coordinator = MelCloudDeviceCoordinator(
             hass,
             _LOGGER,
             name=f"{DOMAIN}-{self.name or self.device_id}",
             update_method=self._async_update,
-            # Polling interval. Will only be polled if there are subscribers.
-            update_interval=update_interval,
+            # No polling, periodic updates come from the account coordinator.
+            update_interval=None,
+        )
+        return self._coordinator
+
+    def _mark_refreshed(self) -> None:
+        """Record the time and the hints of a full refresh."""
+        self._refreshed_at = monotonic()
+        self._refresh_hints = refresh_hints(self.device._device_conf or {})
+
+    def refresh_due(self, interval: timedelta) -> bool:
+        """Return True if the full device state should be fetched again.
+
+        A refresh is due when the device list hints at a change not visible in
+        its own values, or as a safety net once per interval. The safety net
+        falls at the refresh phase of the device, a fraction of the interval,
+        so the devices of an account are not refreshed all in the same cycle.
+        Devices never refreshed are left to the bootstrap.
+        """
+        if self._refreshed_at is None:
+            return False
+        if refresh_hints(self.device._device_conf or {}) != self._refresh_hints:
+            return True
+        seconds = interval.total_seconds()
+        offset = self.refresh_phase * seconds
+        return (monotonic() - offset) // seconds > (
+            self._refreshed_at - offset
+        ) // seconds
+
+    def _followed_state(self, state: dict[str, Any]) -> dict[str, Any]:
+        """Return a device state, with the written values not delivered yet.
+
+        The fast follow ends once MELCloud delivered the command to the unit.
+        """
+        if (values := self._follow_values) is None:
+            return state
+        if state.get(HAS_PENDING_COMMAND):
+            return {**state, **values}
+
+        self.async_cancel_follow()
+        if any(state.get(key) != value for key, value in values.items()):
+            _LOGGER.warning("Set status for %s not applied by MELCloud", self.name)
+        return state
+
+    @callback
+    def _async_start_follow(self, values: dict[str, Any]) -> None:
+        """Poll the device shortly after a write until MELCloud delivers it."""
+        if self._coordinator is None:
+            return
+        self._follow_values = {**(self._follow_values or {}), **values}
+        self._follow_step = 0
+        self._async_schedule_follow()
+
+    @callback
+    def _async_schedule_follow(self) -> None:
+        """Schedule the next fast follow poll, if any is left."""
+        if self._follow_unsub is not None:
+            self._follow_unsub()
+            self._follow_unsub = None
+        if self._follow_step >= len(FAST_FOLLOW_DELAYS):
+            _LOGGER.debug("Set status for %s not delivered yet", self.name)
+            self._follow_values = None
+            return
+        self._follow_unsub = async_call_later(
+            self._coordinator.hass,
+            FAST_FOLLOW_DELAYS[self._follow_step],
+            self._async_follow_poll,
         )
-        await coordinator.async_refresh()
-        self._coordinator = coordinator
 
-    def set_coordinator_update_interval(self, update_interval: timedelta):
-        """Update coordinator update interval."""
+    async def _async_follow_poll(self, _now: datetime) -> None:
+        """Fetch the device state during a fast follow."""
+        self._follow_unsub = None
+        if self.device._client.breaker.is_open:
+            self._follow_values = None
+            return
+        await self._coordinator.async_refresh()
+        if self._follow_values is not None:
+            self._follow_step += 1
+            self._async_schedule_follow()
+
+    @callback
+    def async_cancel_follow(self) -> None:
+        """Stop the fast follow of the last write."""
+        self._follow_values = None
+        if self._follow_unsub is not None:
+            self._follow_unsub()
+            self._follow_unsub = None
+
+    @callback
+    def async_track_refresh(self, refresh: asyncio.Task) -> None:
+        """Track a refresh task, cancelled if the device is shut down."""
+        self._refresh_tasks.add(refresh)
+        refresh.add_done_callback(self._refresh_tasks.discard)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop the refreshes, the fast follow and the writes in progress.
+
+        Callers still waiting for a write are told it failed.
+        """
+        self._shut_down = True
+        for refresh in self._refresh_tasks:
+            refresh.cancel()
+        if self._coordinator is not None:
+            self._coordinator.hass.async_create_background_task(
+                self._coordinator.async_shutdown(), f"{DOMAIN} shutdown {self.name}"
+            )
+        self.async_cancel_follow()
+        for result in self._optimistic:
+            if not result.done():
+                result.set_result(False)
+        for write_task in self._write_tasks:
+            write_task.cancel()
+        self._pending_writes = {}
+        self._pending_confirm = False
+        self._pending_result = None
+
+    def _update_state_view(self) -> None:
+        """Show the last state known from MELCloud with the writes in progress.
+
+        The state no longer reflects a device list entry only, so the next
+        account poll is applied whatever its content.
+        """
+        self._conf_hash = None
+        if self._cloud_state is None:
+            return
+        state = dict(self._cloud_state)
+        for values in self._optimistic.values():
+            state.update(values)
+        self.device._state = state
+
+    def _update_capabilities(self) -> bool:
+        """Drop the capability table if the device configuration changed.
+
+        Return True if it was dropped.
+        """
+        signature = capability_signature(self.device)
+        if signature == self._capability_signature:
+            return False
+        self._capability_signature = signature
+        self._capabilities = None
+        return True
+
+    @property
+    def capabilities(self) -> AtaCapabilities | AtwCapabilities:
+        """Return the capability table of the device."""
+        if self._capabilities is None:
+            self._capabilities = device_capabilities(self.device)
+        return self._capabilities
+
+    @callback
+    def async_apply_device_conf(self, device_conf: dict[str, Any]) -> bool:
+        """Apply the device entry of an account poll and notify entities.
+
+        An entry identical to the last one applied is skipped, and entities
+        are only notified of a new snapshot or new capabilities, unless the
+        device is marked as failed. Return True if the device data changed.
+        """
+        conf_hash = device_conf_hash(device_conf)
+        meters = meter_values(device_conf)
+        if conf_hash == self._conf_hash and (
+            self._coordinator is None or self._coordinator.last_update_success
+        ):
+            if meters == self._meters:
+                return False
+            return self._async_apply_meters(device_conf, meters)
+        self._meters = meters
+        self.device._device_conf = device_conf
+        self._cloud_state = state_from_device_conf(device_conf, self._cloud_state)
+        if self._follow_values:
+            # Written values stay shown until the device list reports them
+            if all(
+                self._cloud_state.get(key) == value
+                for key, value in self._follow_values.items()
+            ):
+                self.async_cancel_follow()
+            else:
+                self._cloud_state.update(self._follow_values)
+        self._update_state_view()
+        capabilities_changed = self._update_capabilities()
+        self._dev_conf = None
+        self._conf_hash = conf_hash
+        data = device_data(self.device)
+        if self._coordinator is None:
+            return True
+        changed = data != self._coordinator.data
+        if changed or capabilities_changed or not self._coordinator.last_update_success:
+            self._coordinator.async_set_updated_data(data)
+        return changed
+
+    @callback
+    def _async_apply_meters(
+        self, device_conf: dict[str, Any], meters: dict[str, Any]
+    ) -> bool:
+        """Apply a device list entry whose meter values alone changed.
+
+        Only the sensors of the changed values are notified.
+        """
+        changed = {
+            key for key, value in meters.items() if self._meters.get(key) != value
+        }
+        self._meters = meters
+        self.device._device_conf = device_conf
+        self._dev_conf = None
+        if self._coordinator is not None:
+            self._coordinator.async_update_listeners_for(
+                device_data(self.device), changed
+            )
+        return True
+
+    @property
+    def activity(self) -> tuple[Any, ...]:
+        """Return the state values last known from MELCloud set by the user."""
+        return activity_signature(self._cloud_state)
+
+    @property
+    def snapshot(self) -> dict[str, Any]:
+        """Return the last state known from MELCloud, to be persisted."""
+        return {"state": self._cloud_state, "units": self.device._device_units}
+
+    @callback
+    def async_restore_snapshot(self, snapshot: dict[str, Any]) -> None:
+        """Restore the state saved by a previous run and notify entities."""
+        self.device._device_units = snapshot.get("units")
+        self._cloud_state = snapshot.get("state")
+        self._mark_refreshed()
+        self._update_state_view()
+        self._update_capabilities()
+        self._dev_conf = None
         if self._coordinator:
-            self._coordinator.update_interval = update_interval
-            self._coordinator.async_set_updated_data(None)
+            self._coordinator.async_set_updated_data(device_data(self.device))
 
-    async def async_set(self, properties: Dict[str, Any]):
-        """Write state changes to the MELCloud API."""
+    @callback
+    def async_set_update_error(self, err: Exception) -> None:
+        """Mark the device as failed after an account poll error."""
+        if self._coordinator:
+            self._coordinator.async_set_update_error(err)
+
+    def _state_values(self, properties: dict[str, Any]) -> dict[str, Any]:
+        """Return the state values written by some properties."""
+        values: dict[str, Any] = {}
+        for key, value in properties.items():
+            if key == PROPERTY_POWER:
+                values["Power"] = value
+            else:
+                self.device.apply_write(values, key, value)
+        values.pop(EFFECTIVE_FLAGS, None)
+        return values
+
+    @callback
+    def _async_notify(self, properties: dict[str, Any]) -> None:
+        """Update the entities showing some properties."""
+        if self._coordinator:
+            self._coordinator.async_update_listeners_for(
+                device_data(self.device), properties
+            )
+
+    async def async_set(
+        self,
+        properties: dict[str, Any],
+        *,
+        confirm: bool = True,
+        debounce: bool = True,
+    ) -> bool:
+        """Write state changes to the MELCloud API.
+
+        The changes are shown right away by the affected entities and rolled
+        back if MELCloud does not apply them. Changes requested by concurrent
+        callers within the debounce time are merged in a single request, whose
+        outcome is returned to every caller.
+
+        Without confirm the device is not read back after the write, leaving
+        the caller to refresh the account once for several devices; the
+        written values are followed until the device list reports them. Without
+        debounce the write is sent right away, unless joining a pending one.
+        """
+        values = self._state_values(properties)
+
+        if self._pending_result is None:
+            self._pending_result = asyncio.get_running_loop().create_future()
+            self._optimistic[self._pending_result] = {}
+            delay = self.set_debounce.total_seconds() if debounce else 0
+            write_task = self._coordinator.hass.async_create_background_task(
+                self._async_flush_writes(self._pending_result, monotonic(), delay),
+                f"{DOMAIN} write {self.name}",
+            )
+            self._write_tasks.add(write_task)
+            write_task.add_done_callback(self._write_tasks.discard)
+        result = self._pending_result
+        self._pending_writes.update(properties)
+        self._pending_confirm |= confirm
+        self._optimistic[result].update(values)
+        self._update_state_view()
+        self._async_notify(properties)
+        return await asyncio.shield(result)
+
+    async def _async_flush_writes(
+        self, result: asyncio.Future[bool], started: float, delay: float
+    ) -> None:
+        """Send the changes collected during the debounce time.
+
+        The time from the first change to the confirmation of the write is
+        measured in the account metrics.
+        """
+        await asyncio.sleep(delay)
+        properties, self._pending_writes = self._pending_writes, {}
+        confirm, self._pending_confirm = self._pending_confirm, False
+        self._pending_result = None
+        async with self._write_lock:
+            try:
+                result.set_result(await self._async_write(properties, confirm))
+            except Exception as ex:  # pylint: disable=broad-except
+                result.set_exception(ex)
+            finally:
+                self._optimistic.pop(result, None)
+                self._update_state_view()
+                self._async_notify(properties)
+                metrics = self.device._client.metrics
+                metrics.write_confirm.observe(monotonic() - started)
+
+    def _is_unchanged(self, key: str, value: Any) -> bool:
+        """Return True if a property already has the requested value."""
+        if (state := self._cloud_state) is None:
+            return False
+        new_values = self._state_values({key: value})
+        return bool(new_values) and all(
+            state.get(state_key) == state_value
+            for state_key, state_value in new_values.items()
+        )
+
+    async def _async_write(
+        self, properties: dict[str, Any], confirm: bool = True
+    ) -> bool:
+        """Send a single write request and confirm it reading the device."""
+        properties = {
+            key: value
+            for key, value in properties.items()
+            if not self._is_unchanged(key, value)
+        }
+        if not properties:
+            return True
+        if self._cloud_state is None:
+            _LOGGER.warning("Set status failed for %s, state unknown", self.name)
+            return False
+
+        new_state = {**self._cloud_state, EFFECTIVE_FLAGS: 0}
+        for key, value in properties.items():
+            if key == PROPERTY_POWER:
+                new_state["Power"] = value
+                new_state[EFFECTIVE_FLAGS] |= 0x01
+            else:
+                self.device.apply_write(new_state, key, value)
+        if new_state[EFFECTIVE_FLAGS] != 0:
+            new_state[HAS_PENDING_COMMAND] = True
+
+        client = self.device._client
         try:
-            await self.device.set(properties)
-        except (ClientConnectionError, ClientResponseError):
+            await client.set_device_state(new_state)
+        except CircuitOpenError:
+            _LOGGER.debug("Set status for %s not sent, MELCloud unreachable", self.name)
+            return False
+        except (asyncio.TimeoutError, ClientConnectionError, ClientResponseError):
             _LOGGER.warning("Set status failed for %s", self.name)
-            return
-        if self._coordinator:
-            self._coordinator.async_set_updated_data(None)
+            return False
+
+        values = self._state_values(properties)
+        if not confirm:
+            self._cloud_state = {**self._cloud_state, **values}
+            self._async_start_follow(values)
+            return True
+        try:
+            state = await client.fetch_device_state(self.device)
+        except (asyncio.TimeoutError, ClientConnectionError, ClientResponseError):
+            _LOGGER.debug("Unable to confirm set status for %s", self.name)
+            self._cloud_state = {**self._cloud_state, **values}
+            self._async_start_follow(values)
+            return True
+
+        # A command not delivered yet still reports the previous values.
+        if not state.get(HAS_PENDING_COMMAND) and any(
+            state.get(key) != value for key, value in values.items()
+        ):
+            _LOGGER.warning("Set status for %s not applied by MELCloud", self.name)
+            self._cloud_state = state
+            return False
+        self._cloud_state = {**state, **values}
+        if state.get(HAS_PENDING_COMMAND):
+            self._async_start_follow(values)
+        return True
 
     @property
-    def coordinator(self) -> DataUpdateCoordinator | None:
+    def coordinator(self) -> MelCloudDeviceCoordinator | None:
         """Return coordinator associated."""
         return self._coordinator
 
@@ -384,28 +1153,103 @@ class MelCloudDevice:
         return data
 
 
+async def _async_bootstrap_devices(
+    hass: HomeAssistant,
+    mel_devices: list[MelCloudDevice],
+    setup_concurrency: int,
+    setup_timeout: float,
+) -> None:
+    """Run the first refresh of the devices concurrently within a deadline.
+
+    Devices that miss the deadline complete their first refresh in background,
+    using the state from the device list until then.
+    """
+    if not mel_devices:
+        return
+
+    semaphore = asyncio.Semaphore(setup_concurrency)
+
+    async def _async_first_refresh(mel_device: MelCloudDevice) -> None:
+        async with semaphore:
+            await mel_device.coordinator.async_refresh()
+
+    tasks = [
+        hass.async_create_background_task(
+            _async_first_refresh(mel_device),
+            f"{DOMAIN} first refresh {mel_device.name}",
+        )
+        for mel_device in mel_devices
+    ]
+    _, pending = await asyncio.wait(tasks, timeout=setup_timeout)
+    if pending:
+        _LOGGER.warning(
+            "%s of %s devices not initialized in %s seconds, completing in background",
+            len(pending),
+            len(tasks),
+            setup_timeout,
+        )
+
+
 async def mel_devices_setup(
-    hass: HomeAssistant, token: str, update_interval: timedelta
-) -> dict[str, list[MelCloudDevice]]:
-    """Query connected devices from MELCloud."""
-    session = async_get_clientsession(hass)
+    hass: HomeAssistant,
+    token: str,
+    scheduler: RequestScheduler,
+    update_interval: timedelta,
+    *,
+    setup_concurrency: int = DEFAULT_SETUP_CONCURRENCY,
+    setup_timeout: float = DEFAULT_SETUP_TIMEOUT,
+    set_debounce: timedelta = timedelta(seconds=DEFAULT_SET_DEBOUNCE),
+    conf_refresh_interval: timedelta = timedelta(minutes=DEFAULT_CONF_REFRESH_INTERVAL),
+    snapshot: dict[str, Any] | None = None,
+    session: ClientSession | None = None,
+) -> MelCloudAccountCoordinator:
+    """Query connected devices from MELCloud.
+
+    Devices found in the snapshot are set up from the saved state, only the
+    others are refreshed before creating the entities. Requests use the Home
+    Assistant shared session unless a session is provided.
+    """
+    if session is None:
+        session = async_get_clientsession(hass)
     try:
         async with asyncio.timeout(10):
-            all_devices = await get_devices(
+            client, all_devices = await get_devices(
                 token,
                 session,
-                conf_update_interval=timedelta(minutes=30),
-                device_set_debounce=timedelta(seconds=2),
+                scheduler,
+                conf_update_interval=conf_refresh_interval,
+                device_set_debounce=set_debounce,
+                snapshot=snapshot,
             )
     except (asyncio.TimeoutError, ClientConnectionError, ClientResponseError) as ex:
         raise ConfigEntryNotReady() from ex
 
+    saved_devices = snapshot.get("devices", {}) if snapshot else {}
     wrapped_devices: dict[str, list[MelCloudDevice]] = {}
+    bootstrap_devices: list[MelCloudDevice] = []
     for device_type, devices in all_devices.items():
         wrapped_types = []
         for device in devices:
-            mel_device = MelCloudDevice(device)
-            await mel_device.async_create_coordinator(hass, update_interval)
+            mel_device = MelCloudDevice(device, set_debounce)
+            mel_device.async_create_coordinator(hass)
+            saved_device = saved_devices.get(str(device.device_id))
+            if saved_device and saved_device.get("state"):
+                mel_device.async_restore_snapshot(saved_device)
+            else:
+                mel_device.async_apply_device_conf(device._device_conf)
+                bootstrap_devices.append(mel_device)
             wrapped_types.append(mel_device)
         wrapped_devices[device_type] = wrapped_types
-    return wrapped_devices
+
+    await _async_bootstrap_devices(
+        hass, bootstrap_devices, setup_concurrency, setup_timeout
+    )
+
+    mel_account = MelCloudAccountCoordinator(hass, client, update_interval)
+    mel_account.mel_devices = wrapped_devices
+    mel_account.conf_refresh_interval = conf_refresh_interval
+    mel_account.async_spread_refresh_phases()
+    mel_account.async_set_updated_data(
+        mel_account.index_device_confs(client.device_confs)
+    )
+    return mel_account
@@ -0,0 +1,347 @@
+"""MELCloud API client for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from functools import partial
+import logging
+from typing import Any, TypeVar
+
+from aiohttp import ClientResponseError, ClientSession, ClientTimeout, TCPConnector
+from pymelcloud import DEVICE_TYPE_ATA, DEVICE_TYPE_ATW, AtaDevice, AtwDevice, Device
+from pymelcloud import client as mel_client
+from pymelcloud.client import Client
+
+from homeassistant.core import callback
+from homeassistant.util.ssl import get_default_context
+
+from .breaker import AUTH_ERRORS, CircuitBreaker
+from .const import (
+    SESSION_CONNECT_TIMEOUT,
+    SESSION_DNS_CACHE_TTL,
+    SESSION_KEEPALIVE_TIMEOUT,
+    SESSION_LIMIT_PER_HOST,
+    SESSION_READ_TIMEOUT,
+    TOKEN_RENEW_TIMEOUT,
+)
+from .metrics import PerformanceMetrics
+from .scheduler import RequestPriority, RequestScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+REPORT_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+DEVICE_CLASSES = {
+    0: (DEVICE_TYPE_ATA, AtaDevice),
+    1: (DEVICE_TYPE_ATW, AtwDevice),
+}
+
+
+class TokenManager:
+    """Hold the account token and renew it once when MELCloud rejects it.
+
+    Requests failing with an authentication error wait for the same renewal,
+    so a single login is requested however many requests were rejected. A
+    renewal not completed in time is given up for all the waiting requests,
+    the next rejection requests the login again. Requests not allowed to wait
+    start the renewal and fail right away.
+    """
+
+    def __init__(
+        self, token: str, renew_timeout: timedelta = TOKEN_RENEW_TIMEOUT
+    ) -> None:
+        """Initialize the token manager."""
+        self.token = token
+        self.request_login: Callable[[], None] | None = None
+        self._renew_timeout = renew_timeout.total_seconds()
+        self._renewal: asyncio.Future[str | None] | None = None
+
+    async def async_renew(self, rejected_token: str, wait: bool = True) -> str | None:
+        """Return the token replacing a rejected one, None if not renewed."""
+        if rejected_token != self.token:
+            return self.token
+        if self.request_login is None:
+            return None
+
+        if self._renewal is None:
+            _LOGGER.warning("MELCloud token rejected, login required")
+            self._renewal = asyncio.get_running_loop().create_future()
+            self.request_login()
+        if not wait:
+            return None
+        renewal = self._renewal
+        try:
+            async with asyncio.timeout(self._renew_timeout):
+                return await asyncio.shield(renewal)
+        except asyncio.TimeoutError:
+            if not renewal.done():
+                _LOGGER.warning("MELCloud token not renewed in time")
+                renewal.set_result(None)
+            if self._renewal is renewal:
+                self._renewal = None
+            return None
+
+    @callback
+    def async_set_token(self, token: str) -> None:
+        """Set a new token and release the requests waiting for it."""
+        self.token = token
+        if self._renewal is not None:
+            self._renewal.set_result(token)
+            self._renewal = None
+
+
+class MelCloudClient(Client):
+    """MELCloud client sharing a single account-wide device list poll.
+
+    pymelcloud devices call `update_confs` on every `Device.update`. The device
+    list is refreshed by the account coordinator once per cycle, so here it is
+    only fetched when it is still missing.
+
+    Every request goes through the account request scheduler and is measured
+    in the account metrics, unless the account circuit breaker is open.
+    Requests rejected for authentication are sent again once the token is
+    renewed. Only background polls and reports wait for the renewal, writes
+    and configuration requests fail with the authentication error.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        session: ClientSession,
+        scheduler: RequestScheduler,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the client."""
+        self.token_manager = TokenManager(token)
+        super().__init__(token, session, **kwargs)
+        self.scheduler = scheduler
+        self.metrics = PerformanceMetrics()
+        self.breaker = CircuitBreaker()
+
+    @property
+    def _token(self) -> str:
+        """Return the token used by the requests."""
+        return self.token_manager.token
+
+    @_token.setter
+    def _token(self, token: str) -> None:
+        """Set the token used by the requests."""
+        self.token_manager.token = token
+
+    async def _async_send(
+        self, priority: int, endpoint: str, request: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Send a request if the breaker is closed, within the budget.
+
+        Polls are the only requests probing MELCloud while it is unreachable.
+        """
+        with self.breaker.request(probe=priority == RequestPriority.POLL):
+            async with self.scheduler.request(priority):
+                with self.metrics.request(endpoint):
+                    return await request()
+
+    async def _async_request(
+        self, priority: int, endpoint: str, request: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Send a request, again if the token is renewed."""
+        token = self._token
+        try:
+            return await self._async_send(priority, endpoint, request)
+        except ClientResponseError as err:
+            if err.status not in AUTH_ERRORS:
+                raise
+            if not await self.token_manager.async_renew(
+                token, wait=priority >= RequestPriority.POLL
+            ):
+                raise
+        return await self._async_send(priority, endpoint, request)
+
+    async def _fetch_user_details(self):
+        """Fetch user details."""
+        await self._async_request(
+            RequestPriority.CONFIG, "User/GetUserDetails", super()._fetch_user_details
+        )
+
+    async def _fetch_device_confs(self):
+        """Fetch all configured devices."""
+        await self._async_request(
+            RequestPriority.POLL, "User/ListDevices", super()._fetch_device_confs
+        )
+
+    async def fetch_device_units(self, device) -> dict[Any, Any] | None:
+        """Fetch unit information for a device."""
+        return await self._async_request(
+            RequestPriority.CONFIG,
+            "Device/ListDeviceUnits",
+            partial(super().fetch_device_units, device),
+        )
+
+    async def fetch_device_state(self, device) -> dict[Any, Any] | None:
+        """Fetch state information of a device."""
+        return await self._async_request(
+            RequestPriority.POLL,
+            "Device/Get",
+            partial(super().fetch_device_state, device),
+        )
+
+    async def set_device_state(self, device):
+        """Update device state."""
+        return await self._async_request(
+            RequestPriority.WRITE,
+            "Device/Set",
+            partial(super().set_device_state, device),
+        )
+
+    async def _fetch_energy_report(
+        self, device_id: int, start: datetime, end: datetime
+    ) -> dict[str, Any]:
+        """Fetch the energy report of a device."""
+        body = {
+            "DeviceID": device_id,
+            "FromDate": start.strftime(REPORT_DATE_FORMAT),
+            "ToDate": end.strftime(REPORT_DATE_FORMAT),
+            "UseCurrency": False,
+        }
+        async with self._session.post(
+            f"{mel_client.BASE_URL}/EnergyCost/Report",
+            headers=mel_client._headers(self._token),
+            json=body,
+            raise_for_status=True,
+        ) as resp:
+            return await resp.json() or {}
+
+    async def fetch_energy_report(
+        self, device_id: int, start: datetime, end: datetime
+    ) -> dict[str, Any]:
+        """Fetch the consumption of a device between two local dates.
+
+        The report has an array of values for every operation mode, labelled
+        with the hour of the day when both dates fall on the same day, with
+        the day otherwise.
+        """
+        return await self._async_request(
+            RequestPriority.REPORT,
+            "EnergyCost/Report",
+            partial(self._fetch_energy_report, device_id, start, end),
+        )
+
+    async def _fetch_temperature_log(
+        self, device_id: int, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        """Fetch the temperature log of a device."""
+        body = {
+            "DeviceID": device_id,
+            "FromDate": start.strftime(REPORT_DATE_FORMAT),
+            "ToDate": end.strftime(REPORT_DATE_FORMAT),
+        }
+        async with self._session.post(
+            f"{mel_client.BASE_URL}/Report/GetTemperatureLog2",
+            headers=mel_client._headers(self._token),
+            json=body,
+            raise_for_status=True,
+        ) as resp:
+            return await resp.json() or []
+
+    async def fetch_temperature_log(
+        self, device_id: int, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        """Fetch the temperatures logged by a device between two dates.
+
+        Dates are local times, every row has the local "Time" it was logged
+        at and the temperatures keyed like in the device state.
+        """
+        return await self._async_request(
+            RequestPriority.REPORT,
+            "Report/GetTemperatureLog2",
+            partial(self._fetch_temperature_log, device_id, start, end),
+        )
+
+    async def update_confs(self):
+        """Fetch account details and device list if not available yet."""
+        if self._account is None:
+            await self._fetch_user_details()
+        if not self._device_confs:
+            await self._fetch_device_confs()
+
+    def restore_confs(
+        self, account: dict[str, Any] | None, device_confs: list[dict[str, Any]]
+    ) -> None:
+        """Use account details and device list saved by a previous run."""
+        self._account = account
+        self._device_confs = device_confs
+
+    async def fetch_device_confs(self) -> list[dict[str, Any]]:
+        """Fetch the device list of the whole account with one request."""
+        await self._fetch_device_confs()
+        return self._device_confs
+
+
+def create_dedicated_session() -> ClientSession:
+    """Create a session reserved to the requests of a MELCloud account.
+
+    Connections to MELCloud are kept alive between poll cycles and limited
+    per host, DNS lookups are cached and a stalled connect fails sooner than
+    a slow response.
+    """
+    connector = TCPConnector(
+        limit_per_host=SESSION_LIMIT_PER_HOST,
+        keepalive_timeout=SESSION_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=SESSION_DNS_CACHE_TTL,
+        ssl=get_default_context(),
+    )
+    return ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(
+            connect=SESSION_CONNECT_TIMEOUT, sock_read=SESSION_READ_TIMEOUT
+        ),
+    )
+
+
+def create_device(
+    device_conf: dict[str, Any],
+    client: Client,
+    set_debounce: timedelta,
+) -> tuple[str, Device] | None:
+    """Create the pymelcloud device matching a device list entry."""
+    device_type = device_conf.get("Device", {}).get("DeviceType")
+    if (device_class := DEVICE_CLASSES.get(device_type)) is None:
+        return None
+    type_name, device_cls = device_class
+    return type_name, device_cls(device_conf, client, set_debounce=set_debounce)
+
+
+async def get_devices(
+    token: str,
+    session: ClientSession,
+    scheduler: RequestScheduler,
+    *,
+    conf_update_interval: timedelta,
+    device_set_debounce: timedelta,
+    snapshot: dict[str, Any] | None = None,
+) -> tuple[MelCloudClient, dict[str, list[Device]]]:
+    """Initialize the client and the devices available with the token.
+
+    When a snapshot is provided the devices are created from it, without
+    sending any request.
+    """
+    client = MelCloudClient(
+        token,
+        session,
+        scheduler,
+        conf_update_interval=conf_update_interval,
+        device_set_debounce=device_set_debounce,
+    )
+    if snapshot:
+        client.restore_confs(snapshot.get("account"), snapshot["device_confs"])
+    else:
+        await client.update_confs()
+
+    devices: dict[str, list[Device]] = {DEVICE_TYPE_ATA: [], DEVICE_TYPE_ATW: []}
+    for device_conf in client.device_confs:
+        if created := create_device(device_conf, client, device_set_debounce):
+            devices[created[0]].append(created[1])
+    return client, devices
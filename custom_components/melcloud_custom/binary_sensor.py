@@ -14,12 +14,11 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import MelCloudDevice
-from .const import DOMAIN, MEL_DEVICES
+from .entity import MelCloudEntity, async_setup_device_entities
 
 
 @dataclass
@@ -42,7 +41,7 @@ ATA_BINARY_SENSORS: tuple[MelcloudBinarySensorEntityDescription, ...] = (
         key="error_state",
         name="Error State",
         device_class=BinarySensorDeviceClass.PROBLEM,
-        value_fn=lambda x: x.error_state,
+        value_fn=lambda data: data.error_state,
         enabled=lambda x: True,
     ),
 )
@@ -54,22 +53,24 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     """Set up MELCloud device binary sensors based on config_entry."""
-    entry_config = hass.data[DOMAIN][entry.entry_id]
-
-    mel_devices = entry_config.get(MEL_DEVICES)
-    entities = []
-    entities.extend(
-        [
-            MelDeviceBinarySensor(mel_device, description)
-            for description in ATA_BINARY_SENSORS
-            for mel_device in mel_devices[DEVICE_TYPE_ATA]
-            if description.enabled(mel_device)
-        ]
-    )
-    async_add_entities(entities, False)
-
-
-class MelDeviceBinarySensor(CoordinatorEntity, BinarySensorEntity):
+
+    @callback
+    def _async_add_devices(mel_devices: dict[str, list[MelCloudDevice]]) -> None:
+        entities = []
+        entities.extend(
+            [
+                MelDeviceBinarySensor(mel_device, description)
+                for description in ATA_BINARY_SENSORS
+                for mel_device in mel_devices[DEVICE_TYPE_ATA]
+                if description.enabled(mel_device)
+            ]
+        )
+        async_add_entities(entities, False)
+
+    async_setup_device_entities(hass, entry, _async_add_devices)
+
+
+class MelDeviceBinarySensor(MelCloudEntity, BinarySensorEntity):
     """Representation of a Binary Sensor."""
 
     entity_description: MelcloudBinarySensorEntityDescription
@@ -89,7 +90,11 @@ class MelDeviceBinarySensor(CoordinatorEntity, BinarySensorEntity):
         self._attr_device_info = api.device_info
         self._attr_extra_state_attributes = api.extra_attributes
 
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return the value the sensor reads from the device data."""
+        return (self.available, self.is_on)
+
     @property
     def is_on(self):
         """Return the state of the binary sensor."""
-        return self.entity_description.value_fn(self._api)
+        return self.entity_description.value_fn(self.coordinator.data)
@@ -0,0 +1,184 @@
+"""Circuit breaker for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+import logging
+import random
+from time import monotonic
+from typing import Any
+
+from aiohttp import ClientConnectionError, ClientResponseError
+
+import homeassistant.util.dt as dt_util
+
+from .const import BREAKER_BACKOFF, BREAKER_MAX_BACKOFF, BREAKER_THRESHOLD
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+AUTH_ERRORS = (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN)
+
+
+def _retry_after(err: ClientResponseError) -> float | None:
+    """Return the seconds to wait sent with a response, if any."""
+    if not err.headers or (value := err.headers.get("Retry-After")) is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=dt_util.UTC)
+    return max(0.0, (date - dt_util.utcnow()).total_seconds())
+
+
+class CircuitOpenError(ClientConnectionError):
+    """Request not sent because MELCloud is unreachable."""
+
+
+class CircuitBreaker:
+    """Stop the requests of a MELCloud account while the service is down.
+
+    The breaker opens after consecutive failed requests: requests then fail
+    right away until the backoff time elapses, when a single probe is let
+    through. A successful probe closes the breaker, a failed one opens it
+    again with twice the backoff time. Backoff times are randomly shortened
+    by up to a half, so installations do not retry all at the same time.
+
+    Responses with a client error status prove that MELCloud is reachable
+    and count as successes, except rate limits, which count as failures and
+    open the breaker right away for the time MELCloud asks to wait, if any.
+    Authentication errors are left to the caller and only fail a probe.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        backoff: timedelta = BREAKER_BACKOFF,
+        max_backoff: timedelta = BREAKER_MAX_BACKOFF,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.threshold = threshold
+        self.backoff = backoff.total_seconds()
+        self.max_backoff = max_backoff.total_seconds()
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.open_count = 0
+        self.retry_at = 0.0
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def is_open(self) -> bool:
+        """Return True if requests are not sent."""
+        return self.state != STATE_CLOSED
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds before the next probe is allowed."""
+        return max(0.0, self.retry_at - monotonic())
+
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable:
+        """Listen for the breaker opening or closing."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @contextmanager
+    def request(self, probe: bool = False) -> Iterator[None]:
+        """Send a request if the breaker allows it, and record its outcome.
+
+        Only requests allowed to probe are sent when the backoff time elapses.
+        """
+        if self.state == STATE_OPEN and probe and monotonic() >= self.retry_at:
+            _LOGGER.debug("Probing MELCloud after %s failures", self.failures)
+            self.state = STATE_HALF_OPEN
+        elif self.state != STATE_CLOSED:
+            raise CircuitOpenError("MELCloud unreachable, request not sent")
+
+        try:
+            yield
+        except ClientResponseError as err:
+            if err.status in AUTH_ERRORS:
+                if self.state == STATE_HALF_OPEN:
+                    self._record_failure()
+            elif err.status == HTTPStatus.TOO_MANY_REQUESTS:
+                self._record_failure(_retry_after(err))
+            elif err.status >= 500:
+                self._record_failure()
+            else:
+                self._record_success()
+            raise
+        except asyncio.CancelledError:
+            if self.state == STATE_HALF_OPEN:
+                self.state = STATE_OPEN
+            raise
+        except Exception:
+            self._record_failure()
+            raise
+        self._record_success()
+
+    def _record_success(self) -> None:
+        """Reset the failures, closing the breaker if open."""
+        self.failures = 0
+        if self.state == STATE_CLOSED:
+            return
+        _LOGGER.info("MELCloud reachable again, requests resumed")
+        self.state = STATE_CLOSED
+        self.open_count = 0
+        self._notify()
+
+    def _record_failure(self, retry_after: float | None = None) -> None:
+        """Count a failure, opening the breaker past the threshold.
+
+        A failure coming with the seconds to wait opens the breaker at once,
+        at least for that time.
+        """
+        self.failures += 1
+        if retry_after is not None and self.state == STATE_OPEN:
+            self.retry_at = max(self.retry_at, monotonic() + retry_after)
+            return
+        if retry_after is None and (
+            self.state == STATE_OPEN
+            or (self.state == STATE_CLOSED and self.failures < self.threshold)
+        ):
+            return
+
+        self.open_count += 1
+        delay = min(self.max_backoff, self.backoff * 2 ** (self.open_count - 1))
+        delay = random.uniform(delay / 2, delay)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        self.retry_at = monotonic() + delay
+        self.state = STATE_OPEN
+        _LOGGER.warning(
+            "MELCloud unreachable after %s failed requests, next attempt in %.0f seconds",
+            self.failures,
+            delay,
+        )
+        self._notify()
+
+    def _notify(self) -> None:
+        """Call the listeners."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state as a dict."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "open_count": self.open_count,
+            "retry_in_s": self.retry_in if self.is_open else None,
+        }
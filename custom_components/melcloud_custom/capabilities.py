@@ -0,0 +1,175 @@
+"""Device capability tables for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from pymelcloud import AtaDevice, AtwDevice, Device
+import pymelcloud.ata_device as ata
+
+from homeassistant.components.climate import (
+    DEFAULT_MAX_TEMP,
+    DEFAULT_MIN_TEMP,
+    ClimateEntityFeature,
+    HVACMode,
+)
+
+from .const import HorSwingModes, VertSwingModes
+
+ATA_HVAC_MODE_LOOKUP = {
+    ata.OPERATION_MODE_HEAT: HVACMode.HEAT,
+    ata.OPERATION_MODE_DRY: HVACMode.DRY,
+    ata.OPERATION_MODE_COOL: HVACMode.COOL,
+    ata.OPERATION_MODE_FAN_ONLY: HVACMode.FAN_ONLY,
+    ata.OPERATION_MODE_HEAT_COOL: HVACMode.HEAT_COOL,
+}
+ATA_HVAC_MODE_REVERSE_LOOKUP = {v: k for k, v in ATA_HVAC_MODE_LOOKUP.items()}
+
+ATA_HVAC_VVANE_LOOKUP = {
+    ata.V_VANE_POSITION_AUTO: VertSwingModes.Auto,
+    ata.V_VANE_POSITION_1: VertSwingModes.Top,
+    ata.V_VANE_POSITION_2: VertSwingModes.MiddleTop,
+    ata.V_VANE_POSITION_3: VertSwingModes.Middle,
+    ata.V_VANE_POSITION_4: VertSwingModes.MiddleBottom,
+    ata.V_VANE_POSITION_5: VertSwingModes.Bottom,
+    ata.V_VANE_POSITION_SWING: VertSwingModes.Swing,
+}
+
+ATA_HVAC_HVANE_LOOKUP = {
+    ata.H_VANE_POSITION_AUTO: HorSwingModes.Auto,
+    ata.H_VANE_POSITION_1: HorSwingModes.Left,
+    ata.H_VANE_POSITION_2: HorSwingModes.MiddleLeft,
+    ata.H_VANE_POSITION_3: HorSwingModes.Middle,
+    ata.H_VANE_POSITION_4: HorSwingModes.MiddleRight,
+    ata.H_VANE_POSITION_5: HorSwingModes.Right,
+    ata.H_VANE_POSITION_SPLIT: HorSwingModes.Split,
+    ata.H_VANE_POSITION_SWING: HorSwingModes.Swing,
+}
+
+# Device configuration values the capabilities are computed from
+CONF_CAPABILITY_KEYS = ("HideVaneControls", "HideDryModeControl")
+DEVICE_CAPABILITY_KEYS = (
+    "CanHeat",
+    "CanDry",
+    "CanCool",
+    "ModelSupportsAuto",
+    "HasAutomaticFanSpeed",
+    "NumberOfFanSpeeds",
+    "ModelSupportsVaneHorizontal",
+    "ModelSupportsVaneVertical",
+    "SwingFunction",
+    "MinTempHeat",
+    "MaxTempHeat",
+    "MinTempCoolDry",
+    "MaxTempCoolDry",
+    "MinTempAutomatic",
+    "MaxTempAutomatic",
+    "TemperatureIncrement",
+    "MaxTankTemperature",
+    "HasZone2",
+    "HasThermostatZone2",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class AtaCapabilities:
+    """Capabilities of an Air-to-Air device, in Home Assistant terms."""
+
+    supported_features: ClimateEntityFeature
+    hvac_modes: list[HVACMode]
+    fan_modes: list[str] | None
+    swing_modes: list[str]
+    vane_horizontal_positions: list[str]
+    vane_vertical_positions: list[str]
+    temperature_ranges: dict[str, tuple[float, float]]
+    temperature_increment: float
+
+    @classmethod
+    def from_device(cls, device: AtaDevice) -> AtaCapabilities:
+        """Compute the capabilities of a device."""
+        h_positions = device.vane_horizontal_positions or []
+        v_positions = device.vane_vertical_positions or []
+        supported_features = (
+            ClimateEntityFeature.FAN_MODE
+            | ClimateEntityFeature.TARGET_TEMPERATURE
+            | ClimateEntityFeature.TURN_OFF
+            | ClimateEntityFeature.TURN_ON
+        )
+        if h_positions or v_positions:
+            supported_features |= ClimateEntityFeature.SWING_MODE
+
+        conf_device = device._device_conf.get("Device", {})
+        temperature_ranges = {
+            mode: (
+                conf_device.get(ata._OPERATION_MODE_MIN_TEMP_LOOKUP.get(mode), 10),
+                conf_device.get(ata._OPERATION_MODE_MAX_TEMP_LOOKUP.get(mode), 31),
+            )
+            for mode in ata._OPERATION_MODE_MIN_TEMP_LOOKUP
+        }
+
+        return cls(
+            supported_features=supported_features,
+            hvac_modes=[HVACMode.OFF]
+            + [ATA_HVAC_MODE_LOOKUP.get(mode) for mode in device.operation_modes],
+            fan_modes=device.fan_speeds,
+            swing_modes=[ATA_HVAC_VVANE_LOOKUP.get(mode) for mode in v_positions]
+            + [ATA_HVAC_HVANE_LOOKUP.get(mode) for mode in h_positions],
+            vane_horizontal_positions=h_positions,
+            vane_vertical_positions=v_positions,
+            temperature_ranges=temperature_ranges,
+            temperature_increment=device.temperature_increment,
+        )
+
+    def temperature_range(self, operation_mode: str | None) -> tuple[float, float]:
+        """Return the target temperature range of an operation mode."""
+        return self.temperature_ranges.get(
+            operation_mode, (DEFAULT_MIN_TEMP, DEFAULT_MAX_TEMP)
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class AtwCapabilities:
+    """Capabilities of an Air-to-Water device, in Home Assistant terms."""
+
+    operation_list: list[str]
+    tank_min_temp: float
+    tank_max_temp: float
+    temperature_increment: float
+
+    @classmethod
+    def from_device(cls, device: AtwDevice) -> AtwCapabilities:
+        """Compute the capabilities of a device."""
+        # Only imported with the water_heater platform, for ATW devices
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.water_heater import (
+            DEFAULT_MAX_TEMP as DEFAULT_MAX_TANK_TEMP,
+            DEFAULT_MIN_TEMP as DEFAULT_MIN_TANK_TEMP,
+        )
+
+        return cls(
+            operation_list=device.operation_modes,
+            tank_min_temp=device.target_tank_temperature_min or DEFAULT_MIN_TANK_TEMP,
+            tank_max_temp=device.target_tank_temperature_max or DEFAULT_MAX_TANK_TEMP,
+            temperature_increment=device.temperature_increment,
+        )
+
+
+def capability_signature(device: Device) -> tuple[Any, ...]:
+    """Return the device configuration values the capabilities depend on."""
+    device_conf = device._device_conf or {}
+    conf_device = device_conf.get("Device", {})
+    state = device._state or {}
+    return (
+        device._state is not None,
+        state.get("NumberOfFanSpeeds"),
+        *(device_conf.get(key) for key in CONF_CAPABILITY_KEYS),
+        *(conf_device.get(key) for key in DEVICE_CAPABILITY_KEYS),
+    )
+
+
+def device_capabilities(device: Device) -> AtaCapabilities | AtwCapabilities:
+    """Compute the capability table of a device."""
+    if isinstance(device, AtwDevice):
+        return AtwCapabilities.from_device(device)
+    return AtaCapabilities.from_device(device)
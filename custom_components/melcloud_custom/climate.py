@@ -9,7 +9,9 @@ import pymelcloud.ata_device as ata
 import pymelcloud.atw_device as atw
 from pymelcloud.atw_device import (
     PROPERTY_ZONE_1_OPERATION_MODE,
+    PROPERTY_ZONE_1_TARGET_TEMPERATURE,
     PROPERTY_ZONE_2_OPERATION_MODE,
+    PROPERTY_ZONE_2_TARGET_TEMPERATURE,
     Zone,
 )
 from pymelcloud.device import PROPERTY_POWER
@@ -17,61 +19,58 @@ from pymelcloud.device import PROPERTY_POWER
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import (
     ATTR_HVAC_MODE,
-    DEFAULT_MAX_TEMP,
-    DEFAULT_MIN_TEMP,
     ClimateEntityFeature,
     HVACAction,
     HVACMode,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import MelCloudDevice
-from .const import (
-    ATTR_STATUS,
-    ATTR_VANE_HORIZONTAL,
-    ATTR_VANE_VERTICAL,
-    DOMAIN,
-    MEL_DEVICES,
-    HorSwingModes,
-    VertSwingModes,
+from .capabilities import (
+    ATA_HVAC_HVANE_LOOKUP,
+    ATA_HVAC_MODE_LOOKUP,
+    ATA_HVAC_MODE_REVERSE_LOOKUP,
+    ATA_HVAC_VVANE_LOOKUP,
+    AtaCapabilities,
 )
-
-ATA_HVAC_MODE_LOOKUP = {
-    ata.OPERATION_MODE_HEAT: HVACMode.HEAT,
-    ata.OPERATION_MODE_DRY: HVACMode.DRY,
-    ata.OPERATION_MODE_COOL: HVACMode.COOL,
-    ata.OPERATION_MODE_FAN_ONLY: HVACMode.FAN_ONLY,
-    ata.OPERATION_MODE_HEAT_COOL: HVACMode.HEAT_COOL,
+from .const import ATTR_STATUS, ATTR_VANE_HORIZONTAL, ATTR_VANE_VERTICAL
+from .data import ZoneData
+from .entity import MelCloudEntity, async_setup_device_entities
+
+# Writable properties shown by the entities, used to update only the affected ones
+ATA_PROPERTIES = frozenset(
+    {
+        PROPERTY_POWER,
+        ata.PROPERTY_OPERATION_MODE,
+        ata.PROPERTY_TARGET_TEMPERATURE,
+        ata.PROPERTY_FAN_SPEED,
+        ata.PROPERTY_VANE_HORIZONTAL,
+        ata.PROPERTY_VANE_VERTICAL,
+    }
+)
+ATW_ZONE_PROPERTIES = {
+    1: frozenset(
+        {
+            PROPERTY_POWER,
+            PROPERTY_ZONE_1_OPERATION_MODE,
+            PROPERTY_ZONE_1_TARGET_TEMPERATURE,
+        }
+    ),
+    2: frozenset(
+        {
+            PROPERTY_POWER,
+            PROPERTY_ZONE_2_OPERATION_MODE,
+            PROPERTY_ZONE_2_TARGET_TEMPERATURE,
+        }
+    ),
 }
-ATA_HVAC_MODE_REVERSE_LOOKUP = {v: k for k, v in ATA_HVAC_MODE_LOOKUP.items()}
-
 
-ATA_HVAC_VVANE_LOOKUP = {
-    ata.V_VANE_POSITION_AUTO: VertSwingModes.Auto,
-    ata.V_VANE_POSITION_1: VertSwingModes.Top,
-    ata.V_VANE_POSITION_2: VertSwingModes.MiddleTop,
-    ata.V_VANE_POSITION_3: VertSwingModes.Middle,
-    ata.V_VANE_POSITION_4: VertSwingModes.MiddleBottom,
-    ata.V_VANE_POSITION_5: VertSwingModes.Bottom,
-    ata.V_VANE_POSITION_SWING: VertSwingModes.Swing,
-}
 ATA_HVAC_VVANE_REVERSE_LOOKUP = {v: k for k, v in ATA_HVAC_VVANE_LOOKUP.items()}
 
 
-ATA_HVAC_HVANE_LOOKUP = {
-    ata.H_VANE_POSITION_AUTO: HorSwingModes.Auto,
-    ata.H_VANE_POSITION_1: HorSwingModes.Left,
-    ata.H_VANE_POSITION_2: HorSwingModes.MiddleLeft,
-    ata.H_VANE_POSITION_3: HorSwingModes.Middle,
-    ata.H_VANE_POSITION_4: HorSwingModes.MiddleRight,
-    ata.H_VANE_POSITION_5: HorSwingModes.Right,
-    ata.H_VANE_POSITION_SPLIT: HorSwingModes.Split,
-    ata.H_VANE_POSITION_SWING: HorSwingModes.Swing,
-}
 ATA_HVAC_HVANE_REVERSE_LOOKUP = {v: k for k, v in ATA_HVAC_HVANE_LOOKUP.items()}
 
 
@@ -98,25 +97,29 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     """Set up MelCloud device climate based on config_entry."""
-    mel_devices = hass.data[DOMAIN][entry.entry_id].get(MEL_DEVICES)
-    entities = []
-    entities.extend(
-        [
-            AtaDeviceClimate(mel_device, mel_device.device)
-            for mel_device in mel_devices[DEVICE_TYPE_ATA]
-        ]
-    )
-    entities.extend(
-        [
-            AtwDeviceZoneClimate(mel_device, mel_device.device, zone)
-            for mel_device in mel_devices[DEVICE_TYPE_ATW]
-            for zone in mel_device.device.zones
-        ]
-    )
-    async_add_entities(entities, True)
+
+    @callback
+    def _async_add_devices(mel_devices: dict[str, list[MelCloudDevice]]) -> None:
+        entities = []
+        entities.extend(
+            [
+                AtaDeviceClimate(mel_device, mel_device.device)
+                for mel_device in mel_devices[DEVICE_TYPE_ATA]
+            ]
+        )
+        entities.extend(
+            [
+                AtwDeviceZoneClimate(mel_device, mel_device.device, zone)
+                for mel_device in mel_devices[DEVICE_TYPE_ATW]
+                for zone in mel_device.device.zones
+            ]
+        )
+        async_add_entities(entities)
+
+    async_setup_device_entities(hass, entry, _async_add_devices)
 
 
-class MelCloudClimate(CoordinatorEntity, ClimateEntity):
+class MelCloudClimate(MelCloudEntity, ClimateEntity):
     """Base climate device."""
 
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
@@ -124,58 +127,74 @@ class MelCloudClimate(CoordinatorEntity, ClimateEntity):
     _attr_name = None
     _enable_turn_on_off_backwards_compatibility = False
 
-    def __init__(self, device: MelCloudDevice):
-        """Initialize the climate."""
-        super().__init__(device.coordinator)
+    def __init__(self, device: MelCloudDevice, properties: frozenset[str]):
+        """Initialize the climate, updated by writes of the given properties."""
+        super().__init__(device.coordinator, properties)
         self.api = device
         self._base_device = self.api.device
 
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return the device data and capabilities the climate reads."""
+        return (*super()._state_fingerprint(), self.api.capabilities)
+
     @property
     def target_temperature_step(self) -> float | None:
         """Return the supported step of target temperature."""
-        return self._base_device.temperature_increment
+        return self.api.capabilities.temperature_increment
 
 
 class AtaDeviceClimate(MelCloudClimate):
     """Air-to-Air climate device."""
 
+    _data_fields = (
+        "power",
+        "operation_mode",
+        "room_temperature",
+        "target_temperature",
+        "fan_speed",
+        "vane_horizontal",
+        "vane_vertical",
+    )
+
     def __init__(self, device: MelCloudDevice, ata_device: AtaDevice):
         """Initialize the climate."""
-        super().__init__(device)
+        super().__init__(device, ATA_PROPERTIES)
         self._device = ata_device
         self._attr_unique_id = f"{ata_device.serial}-{ata_device.mac}"
         self._attr_device_info = device.device_info
 
-        self._support_ver_swing = len(self._device.vane_vertical_positions) > 0
-        self._support_hor_swing = len(self._device.vane_horizontal_positions) > 0
-        self._set_hor_swing = self._support_hor_swing and not self._support_ver_swing
+        capabilities = self.capabilities
+        self._set_hor_swing = bool(
+            capabilities.vane_horizontal_positions
+            and not capabilities.vane_vertical_positions
+        )
+
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return the device data read, with the swing mode shown."""
+        return (*super()._state_fingerprint(), self._set_hor_swing)
+
+    @property
+    def capabilities(self) -> AtaCapabilities:
+        """Return the capability table of the device."""
+        return self.api.capabilities
 
     @property
     def supported_features(self) -> ClimateEntityFeature:
         """Return the list of supported features."""
-        supp_feature = (
-            ClimateEntityFeature.FAN_MODE
-            | ClimateEntityFeature.TARGET_TEMPERATURE
-            | ClimateEntityFeature.TURN_OFF
-            | ClimateEntityFeature.TURN_ON
-        )
-        if self._support_ver_swing or self._support_hor_swing:
-            supp_feature |= ClimateEntityFeature.SWING_MODE
-
-        return supp_feature
+        return self.capabilities.supported_features
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return the optional state attributes with device specific additions."""
         attr = {}
 
-        vane_horizontal = self._device.vane_horizontal
+        vane_horizontal = self.coordinator.data.vane_horizontal
         if vane_horizontal:
             attr.update(
                 {ATTR_VANE_HORIZONTAL: ATA_HVAC_HVANE_LOOKUP.get(vane_horizontal, None)}
             )
 
-        vane_vertical = self._device.vane_vertical
+        vane_vertical = self.coordinator.data.vane_vertical
         if vane_vertical:
             attr.update(
                 {ATTR_VANE_VERTICAL: ATA_HVAC_VVANE_LOOKUP.get(vane_vertical, None)}
@@ -185,8 +204,8 @@ class AtaDeviceClimate(MelCloudClimate):
     @property
     def hvac_mode(self) -> HVACMode:
         """Return hvac operation ie. heat, cool mode."""
-        op_mode = self._device.operation_mode
-        if not self._device.power or op_mode is None:
+        op_mode = self.coordinator.data.operation_mode
+        if not self.coordinator.data.power or op_mode is None:
             return HVACMode.OFF
         return ATA_HVAC_MODE_LOOKUP.get(op_mode, HVACMode.AUTO)
 
@@ -215,19 +234,17 @@ class AtaDeviceClimate(MelCloudClimate):
     @property
     def hvac_modes(self) -> list[HVACMode]:
         """Return the list of available hvac operation modes."""
-        return [HVACMode.OFF] + [
-            ATA_HVAC_MODE_LOOKUP.get(mode) for mode in self._device.operation_modes
-        ]
+        return self.capabilities.hvac_modes
 
     @property
     def current_temperature(self) -> float | None:
         """Return the current temperature."""
-        return self._device.room_temperature
+        return self.coordinator.data.room_temperature
 
     @property
     def target_temperature(self) -> float | None:
         """Return the temperature we try to reach."""
-        return self._device.target_temperature
+        return self.coordinator.data.target_temperature
 
     async def async_set_temperature(self, **kwargs) -> None:
         """Set new target temperature."""
@@ -244,7 +261,7 @@ class AtaDeviceClimate(MelCloudClimate):
     @property
     def fan_mode(self) -> str | None:
         """Return the fan setting."""
-        return self._device.fan_speed
+        return self.coordinator.data.fan_speed
 
     async def async_set_fan_mode(self, fan_mode: str) -> None:
         """Set new target fan mode."""
@@ -253,18 +270,19 @@ class AtaDeviceClimate(MelCloudClimate):
     @property
     def fan_modes(self) -> list[str] | None:
         """Return the list of available fan modes."""
-        return self._device.fan_speeds
+        return self.capabilities.fan_modes
 
     @property
     def swing_mode(self) -> str | None:
         """Return the swing mode setting."""
         swing = None
-        if self._set_hor_swing and self._support_hor_swing:
-            mode = self._device.vane_horizontal
+        capabilities = self.capabilities
+        if self._set_hor_swing and capabilities.vane_horizontal_positions:
+            mode = self.coordinator.data.vane_horizontal
             if mode is not None:
                 swing = ATA_HVAC_HVANE_LOOKUP.get(mode)
-        elif self._support_ver_swing:
-            mode = self._device.vane_vertical
+        elif capabilities.vane_vertical_positions:
+            mode = self.coordinator.data.vane_vertical
             if mode is not None:
                 swing = ATA_HVAC_VVANE_LOOKUP.get(mode)
 
@@ -283,12 +301,12 @@ class AtaDeviceClimate(MelCloudClimate):
                 raise ValueError(f"Invalid swing_mode [{swing_mode}].")
 
             is_hor_swing = True
-            curr_mode = self._device.vane_horizontal
-            valid_swing_modes = self._device.vane_horizontal_positions
+            curr_mode = self.coordinator.data.vane_horizontal
+            valid_swing_modes = self.capabilities.vane_horizontal_positions
             props = {ata.PROPERTY_VANE_HORIZONTAL: operation_mode}
         else:
-            curr_mode = self._device.vane_vertical
-            valid_swing_modes = self._device.vane_vertical_positions
+            curr_mode = self.coordinator.data.vane_vertical
+            valid_swing_modes = self.capabilities.vane_vertical_positions
             props = {ata.PROPERTY_VANE_VERTICAL: operation_mode}
 
         if operation_mode not in valid_swing_modes:
@@ -301,14 +319,7 @@ class AtaDeviceClimate(MelCloudClimate):
     @property
     def swing_modes(self) -> list[str] | None:
         """Return the list of available swing modes."""
-        list_modes = [
-            ATA_HVAC_VVANE_LOOKUP.get(mode)
-            for mode in self._device.vane_vertical_positions
-        ]
-        for mode in self._device.vane_horizontal_positions:
-            list_modes.append(ATA_HVAC_HVANE_LOOKUP.get(mode))
-
-        return list_modes
+        return self.capabilities.swing_modes
 
     async def async_turn_on(self) -> None:
         """Turn the entity on."""
@@ -321,20 +332,16 @@ class AtaDeviceClimate(MelCloudClimate):
     @property
     def min_temp(self) -> float:
         """Return the minimum temperature."""
-        min_value = self._device.target_temperature_min
-        if min_value is not None:
-            return min_value
-
-        return DEFAULT_MIN_TEMP
+        return self.capabilities.temperature_range(
+            self.coordinator.data.operation_mode
+        )[0]
 
     @property
     def max_temp(self) -> float:
         """Return the maximum temperature."""
-        max_value = self._device.target_temperature_max
-        if max_value is not None:
-            return max_value
-
-        return DEFAULT_MAX_TEMP
+        return self.capabilities.temperature_range(
+            self.coordinator.data.operation_mode
+        )[1]
 
 
 class AtwDeviceZoneClimate(MelCloudClimate):
@@ -346,19 +353,36 @@ class AtwDeviceZoneClimate(MelCloudClimate):
 
     def __init__(self, device: MelCloudDevice, atw_device: AtwDevice, atw_zone: Zone):
         """Initialize the climate."""
-        super().__init__(device)
+        super().__init__(device, ATW_ZONE_PROPERTIES[atw_zone.zone_index])
         self._device = atw_device
         self._zone = atw_zone
 
         self._attr_unique_id = f"{atw_device.serial}-{atw_zone.zone_index}"
         self._attr_device_info = device.zone_device_info(atw_zone)
 
+    @property
+    def _zone_data(self) -> ZoneData | None:
+        """Return the state of the zone."""
+        return self.coordinator.data.zone(self._zone.zone_index)
+
+    @property
+    def available(self) -> bool:
+        """Return if the device snapshot includes the zone."""
+        return super().available and self._zone_data is not None
+
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return the zone and device data the climate reads."""
+        if not self.available:
+            return (False,)
+        data = self.coordinator.data
+        return (True, self._zone_data, data.power, data.status, self.api.capabilities)
+
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the optional state attributes with device specific additions."""
         data = {
             ATTR_STATUS: ATW_ZONE_HVAC_MODE_LOOKUP.get(
-                self._zone.status, self._zone.status
+                self._zone_data.status, self._zone_data.status
             )
         }
         return data
@@ -366,8 +390,8 @@ class AtwDeviceZoneClimate(MelCloudClimate):
     @property
     def hvac_mode(self) -> HVACMode:
         """Return hvac operation ie. heat, cool mode."""
-        mode = self._zone.operation_mode
-        if not self._device.power or mode is None:
+        mode = self._zone_data.operation_mode
+        if not self.coordinator.data.power or mode is None:
             return HVACMode.OFF
         return ATW_ZONE_HVAC_MODE_LOOKUP.get(mode, HVACMode.OFF)
 
@@ -397,22 +421,26 @@ class AtwDeviceZoneClimate(MelCloudClimate):
     @property
     def hvac_action(self) -> HVACAction | None:
         """Return the current running hvac operation."""
-        if not self._device.power:
+        if not self.coordinator.data.power:
             return HVACAction.OFF
-        return ATW_ZONE_HVAC_ACTION_LOOKUP.get(self._device.status)
+        return ATW_ZONE_HVAC_ACTION_LOOKUP.get(self.coordinator.data.status)
 
     @property
     def current_temperature(self) -> float | None:
         """Return the current temperature."""
-        return self._zone.room_temperature
+        return self._zone_data.room_temperature
 
     @property
     def target_temperature(self) -> float | None:
         """Return the temperature we try to reach."""
-        return self._zone.target_temperature
+        return self._zone_data.target_temperature
 
     async def async_set_temperature(self, **kwargs) -> None:
         """Set new target temperature."""
-        await self._zone.set_target_temperature(
-            kwargs.get("temperature", self.target_temperature)
+        if self._zone.zone_index == 1:
+            prop = PROPERTY_ZONE_1_TARGET_TEMPERATURE
+        else:
+            prop = PROPERTY_ZONE_2_TARGET_TEMPERATURE
+        await self.api.async_set(
+            {prop: kwargs.get(ATTR_TEMPERATURE, self.target_temperature)}
         )
@@ -26,8 +26,24 @@ from homeassistant.helpers.schema_config_entry_flow import (
 
 from . import MELCLOUD_SCHEMA, MelCloudAuthentication
 from .const import (  # pylint: disable=unused-import
+    CONF_ADAPTIVE_POLLING,
+    CONF_CONF_REFRESH_INTERVAL,
+    CONF_DEDICATED_SESSION,
     CONF_LANGUAGE,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_REQUEST_RATE,
+    CONF_SET_DEBOUNCE,
+    CONF_SETUP_CONCURRENCY,
+    CONF_SETUP_TIMEOUT,
+    DEFAULT_CONF_REFRESH_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_REQUEST_RATE,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SET_DEBOUNCE,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_SETUP_TIMEOUT,
     DOMAIN,
     LANGUAGES,
 )
@@ -42,10 +58,40 @@ async def get_options_schema(handler: SchemaCommonFlowHandler) -> vol.Schema:
             vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(
                 vol.Coerce(int), vol.Clamp(min=60, max=1800)
             ),
+            vol.Optional(CONF_ADAPTIVE_POLLING, default=False): bool,
+            vol.Optional(
+                CONF_MIN_SCAN_INTERVAL, default=DEFAULT_MIN_SCAN_INTERVAL
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=30, max=1800)),
+            vol.Optional(
+                CONF_MAX_SCAN_INTERVAL, default=DEFAULT_MAX_SCAN_INTERVAL
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=60, max=7200)),
+            vol.Optional(CONF_REQUEST_RATE, default=DEFAULT_REQUEST_RATE): vol.All(
+                vol.Coerce(int), vol.Clamp(min=6, max=600)
+            ),
+            vol.Optional(
+                CONF_CONF_REFRESH_INTERVAL, default=DEFAULT_CONF_REFRESH_INTERVAL
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=30, max=1440)),
+            vol.Optional(CONF_SET_DEBOUNCE, default=DEFAULT_SET_DEBOUNCE): vol.All(
+                vol.Coerce(float), vol.Clamp(min=0, max=10)
+            ),
+            vol.Optional(CONF_DEDICATED_SESSION, default=False): bool,
+            vol.Optional(
+                CONF_SETUP_CONCURRENCY, default=DEFAULT_SETUP_CONCURRENCY
+            ): vol.All(vol.Coerce(int), vol.Clamp(min=1, max=20)),
+            vol.Optional(CONF_SETUP_TIMEOUT, default=DEFAULT_SETUP_TIMEOUT): vol.All(
+                vol.Coerce(int), vol.Clamp(min=5, max=300)
+            ),
         }
     )
 
 
+REAUTH_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_PASSWORD): str,
+        vol.Required(CONF_LANGUAGE, default="EN"): vol.In(LANGUAGES.keys()),
+    }
+)
+
 OPTIONS_FLOW = {
     "init": SchemaFlowFormStep(get_options_schema),
 }
@@ -109,6 +155,45 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         return await self._create_client(user_input)
 
+    async def async_step_reauth(self, entry_data):
+        """Handle a token rejected by MELCloud."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        """Login again to renew the token of the account."""
+        entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        errors = {}
+        if user_input is not None:
+            try:
+                async with timeout(10):
+                    token = await self._test_authorization(
+                        entry.unique_id,
+                        user_input[CONF_PASSWORD],
+                        user_input[CONF_LANGUAGE],
+                    )
+            except ClientResponseError as err:
+                if err.status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+                    errors["base"] = "invalid_auth"
+                else:
+                    errors["base"] = "cannot_connect"
+            except (asyncio.TimeoutError, ClientError):
+                errors["base"] = "cannot_connect"
+            else:
+                if token:
+                    # The running entry picks up the new token, no reload needed.
+                    self.hass.config_entries.async_update_entry(
+                        entry, data={**entry.data, CONF_TOKEN: token}
+                    )
+                    return self.async_abort(reason="reauth_successful")
+                errors["base"] = "invalid_auth"
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=REAUTH_SCHEMA,
+            errors=errors,
+            description_placeholders={"username": entry.unique_id},
+        )
+
     async def async_step_import(self, import_config):
         """Import a config entry."""
         username = import_config[CONF_USERNAME]
@@ -1,15 +1,55 @@
 """Constants for the MELCloud Climate integration."""
 
+from datetime import timedelta
+
 DOMAIN = "melcloud_custom"
 MEL_DEVICES = "mel_devices"
+MEL_ACCOUNT = "mel_account"
+MEL_PLATFORMS = "mel_platforms"
+SIGNAL_NEW_DEVICES = f"{DOMAIN}_new_devices_{{}}"
 
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_CONF_REFRESH_INTERVAL = "conf_refresh_interval"
+CONF_DEDICATED_SESSION = "dedicated_session"
 CONF_LANGUAGE = "language"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_REQUEST_RATE = "request_rate"
+CONF_SET_DEBOUNCE = "set_debounce"
+CONF_SETUP_CONCURRENCY = "setup_concurrency"
+CONF_SETUP_TIMEOUT = "setup_timeout"
 
+ATTR_BUILDING_ID = "building_id"
+ATTR_POWER = "power"
 ATTR_STATUS = "status"
 ATTR_VANE_VERTICAL = "vane_vertical"
 ATTR_VANE_HORIZONTAL = "vane_horizontal"
 
 DEFAULT_SCAN_INTERVAL = 900
+DEFAULT_MIN_SCAN_INTERVAL = 60
+DEFAULT_MAX_SCAN_INTERVAL = 3600
+DEFAULT_REQUEST_RATE = 60
+REQUEST_BURST = 30
+DEFAULT_SET_DEBOUNCE = 2
+DEFAULT_CONF_REFRESH_INTERVAL = 360
+DEFAULT_SETUP_CONCURRENCY = 4
+DEFAULT_SETUP_TIMEOUT = 30
+GROUP_SET_CONCURRENCY = 8
+TOKEN_RENEW_TIMEOUT = timedelta(minutes=5)
+SESSION_LIMIT_PER_HOST = 8
+SESSION_KEEPALIVE_TIMEOUT = 90
+SESSION_DNS_CACHE_TTL = 300
+SESSION_CONNECT_TIMEOUT = 10
+SESSION_READ_TIMEOUT = 30
+BREAKER_THRESHOLD = 3
+BREAKER_BACKOFF = timedelta(seconds=30)
+BREAKER_MAX_BACKOFF = timedelta(minutes=15)
+FAILED_POLLS_UNAVAILABLE = 2
+FAST_FOLLOW_DELAYS = (5, 15, 45)
+ENERGY_HISTORY = timedelta(days=7)
+ENERGY_UPDATE_INTERVAL = timedelta(hours=1)
+HISTORY_BACKFILL_MAX = timedelta(days=7)
+HISTORY_BACKFILL_CHUNK = timedelta(days=1)
 
 
 class HorSwingModes:
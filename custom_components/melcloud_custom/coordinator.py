@@ -0,0 +1,404 @@
+"""Account-wide polling coordinator for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable
+from datetime import timedelta
+import json
+import logging
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .api import MelCloudClient
+from .breaker import CircuitOpenError
+from .capabilities import CONF_CAPABILITY_KEYS, DEVICE_CAPABILITY_KEYS
+from .const import (
+    DEFAULT_CONF_REFRESH_INTERVAL,
+    DOMAIN,
+    FAILED_POLLS_UNAVAILABLE,
+)
+from .data import AtaDeviceData, AtwDeviceData
+
+_LOGGER = logging.getLogger(__name__)
+
+# ListDevices "Device" keys mapped to the Device/Get state keys used by pymelcloud
+ATA_LIST_STATE_KEYS = {
+    "Power": "Power",
+    "RoomTemperature": "RoomTemperature",
+    "SetTemperature": "SetTemperature",
+    "OperationMode": "OperationMode",
+    "FanSpeed": "SetFanSpeed",
+    "NumberOfFanSpeeds": "NumberOfFanSpeeds",
+    "VaneHorizontalDirection": "VaneHorizontal",
+    "VaneVerticalDirection": "VaneVertical",
+}
+ATW_LIST_STATE_KEYS = {
+    key: key
+    for key in (
+        "Power",
+        "OperationMode",
+        "RoomTemperatureZone1",
+        "RoomTemperatureZone2",
+        "SetTemperatureZone1",
+        "SetTemperatureZone2",
+        "OperationModeZone1",
+        "OperationModeZone2",
+        "IdleZone1",
+        "IdleZone2",
+        "ProhibitZone1",
+        "ProhibitZone2",
+        "TankWaterTemperature",
+        "SetTankWaterTemperature",
+        "ForcedHotWaterMode",
+        "OutdoorTemperature",
+        "HolidayMode",
+    )
+}
+
+
+# ListDevices "Device" keys hinting at a change only visible with Device/Get
+REFRESH_HINT_KEYS = ("HasError", "ErrorCode", "Offline")
+
+
+def refresh_hints(device_conf: dict[str, Any]) -> tuple[Any, ...]:
+    """Return the values of a device list entry hinting at a state change."""
+    device = device_conf.get("Device", {})
+    return tuple(device.get(key) for key in REFRESH_HINT_KEYS)
+
+
+# Device/Get state keys changed by the user, the other ones drift on their own
+ACTIVITY_KEYS = (
+    "Power",
+    "OperationMode",
+    "SetTemperature",
+    "SetFanSpeed",
+    "VaneHorizontal",
+    "VaneVertical",
+    "SetTemperatureZone1",
+    "SetTemperatureZone2",
+    "OperationModeZone1",
+    "OperationModeZone2",
+    "SetTankWaterTemperature",
+    "ForcedHotWaterMode",
+)
+
+
+def activity_signature(state: dict[str, Any] | None) -> tuple[Any, ...]:
+    """Return the values of a device state showing user activity."""
+    state = state or {}
+    return tuple(state.get(key) for key in ACTIVITY_KEYS)
+
+
+# ListDevices "Device" keys read by the entities besides the state keys
+DEVICE_CONF_KEYS = (
+    "DeviceName",
+    "FlowTemperature",
+    "ReturnTemperature",
+    "HasThermostatZone1",
+    "HasEnergyConsumedMeter",
+    "HasWideVane",
+)
+
+
+# ListDevices "Device" keys changing at nearly every poll, with the key of
+# the sensor showing each of them
+METER_KEYS = {"WifiSignalStrength": "wifi_signal", "CurrentEnergyConsumed": "energy"}
+
+
+def meter_values(device_conf: dict[str, Any]) -> dict[str, Any]:
+    """Return the values of a device list entry shown by their own sensor."""
+    device = device_conf.get("Device", {})
+    return {sensor_key: device.get(key) for key, sensor_key in METER_KEYS.items()}
+
+
+def _list_state_keys(device: dict[str, Any]) -> dict[str, str]:
+    """Return the state keys listed in the "Device" part of a list entry."""
+    if device.get("DeviceType") == 1:
+        return ATW_LIST_STATE_KEYS
+    return ATA_LIST_STATE_KEYS
+
+
+def device_conf_hash(device_conf: dict[str, Any]) -> int:
+    """Return a hash of a device list entry, to detect changes between polls.
+
+    Only the values the device reads are hashed, except the meter values
+    compared on their own. The other ones, such as the time stamps, change
+    at every poll and are not used.
+    """
+    device = device_conf.get("Device", {})
+    return hash(
+        json.dumps(
+            [
+                [device.get(key) for key in _list_state_keys(device)],
+                [device.get(key) for key in REFRESH_HINT_KEYS],
+                [device.get(key) for key in DEVICE_CONF_KEYS],
+                [device.get(key) for key in DEVICE_CAPABILITY_KEYS],
+                [device_conf.get(key) for key in CONF_CAPABILITY_KEYS],
+            ],
+            separators=(",", ":"),
+        )
+    )
+
+
+def state_from_device_conf(
+    device_conf: dict[str, Any], state: dict[str, Any] | None
+) -> dict[str, Any]:
+    """Return a device state updated with the values of a device list entry."""
+    device = device_conf.get("Device", {})
+    if state:
+        new_state = dict(state)
+    else:
+        new_state = {
+            "DeviceID": device_conf.get("DeviceID"),
+            "DeviceType": device.get("DeviceType"),
+            "EffectiveFlags": 0,
+        }
+    for list_key, state_key in _list_state_keys(device).items():
+        if list_key in device:
+            new_state[state_key] = device[list_key]
+    return new_state
+
+
+class AdaptivePolling:
+    """Adapt the polling interval to the activity of the devices.
+
+    Every device gets its own interval: it is reset to the minimum when the
+    device is operated (power, mode, setpoint, fan or vanes changed), then
+    doubled at every idle poll up to the scan interval while the device is
+    powered on, or up to the maximum while it is off. Measured temperatures
+    drifting do not count as activity, or some device of a large account
+    would always keep it at the minimum. The account is polled at the
+    shortest device interval.
+    """
+
+    def __init__(
+        self, scan_interval: float, min_interval: float, max_interval: float
+    ) -> None:
+        """Initialize the adaptive polling, intervals are in seconds."""
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.scan_interval = min(max(scan_interval, min_interval), self.max_interval)
+        self.intervals: dict[int, float] = {}
+
+    def update(self, device_id: int, power: bool | None, active: bool) -> float:
+        """Update and return the interval of a device after a poll."""
+        if active:
+            interval = self.min_interval
+        else:
+            limit = self.scan_interval if power else self.max_interval
+            interval = self.intervals.get(device_id, self.scan_interval)
+            interval = min(limit, interval * 2)
+        self.intervals[device_id] = interval
+        return interval
+
+    @property
+    def interval(self) -> timedelta:
+        """Return the account polling interval."""
+        return timedelta(
+            seconds=min(self.intervals.values(), default=self.scan_interval)
+        )
+
+
+class MelCloudDeviceCoordinator(
+    DataUpdateCoordinator[AtaDeviceData | AtwDeviceData | None]
+):
+    """Coordinator of a single device, fed by the account coordinator.
+
+    The data is an immutable snapshot of the device state. Entities register
+    with the set of writable properties they expose as listener context, so
+    the result of a write only updates the entities showing the written
+    properties.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the device coordinator."""
+        super().__init__(*args, **kwargs)
+        self.state_writes: Counter[str] = Counter()
+
+    @callback
+    def async_update_listeners_for(
+        self, data: AtaDeviceData | AtwDeviceData, properties: Iterable[str]
+    ) -> None:
+        """Set new data and update the listeners showing some properties."""
+        self.data = data
+        properties = set(properties)
+        for update_callback, context in list(self._listeners.values()):
+            if context and not properties.isdisjoint(context):
+                update_callback()
+
+
+class MelCloudAccountCoordinator(DataUpdateCoordinator[dict[int, dict[str, Any]]]):
+    """Poll all the devices of a MELCloud account with a single request.
+
+    The device list returned by MELCloud already carries the state of every
+    device, so each cycle is fanned out to the device coordinators instead of
+    polling every device on its own. The full state of a device is only
+    fetched when the device list hints at a change, or when the last full
+    refresh is older than the configuration refresh interval.
+
+    A single failed poll leaves the devices untouched, a few consecutive
+    ones make all the devices unavailable with the error of the last one.
+    When the account circuit breaker opens all the devices become
+    unavailable at once, and polling is suspended until the backoff time
+    elapses: the next poll is the probe bringing them back together.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: MelCloudClient,
+        update_interval: timedelta,
+    ) -> None:
+        """Initialize the account coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}-account",
+            update_interval=update_interval,
+        )
+        self.client = client
+        self.scan_interval = update_interval
+        self.mel_devices: dict[str, list[Any]] = {}
+        self.adaptive_polling: AdaptivePolling | None = None
+        self.conf_refresh_interval = timedelta(minutes=DEFAULT_CONF_REFRESH_INTERVAL)
+        self.state_writes: Counter[str] = Counter()
+        self._cycle_start: float | None = None
+        self._failed_polls = 0
+
+    @staticmethod
+    def index_device_confs(
+        device_confs: list[dict[str, Any]],
+    ) -> dict[int, dict[str, Any]]:
+        """Index a device list by device ID."""
+        return {conf.get("DeviceID"): conf for conf in device_confs}
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device description of the account."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self.config_entry.entry_id)},
+            entry_type=DeviceEntryType.SERVICE,
+            manufacturer="Mitsubishi Electric",
+            model="MELCloud account",
+            name=f"MELCloud {self.config_entry.title}",
+        )
+
+    @property
+    def entity_state_writes(self) -> Counter[str]:
+        """Return the state writes of all the entities of the account."""
+        state_writes = Counter(self.state_writes)
+        for mel_devices_type in self.mel_devices.values():
+            for mel_device in mel_devices_type:
+                state_writes.update(mel_device.coordinator.state_writes)
+        return state_writes
+
+    async def _async_update_data(self) -> dict[int, dict[str, Any]]:
+        """Fetch the state of all the devices of the account."""
+        self._cycle_start = monotonic()
+        try:
+            device_confs = await self.client.fetch_device_confs()
+        except Exception as ex:
+            # Listeners are only notified of the first failure of a series
+            self._failed_polls += 1
+            if self._failed_polls >= FAILED_POLLS_UNAVAILABLE:
+                self.async_set_devices_error(ex)
+            raise
+        self._failed_polls = 0
+        return self.index_device_confs(device_confs)
+
+    @callback
+    def async_set_update_interval(self, update_interval: timedelta) -> None:
+        """Change the polling interval and reschedule the next poll."""
+        self.update_interval = update_interval
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    def async_spread_refresh_phases(self) -> None:
+        """Spread the safety net refreshes of the devices over the interval.
+
+        Phases follow the device IDs, so they do not change between restarts.
+        """
+        mel_devices = sorted(
+            (
+                mel_device
+                for mel_devices_type in self.mel_devices.values()
+                for mel_device in mel_devices_type
+            ),
+            key=lambda mel_device: mel_device.device_id,
+        )
+        for index, mel_device in enumerate(mel_devices):
+            mel_device.refresh_phase = index / len(mel_devices)
+
+    @callback
+    def async_set_scan_interval(self, scan_interval: timedelta) -> None:
+        """Change the configured polling interval."""
+        self.scan_interval = scan_interval
+        if not self.client.breaker.is_open:
+            self.async_set_update_interval(scan_interval)
+
+    @callback
+    def async_breaker_changed(self) -> None:
+        """Suspend or resume polling when the circuit breaker opens or closes."""
+        breaker = self.client.breaker
+        if not breaker.is_open:
+            adaptive = self.adaptive_polling
+            self.async_set_update_interval(
+                adaptive.interval if adaptive else self.scan_interval
+            )
+            return
+
+        if breaker.open_count == 1:
+            self.async_set_devices_error(CircuitOpenError("MELCloud unreachable"))
+        # The coordinator may schedule a refresh up to a second in advance
+        self.async_set_update_interval(timedelta(seconds=breaker.retry_in + 1))
+
+    @callback
+    def async_set_devices_error(self, err: Exception) -> None:
+        """Mark all the devices as failed."""
+        for mel_devices_type in self.mel_devices.values():
+            for mel_device in mel_devices_type:
+                mel_device.async_set_update_error(err)
+
+    @callback
+    def async_fan_out(self) -> None:
+        """Propagate the result of the last poll to every device.
+
+        Devices whose list entry did not change since the previous poll are
+        skipped, together with their entities. The poll cycle is measured
+        from the request up to the end of the fan out to the entities.
+        """
+        adaptive = self.adaptive_polling if self.last_update_success else None
+        if self.last_update_success:
+            for mel_devices_type in self.mel_devices.values():
+                for mel_device in mel_devices_type:
+                    if device_conf := self.data.get(mel_device.device_id):
+                        activity = mel_device.activity
+                        mel_device.async_apply_device_conf(device_conf)
+                        if adaptive:
+                            adaptive.update(
+                                mel_device.device_id,
+                                mel_device.device.power,
+                                mel_device.activity != activity,
+                            )
+                        if mel_device.refresh_due(self.conf_refresh_interval):
+                            mel_device.async_track_refresh(
+                                self.hass.async_create_background_task(
+                                    mel_device.coordinator.async_refresh(),
+                                    f"{DOMAIN} refresh {mel_device.name}",
+                                )
+                            )
+
+        if adaptive and (interval := adaptive.interval) != self.update_interval:
+            _LOGGER.debug("Adaptive polling interval set to %s", interval)
+            self.async_set_update_interval(interval)
+
+        if self._cycle_start is not None:
+            self.client.metrics.cycles.observe(monotonic() - self._cycle_start)
+            self._cycle_start = None
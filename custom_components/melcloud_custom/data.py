@@ -0,0 +1,129 @@
+"""Device data snapshots for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from pymelcloud import AtaDevice, AtwDevice, Device
+from pymelcloud.atw_device import ZONE_STATUS_UNKNOWN, Zone
+
+
+def _conf_device(device: Device) -> dict[str, Any]:
+    """Return the "Device" section of the device configuration."""
+    if device._device_conf is None:
+        return {}
+    return device._device_conf.get("Device", {})
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneData:
+    """State of an Air-to-Water zone."""
+
+    zone_index: int
+    status: str
+    operation_mode: str | None
+    room_temperature: float | None
+    target_temperature: float | None
+    flow_temperature: float | None
+    return_temperature: float | None
+
+    @classmethod
+    def from_zone(cls, zone: Zone, conf_device: dict[str, Any]) -> ZoneData:
+        """Read the state of a zone."""
+        try:
+            operation_mode = zone.operation_mode
+            status = zone.status
+        except ValueError:
+            # Zone operation mode not reported yet
+            operation_mode = None
+            status = ZONE_STATUS_UNKNOWN
+        return cls(
+            zone_index=zone.zone_index,
+            status=status,
+            operation_mode=operation_mode,
+            room_temperature=zone.room_temperature,
+            target_temperature=zone.target_temperature,
+            flow_temperature=conf_device.get("FlowTemperature"),
+            return_temperature=conf_device.get("ReturnTemperature"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class AtaDeviceData:
+    """State of an Air-to-Air device."""
+
+    power: bool | None
+    operation_mode: str
+    room_temperature: float | None
+    target_temperature: float | None
+    fan_speed: str | None
+    vane_horizontal: str | None
+    vane_vertical: str | None
+    total_energy_consumed: float | None
+    wifi_signal: int | None
+    error_state: bool | None
+
+    @classmethod
+    def from_device(cls, device: AtaDevice) -> AtaDeviceData:
+        """Read the state of a device."""
+        conf_device = _conf_device(device)
+        return cls(
+            power=device.power,
+            operation_mode=device.operation_mode,
+            room_temperature=device.room_temperature,
+            target_temperature=device.target_temperature,
+            fan_speed=device.fan_speed,
+            vane_horizontal=device.vane_horizontal,
+            vane_vertical=device.vane_vertical,
+            total_energy_consumed=device.total_energy_consumed,
+            wifi_signal=conf_device.get("WifiSignalStrength"),
+            error_state=conf_device.get("HasError", False) if conf_device else None,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class AtwDeviceData:
+    """State of an Air-to-Water device and its zones."""
+
+    power: bool | None
+    status: str | None
+    operation_mode: str | None
+    tank_temperature: float | None
+    target_tank_temperature: float | None
+    outside_temperature: float | None
+    wifi_signal: int | None
+    error_state: bool | None
+    zones: tuple[ZoneData, ...]
+
+    @classmethod
+    def from_device(cls, device: AtwDevice) -> AtwDeviceData:
+        """Read the state of a device."""
+        conf_device = _conf_device(device)
+        return cls(
+            power=device.power,
+            status=device.status,
+            operation_mode=device.operation_mode,
+            tank_temperature=device.tank_temperature,
+            target_tank_temperature=device.target_tank_temperature,
+            outside_temperature=device.outside_temperature,
+            wifi_signal=conf_device.get("WifiSignalStrength"),
+            error_state=conf_device.get("HasError", False) if conf_device else None,
+            zones=tuple(
+                ZoneData.from_zone(zone, conf_device) for zone in device.zones or ()
+            ),
+        )
+
+    def zone(self, zone_index: int) -> ZoneData | None:
+        """Return the state of a zone."""
+        for zone in self.zones:
+            if zone.zone_index == zone_index:
+                return zone
+        return None
+
+
+def device_data(device: Device) -> AtaDeviceData | AtwDeviceData:
+    """Read the state of a device."""
+    if isinstance(device, AtwDevice):
+        return AtwDeviceData.from_device(device)
+    return AtaDeviceData.from_device(device)
@@ -0,0 +1,76 @@
+"""Diagnostics support for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, MEL_ACCOUNT
+from .coordinator import MelCloudAccountCoordinator
+
+TO_REDACT = {
+    CONF_PASSWORD,
+    CONF_TOKEN,
+    CONF_USERNAME,
+    "title",
+    "unique_id",
+    "Address1",
+    "Address2",
+    "AreaName",
+    "BuildingName",
+    "City",
+    "DeviceName",
+    "Email",
+    "FloorName",
+    "Latitude",
+    "LocalIPAddress",
+    "Location",
+    "Longitude",
+    "MacAddress",
+    "Name",
+    "Owner",
+    "OwnerEmail",
+    "OwnerID",
+    "OwnerName",
+    "Postcode",
+    "SerialNumber",
+    "Zone1Name",
+    "Zone2Name",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    mel_account: MelCloudAccountCoordinator = hass.data[DOMAIN][entry.entry_id][
+        MEL_ACCOUNT
+    ]
+    client = mel_account.client
+    scheduler = client.scheduler
+    adaptive = mel_account.adaptive_polling
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "polling": {
+            "update_interval_s": mel_account.update_interval.total_seconds(),
+            "last_update_success": mel_account.last_update_success,
+            "adaptive_intervals_s": adaptive.intervals if adaptive else None,
+        },
+        "scheduler": {
+            "requests_per_minute": scheduler.rate * 60,
+            "burst": scheduler.burst,
+            "tokens": scheduler.tokens,
+            "queue_depth": scheduler.queue_depth,
+            "requests": dict(scheduler.requests),
+            "queued": dict(scheduler.queued),
+        },
+        "breaker": client.breaker.as_dict(),
+        "metrics": client.metrics.as_dict(),
+        "state_writes": dict(mel_account.entity_state_writes),
+        "devices": async_redact_data(client.device_confs, TO_REDACT),
+    }
@@ -0,0 +1,248 @@
+"""Energy report ingestion for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientConnectionError, ClientResponseError
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN, ENERGY_HISTORY
+
+if TYPE_CHECKING:
+    from . import MelCloudDevice
+    from .coordinator import MelCloudAccountCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+CURSOR_SAVE_DELAY = 10
+
+# Operation modes reported with their own array of consumed energy
+ENERGY_MODES = ("Auto", "Cooling", "Dry", "Fan", "Heating", "HotWater", "Other")
+
+
+def energy_statistic_id(device_id: int) -> str:
+    """Return the statistic ID of the energy consumed by a device."""
+    return f"{DOMAIN}:energy_{device_id}"
+
+
+def _cursor_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the storage of the energy report cursor of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.energy")
+
+
+async def async_remove_energy_cursor(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the energy report cursor of a config entry."""
+    await _cursor_store(hass, entry_id).async_remove()
+
+
+def has_energy_meter(mel_device: MelCloudDevice) -> bool:
+    """Return True if a device measures the energy it consumes."""
+    device_conf = mel_device.device._device_conf or {}
+    return bool(device_conf.get("Device", {}).get("HasEnergyConsumedMeter"))
+
+
+def _hour_label(label: Any) -> int | None:
+    """Return the hour of the day of a report label, None if not an hour."""
+    if isinstance(label, str) and label.isdigit():
+        label = int(label)
+    if isinstance(label, int) and not isinstance(label, bool) and 0 <= label < 24:
+        return label
+    return None
+
+
+def hourly_consumption(
+    report: dict[str, Any], day: datetime
+) -> dict[datetime, float] | None:
+    """Return the energy consumed in every hour of a one day report.
+
+    The report has an array of values for every operation mode, all of them
+    labelled by the "Labels" array. Return None if the labels are not hours
+    of the day or do not match the arrays.
+    """
+    labels = report.get("Labels")
+    if not isinstance(labels, list) or not labels:
+        return None
+    hours = [_hour_label(label) for label in labels]
+    modes = [
+        values for mode in ENERGY_MODES if isinstance(values := report.get(mode), list)
+    ]
+    if None in hours or not modes or any(len(values) != len(hours) for values in modes):
+        return None
+
+    consumed: dict[datetime, float] = {}
+    for index, hour in enumerate(hours):
+        # Statistics start at the top of an hour, even for half-hour time zones
+        start = dt_util.as_utc(day.replace(hour=hour)).replace(minute=0)
+        consumed[start] = sum(values[index] or 0 for values in modes)
+    return consumed
+
+
+class EnergyReports:
+    """Import the MELCloud energy reports into long-term statistics.
+
+    A persisted cursor marks, for every device, the first hour not completely
+    imported, with the consumption summed up to it. Each run requests the days
+    from the cursor of a device to the current one, a day at a time: the
+    report of a single day is the only one labelled by hour. The cursor of a
+    device whose report is not recognised is left where it is, its hours are
+    requested again by the next run. Only the devices with an energy meter
+    are requested: an hourly run takes one request per metered device,
+    catching up after a downtime one more per day missed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        mel_account: MelCloudAccountCoordinator,
+    ) -> None:
+        """Initialize the energy reports of a config entry."""
+        self._hass = hass
+        self._mel_account = mel_account
+        self._store = _cursor_store(hass, entry_id)
+        self._lock = asyncio.Lock()
+        self.cursors: dict[str, datetime] = {}
+        self.sums: dict[str, float] = {}
+
+    async def async_load(self) -> None:
+        """Load the cursors saved by a previous run."""
+        if not (data := await self._store.async_load()):
+            return
+        self.sums = data.get("sums", {})
+        self.cursors = {
+            device_id: cursor
+            for device_id, value in data.get("cursors", {}).items()
+            if (cursor := dt_util.parse_datetime(value))
+        }
+        # Older versions saved a single cursor for all the devices
+        if cursor := dt_util.parse_datetime(data.get("cursor") or ""):
+            for device_id in self.sums:
+                self.cursors.setdefault(device_id, cursor)
+
+    def _cursor_data(self) -> dict[str, Any]:
+        """Return the cursors to be persisted."""
+        return {
+            "cursors": {
+                device_id: cursor.isoformat()
+                for device_id, cursor in self.cursors.items()
+            },
+            "sums": self.sums,
+        }
+
+    @staticmethod
+    def _report_days(cursor: datetime | None) -> tuple[datetime, list[datetime]]:
+        """Return the first hour to import and the local days covering it."""
+        today = dt_util.start_of_local_day()
+        oldest = today - ENERGY_HISTORY
+        if cursor is None or cursor < oldest:
+            cursor = oldest
+
+        days = []
+        day = dt_util.start_of_local_day(dt_util.as_local(cursor))
+        while day <= today:
+            days.append(day)
+            day += timedelta(days=1)
+        return dt_util.as_utc(cursor), days
+
+    async def async_update(self, *_: Any) -> None:
+        """Import the energy consumed since the cursor."""
+        async with self._lock:
+            try:
+                await self._async_update()
+            except (
+                asyncio.TimeoutError,
+                ClientConnectionError,
+                ClientResponseError,
+            ) as ex:
+                _LOGGER.warning("Unable to fetch the MELCloud energy reports: %s", ex)
+
+    async def _async_update(self) -> None:
+        """Fetch the reports of every metered device and import the statistics."""
+        hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        for mel_devices in self._mel_account.mel_devices.values():
+            for mel_device in filter(has_energy_meter, mel_devices):
+                device_id = str(mel_device.device_id)
+                values = await self._async_fetch_consumption(mel_device, hour)
+                if values is None:
+                    continue
+                if values:
+                    self.sums[device_id] = self._import_statistics(
+                        mel_device.device_id,
+                        mel_device.name,
+                        values,
+                        self.sums.get(device_id, 0.0),
+                        hour,
+                    )
+                self.cursors[device_id] = hour
+
+        self._store.async_delay_save(self._cursor_data, CURSOR_SAVE_DELAY)
+
+    async def _async_fetch_consumption(
+        self, mel_device: MelCloudDevice, hour: datetime
+    ) -> dict[datetime, float] | None:
+        """Return the energy consumed by a device since its cursor.
+
+        Return None if one of the reports is not recognised.
+        """
+        cursor, days = self._report_days(self.cursors.get(str(mel_device.device_id)))
+        values: dict[datetime, float] = {}
+        for day in days:
+            report = await self._mel_account.client.fetch_energy_report(
+                mel_device.device_id, day, day
+            )
+            if (consumed := hourly_consumption(report, day)) is None:
+                _LOGGER.warning(
+                    "Energy report of %s not recognised, not imported",
+                    mel_device.name,
+                )
+                return None
+            values.update(
+                (start, value)
+                for start, value in consumed.items()
+                if cursor <= start <= hour
+            )
+        return values
+
+    def _import_statistics(
+        self,
+        device_id: int,
+        name: str,
+        values: dict[datetime, float],
+        base_sum: float,
+        hour: datetime,
+    ) -> float:
+        """Import the consumption of a device, return the sum before the hour.
+
+        The current hour is still being measured: it is imported with the
+        value known so far and requested again by the next run.
+        """
+        statistics: list[StatisticData] = []
+        total = base_sum
+        cursor_sum = base_sum
+        for start in sorted(values):
+            total += values[start]
+            statistics.append(StatisticData(start=start, state=total, sum=total))
+            if start < hour:
+                cursor_sum = total
+
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{name} energy",
+            source=DOMAIN,
+            statistic_id=energy_statistic_id(device_id),
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+        async_add_external_statistics(self._hass, metadata, statistics)
+        return cursor_sum
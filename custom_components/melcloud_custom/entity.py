@@ -0,0 +1,79 @@
+"""Base entity for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, MEL_DEVICES, SIGNAL_NEW_DEVICES
+
+if TYPE_CHECKING:
+    from . import MelCloudDevice
+
+STATE_WRITTEN = "written"
+STATE_SUPPRESSED = "suppressed"
+
+
+@callback
+def async_setup_device_entities(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    add_devices: Callable[[dict[str, list[MelCloudDevice]]], None],
+) -> None:
+    """Create the entities of the devices of an entry, now and when found later.
+
+    The callback receives the devices by type.
+    """
+    add_devices(hass.data[DOMAIN][entry.entry_id][MEL_DEVICES])
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_DEVICES.format(entry.entry_id), add_devices
+        )
+    )
+
+
+class MelCloudEntity(CoordinatorEntity):
+    """Coordinator entity writing its state only when its data changes.
+
+    The entity is fingerprinted by the slice of the coordinator data it reads,
+    the snapshots being frozen dataclasses compared without rendering the
+    state. The coordinators count the written and suppressed updates of their
+    entities in `state_writes`.
+    """
+
+    _fingerprint: tuple[Any, ...] | None = None
+    # Fields of the coordinator data read by the entity, all of them if None
+    _data_fields: tuple[str, ...] | None = None
+
+    @property
+    def available(self) -> bool:
+        """Return if the coordinator has data for the entity."""
+        return super().available and self.coordinator.data is not None
+
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return the slice of the coordinator data the entity reads."""
+        data = self.coordinator.data
+        if data is None or self._data_fields is None:
+            return (self.available, data)
+        return (self.available, *(getattr(data, field) for field in self._data_fields))
+
+    async def async_added_to_hass(self) -> None:
+        """Record the values written when the entity is added."""
+        await super().async_added_to_hass()
+        self._fingerprint = self._state_fingerprint()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the values changed since the last write."""
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._fingerprint:
+            self.coordinator.state_writes[STATE_SUPPRESSED] += 1
+            return
+        self._fingerprint = fingerprint
+        self.coordinator.state_writes[STATE_WRITTEN] += 1
+        self.async_write_ha_state()
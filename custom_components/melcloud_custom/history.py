@@ -0,0 +1,272 @@
+"""Temperature history backfill for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Collection
+from datetime import datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientConnectionError, ClientResponseError
+from pymelcloud import DEVICE_TYPE_ATA, DEVICE_TYPE_ATW
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_import_statistics,
+    get_last_statistics,
+    get_metadata,
+)
+from homeassistant.const import Platform, UnitOfTemperature
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+import homeassistant.util.dt as dt_util
+from homeassistant.util.unit_conversion import TemperatureConverter
+
+from .const import DOMAIN, HISTORY_BACKFILL_CHUNK, HISTORY_BACKFILL_MAX
+
+if TYPE_CHECKING:
+    from . import MelCloudDevice
+    from .coordinator import MelCloudAccountCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Temperature sensors and their field in the temperature log
+ATA_LOG_FIELDS = {"room_temperature": "RoomTemperature"}
+ATW_LOG_FIELDS = {
+    "outside_temperature": "OutdoorTemperature",
+    "tank_temperature": "TankWaterTemperature",
+}
+ATW_ZONE_LOG_FIELDS = {
+    "room_temperature": "RoomTemperatureZone{}",
+    "flow_temperature": "FlowTemperature",
+    "return_temperature": "ReturnTemperature",
+}
+
+
+def _log_fields(mel_device: MelCloudDevice, device_type: str) -> dict[str, str]:
+    """Return the temperature log field of every sensor key of a device."""
+    if device_type == DEVICE_TYPE_ATA:
+        return dict(ATA_LOG_FIELDS)
+    if device_type != DEVICE_TYPE_ATW:
+        return {}
+    fields = dict(ATW_LOG_FIELDS)
+    for zone in mel_device.device.zones:
+        suffix = "" if zone.zone_index == 1 else f"-zone-{zone.zone_index}"
+        for key, field in ATW_ZONE_LOG_FIELDS.items():
+            fields[f"{key}{suffix}"] = field.format(zone.zone_index)
+    return fields
+
+
+def _log_time(value: str) -> datetime | None:
+    """Return the time of a temperature log row, logged in local time."""
+    if (time := dt_util.parse_datetime(value)) is None:
+        return None
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return dt_util.as_utc(time)
+
+
+def log_temperatures(
+    log: Any, fields: Collection[str]
+) -> tuple[list[tuple[datetime, dict[str, float]]], int] | None:
+    """Return the time and the temperatures of every row of a temperature log.
+
+    Rows without a time, or with a temperature that is not a number, are left
+    out and counted. Return None if the log is not a list of rows.
+    """
+    if not isinstance(log, list):
+        return None
+    rows: list[tuple[datetime, dict[str, float]]] = []
+    skipped = 0
+    for row in log:
+        if (
+            not isinstance(row, dict)
+            or not isinstance(row.get("Time"), str)
+            or (time := _log_time(row["Time"])) is None
+        ):
+            skipped += 1
+            continue
+        temperatures = {
+            field: row[field] for field in fields if row.get(field) is not None
+        }
+        if not all(
+            isinstance(value, int | float) and not isinstance(value, bool)
+            for value in temperatures.values()
+        ):
+            skipped += 1
+            continue
+        rows.append((time, temperatures))
+    return rows, skipped
+
+
+def _last_statistics(
+    hass: HomeAssistant, statistic_id: str
+) -> tuple[StatisticMetaData, datetime] | None:
+    """Return the metadata and the last hour of a statistic, if any."""
+    if not (metadata := get_metadata(hass, statistic_ids={statistic_id})):
+        return None
+    last = get_last_statistics(hass, 1, statistic_id, False, {"max"})
+    if not (rows := last.get(statistic_id)):
+        return None
+    return metadata[statistic_id][1], dt_util.utc_from_timestamp(rows[0]["start"])
+
+
+class _SensorGap:
+    """Hours missing from the statistics of a temperature sensor."""
+
+    def __init__(
+        self, field: str, metadata: StatisticMetaData, start: datetime
+    ) -> None:
+        """Initialize the gap starting at an hour."""
+        self.field = field
+        self.metadata = metadata
+        self.start = start
+        self.unit = metadata["unit_of_measurement"]
+
+
+class TemperatureHistory:
+    """Fill the temperature statistics missed while Home Assistant was down.
+
+    The hours missing since the last statistics of every temperature sensor
+    are requested from the MELCloud temperature log, a device and a day at a
+    time with a report request. Every day is imported as hourly mean, min and
+    max before the next one is requested, so a long gap never stays in
+    memory. The gap ends an hour before the current one, still to be compiled
+    by the recorder from the states recorded before the downtime. Rows not
+    recognised are logged and skipped, and a log not recognised ends the
+    backfill of its device.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, mel_account: MelCloudAccountCoordinator
+    ) -> None:
+        """Initialize the backfill of an account."""
+        self._hass = hass
+        self._mel_account = mel_account
+
+    async def async_backfill(self) -> None:
+        """Fill the gaps of every device."""
+        end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        end -= timedelta(hours=1)
+        for device_type, mel_devices in self._mel_account.mel_devices.items():
+            for mel_device in mel_devices:
+                try:
+                    await self._async_backfill_device(mel_device, device_type, end)
+                except (
+                    asyncio.TimeoutError,
+                    ClientConnectionError,
+                    ClientResponseError,
+                ) as ex:
+                    _LOGGER.warning(
+                        "Unable to fetch the temperature log of %s: %s",
+                        mel_device.name,
+                        ex,
+                    )
+
+    async def _async_gaps(
+        self, mel_device: MelCloudDevice, device_type: str, end: datetime
+    ) -> list[_SensorGap]:
+        """Return the gap of every temperature sensor of a device."""
+        registry = er.async_get(self._hass)
+        recorder = get_instance(self._hass)
+        oldest = end - HISTORY_BACKFILL_MAX
+        device = mel_device.device
+        gaps: list[_SensorGap] = []
+        for key, field in _log_fields(mel_device, device_type).items():
+            entity_id = registry.async_get_entity_id(
+                Platform.SENSOR, DOMAIN, f"{device.serial}-{device.mac}-{key}"
+            )
+            if entity_id is None:
+                continue
+            # Sensors without statistics have no history to fill
+            if not (
+                last := await recorder.async_add_executor_job(
+                    _last_statistics, self._hass, entity_id
+                )
+            ):
+                continue
+            metadata, last_hour = last
+            if metadata["unit_of_measurement"] not in TemperatureConverter.VALID_UNITS:
+                continue
+            start = max(last_hour + timedelta(hours=1), oldest)
+            if start < end:
+                gaps.append(_SensorGap(field, metadata, start))
+        return gaps
+
+    async def _async_backfill_device(
+        self, mel_device: MelCloudDevice, device_type: str, end: datetime
+    ) -> None:
+        """Request the temperature log of a device a day at a time."""
+        if not (gaps := await self._async_gaps(mel_device, device_type, end)):
+            return
+        start = min(gap.start for gap in gaps)
+        _LOGGER.debug(
+            "Filling the temperatures of %s from %s to %s", mel_device.name, start, end
+        )
+        client = self._mel_account.client
+        fields = {gap.field for gap in gaps}
+        while start < end:
+            chunk_end = min(start + HISTORY_BACKFILL_CHUNK, end)
+            log = await client.fetch_temperature_log(
+                mel_device.device_id,
+                dt_util.as_local(start),
+                dt_util.as_local(chunk_end),
+            )
+            if (parsed := log_temperatures(log, fields)) is None:
+                _LOGGER.warning(
+                    "Temperature log of %s not recognised, not imported",
+                    mel_device.name,
+                )
+                return
+            rows, skipped = parsed
+            if skipped:
+                _LOGGER.warning(
+                    "%s rows of the temperature log of %s not recognised, skipped",
+                    skipped,
+                    mel_device.name,
+                )
+            self._import_rows(gaps, rows, start, chunk_end)
+            start = chunk_end
+
+    def _import_rows(
+        self,
+        gaps: list[_SensorGap],
+        rows: list[tuple[datetime, dict[str, float]]],
+        start: datetime,
+        end: datetime,
+    ) -> None:
+        """Import the rows of a log chunk as hourly statistics."""
+        hours: dict[datetime, list[dict[str, float]]] = defaultdict(list)
+        for time, temperatures in rows:
+            if start <= time < end:
+                hours[time.replace(minute=0, second=0, microsecond=0)].append(
+                    temperatures
+                )
+
+        for gap in gaps:
+            statistics: list[StatisticData] = []
+            for hour in sorted(hours):
+                if hour < gap.start:
+                    continue
+                temperatures = [
+                    TemperatureConverter.convert(
+                        value, UnitOfTemperature.CELSIUS, gap.unit
+                    )
+                    for row in hours[hour]
+                    if (value := row.get(gap.field)) is not None
+                ]
+                if not temperatures:
+                    continue
+                statistics.append(
+                    StatisticData(
+                        start=hour,
+                        mean=sum(temperatures) / len(temperatures),
+                        min=min(temperatures),
+                        max=max(temperatures),
+                    )
+                )
+            if statistics:
+                async_import_statistics(self._hass, gap.metadata, statistics)
@@ -0,0 +1,120 @@
+"""Performance metrics for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import monotonic
+from typing import Any
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Durations counted in fixed buckets, with their sum and extremes."""
+
+    __slots__ = ("counts", "count", "total", "last", "max")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.last: float | None = None
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add a duration."""
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean duration."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as a dict."""
+        bounds = [f"le_{bound:g}" for bound in LATENCY_BUCKETS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean_s": self.mean,
+            "last_s": self.last,
+            "max_s": self.max,
+            "buckets": dict(zip(bounds, self.counts)),
+        }
+
+
+class PerformanceMetrics:
+    """Request, cycle and write metrics of a MELCloud account.
+
+    Memory does not grow over time: there is a histogram per endpoint and a
+    few counters, the endpoints being the fixed set of the MELCloud API.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.timeouts: Counter[str] = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.cycles = LatencyHistogram()
+        self.write_confirm = LatencyHistogram()
+
+    @contextmanager
+    def request(self, endpoint: str) -> Iterator[None]:
+        """Measure a request sent to an endpoint."""
+        self.requests[endpoint] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = monotonic()
+        try:
+            yield
+        except asyncio.TimeoutError:
+            self.timeouts[endpoint] += 1
+            raise
+        except Exception:
+            self.errors[endpoint] += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            if (histogram := self.latency.get(endpoint)) is None:
+                histogram = self.latency[endpoint] = LatencyHistogram()
+            histogram.observe(monotonic() - start)
+
+    @property
+    def request_latency(self) -> float | None:
+        """Return the mean latency of the requests of all the endpoints."""
+        count = sum(histogram.count for histogram in self.latency.values())
+        if not count:
+            return None
+        return sum(histogram.total for histogram in self.latency.values()) / count
+
+    @property
+    def failed_requests(self) -> int:
+        """Return the requests failed with an error or a timeout."""
+        return sum(self.errors.values()) + sum(self.timeouts.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dict."""
+        return {
+            "requests": dict(self.requests),
+            "errors": dict(self.errors),
+            "timeouts": dict(self.timeouts),
+            "peak_in_flight": self.peak_in_flight,
+            "latency": {
+                endpoint: histogram.as_dict()
+                for endpoint, histogram in self.latency.items()
+            },
+            "cycles": self.cycles.as_dict(),
+            "write_confirm": self.write_confirm.as_dict(),
+        }
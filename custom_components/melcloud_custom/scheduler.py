@@ -0,0 +1,137 @@
+"""Request budget scheduler for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import heapq
+from itertools import count
+from time import monotonic
+
+
+class RequestPriority:
+    """Scheduler lanes, lower values are served first."""
+
+    LOGIN = 0
+    WRITE = 1
+    CONFIG = 2
+    POLL = 3
+    REPORT = 4
+
+
+PRIORITY_NAMES = {
+    RequestPriority.LOGIN: "login",
+    RequestPriority.WRITE: "write",
+    RequestPriority.CONFIG: "config",
+    RequestPriority.POLL: "poll",
+    RequestPriority.REPORT: "report",
+}
+
+
+class RequestScheduler:
+    """Token bucket shared by all the requests sent for a MELCloud account.
+
+    Requests consume one token each, tokens are refilled at a constant rate up
+    to the burst size. When the bucket is empty requests are queued and served
+    by priority, so writes are sent before queued polls.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize the scheduler, rate is expressed in requests per second."""
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = count()
+        self._wakeup: asyncio.TimerHandle | None = None
+        self.requests: Counter[str] = Counter()
+        self.queued: Counter[str] = Counter()
+
+    @property
+    def rate(self) -> float:
+        """Return the refill rate in requests per second."""
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: float) -> None:
+        """Set the refill rate in requests per second."""
+        self._refill()
+        self._rate = value
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._dispatch()
+
+    @property
+    def burst(self) -> int:
+        """Return the bucket size."""
+        return self._burst
+
+    @property
+    def tokens(self) -> float:
+        """Return the requests that can be sent now without waiting."""
+        self._refill()
+        return self._tokens
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for a token."""
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last refill."""
+        now = monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        """Wake up the queued requests that can be served."""
+        self._wakeup = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue
+            self._tokens -= 1
+            waiter.set_result(None)
+
+        if self._waiters:
+            delay = (1 - self._tokens) / self._rate
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def acquire(self, priority: int = RequestPriority.POLL) -> None:
+        """Wait until a request with the given priority can be sent."""
+        lane = PRIORITY_NAMES.get(priority, str(priority))
+        self.requests[lane] += 1
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        self.queued[lane] += 1
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        if self._wakeup is None:
+            self._dispatch()
+        await waiter
+
+    @asynccontextmanager
+    async def request(
+        self, priority: int = RequestPriority.POLL
+    ) -> AsyncIterator[None]:
+        """Context manager running a request within the budget."""
+        await self.acquire(priority)
+        yield
+
+    def shutdown(self) -> None:
+        """Cancel queued requests and pending wake up."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        for _, _, waiter in self._waiters:
+            waiter.cancel()
+        self._waiters.clear()
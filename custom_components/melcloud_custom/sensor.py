@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import logging
 from typing import Any, Callable
 
@@ -18,15 +18,18 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
     UnitOfEnergy,
     UnitOfTemperature,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import MelCloudDevice
-from .const import DOMAIN, MEL_DEVICES
+from .const import DOMAIN, MEL_ACCOUNT
+from .coordinator import MelCloudAccountCoordinator
+from .entity import MelCloudEntity, async_setup_device_entities
 
 
 @dataclass
@@ -52,7 +55,7 @@ ATA_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
         native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
         device_class=SensorDeviceClass.SIGNAL_STRENGTH,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: x.wifi_signal,
+        value_fn=lambda data: data.wifi_signal,
         enabled=lambda x: True,
         entity_registry_enabled_default=False,
     ),
@@ -63,7 +66,7 @@ ATA_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: x.device.room_temperature,
+        value_fn=lambda data: data.room_temperature,
         enabled=lambda x: True,
         entity_registry_enabled_default=False,
     ),
@@ -74,7 +77,7 @@ ATA_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
-        value_fn=lambda x: x.device.total_energy_consumed,
+        value_fn=lambda data: data.total_energy_consumed,
         enabled=lambda x: x.device.has_energy_consumed_meter,
         entity_registry_enabled_default=False,
     ),
@@ -87,7 +90,7 @@ ATW_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: x.device.outside_temperature,
+        value_fn=lambda data: data.outside_temperature,
         enabled=lambda x: True,
         entity_registry_enabled_default=False,
     ),
@@ -98,7 +101,7 @@ ATW_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda x: x.device.tank_temperature,
+        value_fn=lambda data: data.tank_temperature,
         enabled=lambda x: True,
     ),
 )
@@ -138,6 +141,95 @@ ATW_ZONE_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
     ),
 )
 
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Return a duration in milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+ACCOUNT_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
+    MelcloudSensorEntityDescription(
+        key="request_budget",
+        name="Request Budget",
+        icon="mdi:gauge",
+        native_unit_of_measurement="requests",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: int(x.client.scheduler.tokens),
+        enabled=lambda x: True,
+        entity_registry_enabled_default=False,
+    ),
+    MelcloudSensorEntityDescription(
+        key="request_queue_depth",
+        name="Request Queue Depth",
+        icon="mdi:tray-full",
+        native_unit_of_measurement="requests",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: x.client.scheduler.queue_depth,
+        enabled=lambda x: True,
+        entity_registry_enabled_default=False,
+    ),
+    MelcloudSensorEntityDescription(
+        key="request_latency",
+        name="Request Latency",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: _milliseconds(x.client.metrics.request_latency),
+        enabled=lambda x: True,
+        entity_registry_enabled_default=False,
+    ),
+    MelcloudSensorEntityDescription(
+        key="poll_cycle_duration",
+        name="Poll Cycle Duration",
+        icon="mdi:timer-sync-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: _milliseconds(x.client.metrics.cycles.last),
+        enabled=lambda x: True,
+        entity_registry_enabled_default=False,
+    ),
+    MelcloudSensorEntityDescription(
+        key="write_confirm_latency",
+        name="Write Confirm Latency",
+        icon="mdi:timer-check-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: _milliseconds(x.client.metrics.write_confirm.last),
+        enabled=lambda x: True,
+        entity_registry_enabled_default=False,
+    ),
+    MelcloudSensorEntityDescription(
+        key="failed_requests",
+        name="Failed Requests",
+        icon="mdi:alert-circle-outline",
+        native_unit_of_measurement="requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: x.client.metrics.failed_requests,
+        enabled=lambda x: True,
+        entity_registry_enabled_default=False,
+    ),
+    MelcloudSensorEntityDescription(
+        key="peak_in_flight_requests",
+        name="Peak In-Flight Requests",
+        icon="mdi:arrow-collapse-up",
+        native_unit_of_measurement="requests",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: x.client.metrics.peak_in_flight,
+        enabled=lambda x: True,
+        entity_registry_enabled_default=False,
+    ),
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -145,37 +237,44 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     """Set up MELCloud device sensors based on config_entry."""
-    entry_config = hass.data[DOMAIN][entry.entry_id]
-
-    mel_devices = entry_config.get(MEL_DEVICES)
-    entities = []
-    entities.extend(
+    mel_account = hass.data[DOMAIN][entry.entry_id].get(MEL_ACCOUNT)
+    async_add_entities(
         [
+            MelAccountSensor(mel_account, description)
+            for description in ACCOUNT_SENSORS
+            if description.enabled(mel_account)
+        ],
+        False,
+    )
+
+    @callback
+    def _async_add_devices(mel_devices: dict[str, list[MelCloudDevice]]) -> None:
+        entities = [
             MelDeviceSensor(mel_device, description)
             for description in ATA_SENSORS
             for mel_device in mel_devices[DEVICE_TYPE_ATA]
             if description.enabled(mel_device)
-        ]
-        + [
+        ] + [
             MelDeviceSensor(mel_device, description)
             for description in ATW_SENSORS
             for mel_device in mel_devices[DEVICE_TYPE_ATW]
             if description.enabled(mel_device)
         ]
-    )
-    entities.extend(
-        [
-            AtwZoneSensor(mel_device, zone, description)
-            for mel_device in mel_devices[DEVICE_TYPE_ATW]
-            for zone in mel_device.device.zones
-            for description in ATW_ZONE_SENSORS
-            if description.enabled(zone)
-        ]
-    )
-    async_add_entities(entities, False)
+        entities.extend(
+            [
+                AtwZoneSensor(mel_device, zone, description)
+                for mel_device in mel_devices[DEVICE_TYPE_ATW]
+                for zone in mel_device.device.zones
+                for description in ATW_ZONE_SENSORS
+                if description.enabled(zone)
+            ]
+        )
+        async_add_entities(entities, False)
+
+    async_setup_device_entities(hass, entry, _async_add_devices)
 
 
-class MelDeviceSensor(CoordinatorEntity, SensorEntity):
+class MelDeviceSensor(MelCloudEntity, SensorEntity):
     """Representation of a Sensor."""
 
     entity_description: MelcloudSensorEntityDescription
@@ -187,7 +286,8 @@ class MelDeviceSensor(CoordinatorEntity, SensorEntity):
         description: MelcloudSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(api.coordinator)
+        # Meter values changing alone only update the sensor of their key
+        super().__init__(api.coordinator, frozenset({description.key}))
         self._api = api
         self.entity_description = description
 
@@ -195,10 +295,14 @@ class MelDeviceSensor(CoordinatorEntity, SensorEntity):
         self._attr_device_info = api.device_info
         self._attr_extra_state_attributes = api.extra_attributes
 
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return the value the sensor reads from the device data."""
+        return (self.available, self.native_value)
+
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        return self.entity_description.value_fn(self._api)
+        return self.entity_description.value_fn(self.coordinator.data)
 
 
 class AtwZoneSensor(MelDeviceSensor):
@@ -212,7 +316,9 @@ class AtwZoneSensor(MelDeviceSensor):
     ) -> None:
         """Initialize the sensor."""
         if zone.zone_index != 1:
-            description.key = f"{description.key}-zone-{zone.zone_index}"
+            description = replace(
+                description, key=f"{description.key}-zone-{zone.zone_index}"
+            )
         super().__init__(api, description)
 
         self._attr_device_info = api.zone_device_info(zone)
@@ -221,4 +327,47 @@ class AtwZoneSensor(MelDeviceSensor):
     @property
     def native_value(self):
         """Return zone based state."""
-        return self.entity_description.value_fn(self._zone)
+        if (zone := self.coordinator.data.zone(self._zone.zone_index)) is None:
+            return None
+        return self.entity_description.value_fn(zone)
+
+
+class MelAccountSensor(MelCloudEntity, SensorEntity):
+    """Representation of a MELCloud account diagnostic sensor."""
+
+    entity_description: MelcloudSensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: MelCloudAccountCoordinator,
+        description: MelcloudSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+
+        entry_id = coordinator.config_entry.entry_id
+        self._attr_unique_id = f"{entry_id}-{description.key}"
+        self._attr_device_info = coordinator.device_info
+
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return the counters exposed, read from the client and not the data."""
+        return (self.available, self.native_value, self.extra_state_attributes)
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the request counters and the entity state writes."""
+        scheduler = self.coordinator.client.scheduler
+        return {
+            "requests_per_minute": round(scheduler.rate * 60, 1),
+            "burst": scheduler.burst,
+            "requests": dict(scheduler.requests),
+            "queued": dict(scheduler.queued),
+            "state_writes": dict(self.coordinator.entity_state_writes),
+        }
@@ -0,0 +1,248 @@
+"""Services of the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+from pymelcloud import DEVICE_TYPE_ATA, DEVICE_TYPE_ATW
+import pymelcloud.ata_device as ata
+from pymelcloud.atw_device import (
+    PROPERTY_ZONE_1_TARGET_TEMPERATURE,
+    PROPERTY_ZONE_2_TARGET_TEMPERATURE,
+)
+from pymelcloud.device import PROPERTY_POWER
+import voluptuous as vol
+
+from homeassistant.components.climate.const import (
+    ATTR_FAN_MODE,
+    ATTR_HVAC_MODE,
+    HVACMode,
+)
+from homeassistant.const import ATTR_DEVICE_ID, ATTR_TEMPERATURE
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr
+import homeassistant.helpers.config_validation as cv
+
+from .capabilities import ATA_HVAC_MODE_REVERSE_LOOKUP
+from .const import (
+    ATTR_BUILDING_ID,
+    ATTR_POWER,
+    DOMAIN,
+    GROUP_SET_CONCURRENCY,
+    MEL_ACCOUNT,
+)
+
+if TYPE_CHECKING:
+    from . import MelCloudDevice
+    from .coordinator import MelCloudAccountCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SET_GROUP = "set_group"
+
+ATW_ZONE_TARGET_TEMPERATURE = {
+    1: PROPERTY_ZONE_1_TARGET_TEMPERATURE,
+    2: PROPERTY_ZONE_2_TARGET_TEMPERATURE,
+}
+
+SET_GROUP_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(ATTR_DEVICE_ID, "target"): vol.All(
+                cv.ensure_list, [cv.string]
+            ),
+            vol.Exclusive(ATTR_BUILDING_ID, "target"): cv.positive_int,
+            vol.Optional(ATTR_POWER): cv.boolean,
+            vol.Optional(ATTR_HVAC_MODE): vol.Coerce(HVACMode),
+            vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+            vol.Optional(ATTR_FAN_MODE): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_DEVICE_ID, ATTR_BUILDING_ID),
+    cv.has_at_least_one_key(
+        ATTR_POWER, ATTR_HVAC_MODE, ATTR_TEMPERATURE, ATTR_FAN_MODE
+    ),
+)
+
+
+def _device_properties(
+    mel_device: MelCloudDevice,
+    device_type: str,
+    zones: set[int] | None,
+    data: dict[str, Any],
+) -> dict[str, Any]:
+    """Return the properties written to a device by a group call.
+
+    The target temperature of an Air-to-Water device is written to the
+    selected zones, or to all of them if zones is None. Raise ValueError if
+    the device does not support a requested value.
+    """
+    properties: dict[str, Any] = {}
+    if ATTR_POWER in data:
+        properties[PROPERTY_POWER] = data[ATTR_POWER]
+
+    if device_type != DEVICE_TYPE_ATA:
+        if ATTR_HVAC_MODE in data or ATTR_FAN_MODE in data:
+            raise ValueError("hvac_mode and fan_mode are not supported")
+        if ATTR_TEMPERATURE in data:
+            for zone in mel_device.device.zones:
+                if zones is None or zone.zone_index in zones:
+                    properties[ATW_ZONE_TARGET_TEMPERATURE[zone.zone_index]] = data[
+                        ATTR_TEMPERATURE
+                    ]
+        return properties
+
+    capabilities = mel_device.capabilities
+    operation_mode = mel_device.device.operation_mode
+    if (hvac_mode := data.get(ATTR_HVAC_MODE)) == HVACMode.OFF:
+        properties[PROPERTY_POWER] = False
+    elif hvac_mode is not None:
+        if hvac_mode not in capabilities.hvac_modes:
+            raise ValueError(f"Unsupported hvac_mode [{hvac_mode}]")
+        operation_mode = ATA_HVAC_MODE_REVERSE_LOOKUP[hvac_mode]
+        properties[ata.PROPERTY_OPERATION_MODE] = operation_mode
+        properties[PROPERTY_POWER] = True
+    if (temperature := data.get(ATTR_TEMPERATURE)) is not None:
+        min_temp, max_temp = capabilities.temperature_range(operation_mode)
+        if not min_temp <= temperature <= max_temp:
+            raise ValueError(
+                f"Temperature {temperature} out of range [{min_temp}, {max_temp}]"
+            )
+        properties[ata.PROPERTY_TARGET_TEMPERATURE] = temperature
+    if (fan_mode := data.get(ATTR_FAN_MODE)) is not None:
+        if fan_mode not in (capabilities.fan_modes or []):
+            raise ValueError(f"Unsupported fan_mode [{fan_mode}]")
+        properties[ata.PROPERTY_FAN_SPEED] = fan_mode
+    return properties
+
+
+def _group_devices(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> list[tuple[MelCloudAccountCoordinator, MelCloudDevice, str, set[int] | None]]:
+    """Return the devices targeted by a group call.
+
+    Every device comes with its account, its type and the Air-to-Water zones
+    selected through their zone devices, None meaning the whole device.
+    """
+    devices = []
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        mel_account: MelCloudAccountCoordinator | None = entry_data.get(MEL_ACCOUNT)
+        if mel_account is None:
+            continue
+        for device_type, mel_devices in mel_account.mel_devices.items():
+            for mel_device in mel_devices:
+                devices.append((mel_account, mel_device, device_type))
+
+    if (building_id := data.get(ATTR_BUILDING_ID)) is not None:
+        devices = [device for device in devices if device[1].building_id == building_id]
+        if not devices:
+            raise ServiceValidationError(
+                f"No MELCloud device in building {building_id}"
+            )
+        return [(*device, None) for device in devices]
+
+    # Zone devices select a zone of their Air-to-Water device
+    targets: dict[tuple[str, str], tuple[int, int | None]] = {}
+    for index, (_, mel_device, device_type) in enumerate(devices):
+        for identifier in mel_device.device_info["identifiers"]:
+            targets[identifier] = (index, None)
+        if device_type != DEVICE_TYPE_ATW:
+            continue
+        for zone in mel_device.device.zones:
+            for identifier in mel_device.zone_device_info(zone)["identifiers"]:
+                targets[identifier] = (index, zone.zone_index)
+
+    device_registry = dr.async_get(hass)
+    selected: dict[int, set[int] | None] = {}
+    for device_id in data[ATTR_DEVICE_ID]:
+        if (device_entry := device_registry.async_get(device_id)) is None:
+            raise ServiceValidationError(f"Unknown device {device_id}")
+        matches = [
+            targets[identifier]
+            for identifier in device_entry.identifiers
+            if identifier in targets
+        ]
+        if not matches:
+            raise ServiceValidationError(f"Device {device_id} is not a MELCloud device")
+        for index, zone_index in matches:
+            if zone_index is None:
+                selected[index] = None
+            elif index not in selected:
+                selected[index] = {zone_index}
+            elif (zones := selected[index]) is not None:
+                zones.add(zone_index)
+    return [(*devices[index], zones) for index, zones in selected.items()]
+
+
+async def _async_set_group(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Write the same changes to a group of devices.
+
+    Each device gets a single write, sent right away and not read back; the
+    accounts involved are refreshed once at the end, the written values being
+    followed until the device list reports them.
+    """
+    started = monotonic()
+    devices = _group_devices(hass, call.data)
+    semaphore = asyncio.Semaphore(GROUP_SET_CONCURRENCY)
+
+    async def _async_set(
+        mel_device: MelCloudDevice, device_type: str, zones: set[int] | None
+    ) -> dict:
+        result: dict[str, Any] = {"name": mel_device.name}
+        try:
+            properties = _device_properties(mel_device, device_type, zones, call.data)
+        except ValueError as ex:
+            return {**result, "success": False, "error": str(ex)}
+        async with semaphore:
+            try:
+                success = await mel_device.async_set(
+                    properties, confirm=False, debounce=False
+                )
+            except Exception as ex:  # pylint: disable=broad-except
+                _LOGGER.exception("Group set failed for %s", mel_device.name)
+                return {**result, "success": False, "error": str(ex)}
+        return {**result, "success": success}
+
+    results = await asyncio.gather(
+        *(
+            _async_set(mel_device, device_type, zones)
+            for _, mel_device, device_type, zones in devices
+        )
+    )
+
+    mel_accounts = {id(mel_account): mel_account for mel_account, _, _, _ in devices}
+    await asyncio.gather(
+        *(mel_account.async_refresh() for mel_account in mel_accounts.values())
+    )
+
+    return {
+        "results": {
+            str(mel_device.device_id): result
+            for (_, mel_device, _, _), result in zip(devices, results)
+        },
+        "wall_time_s": round(monotonic() - started, 3),
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def _async_handle_set_group(call: ServiceCall) -> ServiceResponse:
+        return await _async_set_group(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_GROUP,
+        _async_handle_set_group,
+        schema=SET_GROUP_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,77 @@
+"""Persistent device snapshot for the MELCloud Climate integration."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import MelCloudAccountCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+
+class DeviceSnapshot:
+    """Last good device list and device states of a MELCloud account.
+
+    The snapshot is loaded at setup to create the entities without waiting
+    for MELCloud, the live state is then reconciled in background. A snapshot
+    older than the maximum age is ignored, rather than shown as live state.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot storage of a config entry."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot"
+        )
+
+    async def async_load(self, max_age: timedelta) -> dict[str, Any] | None:
+        """Load the snapshot, return None if missing, unusable or too old."""
+        try:
+            data = await self._store.async_load()
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.warning("Unable to load the device snapshot: %s", ex)
+            return None
+        if not data or not data.get("device_confs"):
+            return None
+        saved_at = dt_util.parse_datetime(data.get("saved_at") or "")
+        if saved_at is None or dt_util.utcnow() - saved_at > max_age:
+            _LOGGER.debug("Device snapshot saved at %s ignored, too old", saved_at)
+            return None
+        return data
+
+    @callback
+    def async_save(self, mel_account: MelCloudAccountCoordinator) -> None:
+        """Schedule saving the state after a successful update."""
+        if mel_account.last_update_success:
+            self._store.async_delay_save(
+                lambda: _snapshot_data(mel_account), SNAPSHOT_SAVE_DELAY
+            )
+
+    async def async_remove(self) -> None:
+        """Remove the snapshot."""
+        await self._store.async_remove()
+
+
+def _snapshot_data(mel_account: MelCloudAccountCoordinator) -> dict[str, Any]:
+    """Return the snapshot of the account devices."""
+    return {
+        "saved_at": dt_util.utcnow().isoformat(),
+        "account": mel_account.client.account,
+        "device_confs": mel_account.client.device_confs,
+        "devices": {
+            str(mel_device.device_id): mel_device.snapshot
+            for mel_devices in mel_account.mel_devices.values()
+            for mel_device in mel_devices
+        },
+    }
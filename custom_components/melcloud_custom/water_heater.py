@@ -12,36 +12,42 @@ from pymelcloud.atw_device import (
 from pymelcloud.device import PROPERTY_POWER
 
 from homeassistant.components.water_heater import (
-    DEFAULT_MAX_TEMP,
-    DEFAULT_MIN_TEMP,
     WaterHeaterEntity,
     WaterHeaterEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import DOMAIN, MelCloudDevice
-from .const import ATTR_STATUS, MEL_DEVICES
+from . import MelCloudDevice
+from .const import ATTR_STATUS
+from .entity import MelCloudEntity, async_setup_device_entities
+
+# Writable properties shown by the water heater
+WATER_HEATER_PROPERTIES = frozenset(
+    {PROPERTY_POWER, PROPERTY_OPERATION_MODE, PROPERTY_TARGET_TANK_TEMPERATURE}
+)
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up MelCloud device climate based on config_entry."""
-    mel_devices = hass.data[DOMAIN][entry.entry_id].get(MEL_DEVICES)
-    async_add_entities(
-        [
-            AtwWaterHeater(mel_device, mel_device.device)
-            for mel_device in mel_devices[DEVICE_TYPE_ATW]
-        ],
-        True,
-    )
+
+    @callback
+    def _async_add_devices(mel_devices: dict[str, list[MelCloudDevice]]) -> None:
+        async_add_entities(
+            [
+                AtwWaterHeater(mel_device, mel_device.device)
+                for mel_device in mel_devices[DEVICE_TYPE_ATW]
+            ]
+        )
+
+    async_setup_device_entities(hass, entry, _async_add_devices)
 
 
-class AtwWaterHeater(CoordinatorEntity, WaterHeaterEntity):
+class AtwWaterHeater(MelCloudEntity, WaterHeaterEntity):
     """Air-to-Water water heater."""
 
     _attr_supported_features = (
@@ -52,15 +58,25 @@ class AtwWaterHeater(CoordinatorEntity, WaterHeaterEntity):
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
     _attr_has_entity_name = True
     _attr_name = None
+    _data_fields = (
+        "status",
+        "operation_mode",
+        "tank_temperature",
+        "target_tank_temperature",
+    )
 
     def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
         """Initialize water heater device."""
-        super().__init__(api.coordinator)
+        super().__init__(api.coordinator, WATER_HEATER_PROPERTIES)
         self._api = api
         self._device = device
         self._attr_unique_id = f"{device.serial}-WH"
         self._attr_device_info = api.device_info
 
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return the device data and capabilities the water heater reads."""
+        return (*super()._state_fingerprint(), self._api.capabilities)
+
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
         await self._api.async_set({PROPERTY_POWER: True})
@@ -72,28 +88,28 @@ class AtwWaterHeater(CoordinatorEntity, WaterHeaterEntity):
     @property
     def extra_state_attributes(self):
         """Return the optional state attributes with device specific additions."""
-        data = {ATTR_STATUS: self._device.status}
+        data = {ATTR_STATUS: self.coordinator.data.status}
         return data
 
     @property
     def current_operation(self) -> str | None:
         """Return current operation as reported by pymelcloud."""
-        return self._device.operation_mode
+        return self.coordinator.data.operation_mode
 
     @property
     def operation_list(self) -> list[str]:
         """Return the list of available operation modes as reported by pymelcloud."""
-        return self._device.operation_modes
+        return self._api.capabilities.operation_list
 
     @property
     def current_temperature(self) -> float | None:
         """Return the current temperature."""
-        return self._device.tank_temperature
+        return self.coordinator.data.tank_temperature
 
     @property
     def target_temperature(self):
         """Return the temperature we try to reach."""
-        return self._device.target_tank_temperature
+        return self.coordinator.data.target_tank_temperature
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
@@ -112,9 +128,9 @@ class AtwWaterHeater(CoordinatorEntity, WaterHeaterEntity):
     @property
     def min_temp(self) -> float:
         """Return the minimum temperature."""
-        return self._device.target_tank_temperature_min or DEFAULT_MIN_TEMP
+        return self._api.capabilities.tank_min_temp
 
     @property
     def max_temp(self) -> float:
         """Return the maximum temperature."""
-        return self._device.target_tank_temperature_max or DEFAULT_MAX_TEMP
+        return self._api.capabilities.tank_max_temp
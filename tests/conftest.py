@@ -16,7 +16,15 @@
 # pytest includes fixtures OOB which you can use as defined on this page)
 from unittest.mock import patch
 
+from aiohttp.test_utils import TestServer
 import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_TOKEN
+
+from custom_components.melcloud_custom.const import CONF_REQUEST_RATE, DOMAIN
+
+from .fake_melcloud import API_PATH, FakeMelCloud
 
 pytest_plugins = "pytest_homeassistant_custom_component"
 
@@ -38,3 +46,98 @@ def skip_notifications_fixture():
         "homeassistant.components.persistent_notification.async_dismiss"
     ):
         yield
+
+
+BENCHMARK_RESULTS = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    """Add the option enabling slow benchmarks."""
+    parser.addoption(
+        "--runslow", action="store_true", default=False, help="run slow tests"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip slow tests unless requested."""
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="need --runslow option to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Report the results collected by the benchmark suite."""
+    if not (results := config.stash.get(BENCHMARK_RESULTS, [])):
+        return
+    terminalreporter.section("MELCloud benchmark")
+    columns = None
+    for result in results:
+        if list(result) != columns:
+            columns = list(result)
+            terminalreporter.write_line(" | ".join(f"{col:>16}" for col in columns))
+        terminalreporter.write_line(
+            " | ".join(
+                f"{value:>16.3f}" if isinstance(value, float) else f"{value:>16}"
+                for value in result.values()
+            )
+        )
+
+
+@pytest.fixture
+def benchmark_report(request):
+    """Collect benchmark results printed at the end of the session."""
+    return request.config.stash.setdefault(BENCHMARK_RESULTS, [])
+
+
+@pytest.fixture
+async def melcloud_server(socket_enabled):
+    """Start fake MELCloud services and route the integration to them."""
+    servers = []
+
+    async def _start(num_devices=1, **kwargs) -> FakeMelCloud:
+        fake = FakeMelCloud(num_devices, **kwargs)
+        server = TestServer(fake.app)
+        await server.start_server()
+        servers.append(server)
+        base_url = str(server.make_url(API_PATH))
+        for target in (
+            "pymelcloud.client.BASE_URL",
+            "custom_components.melcloud_custom.BASE_URL",
+        ):
+            patcher = patch(target, base_url)
+            patcher.start()
+            patchers.append(patcher)
+        return fake
+
+    patchers = []
+    yield _start
+
+    for patcher in patchers:
+        patcher.stop()
+    for server in servers:
+        await server.close()
+
+
+@pytest.fixture
+def setup_melcloud(hass):
+    """Set up config entries bound to the fake MELCloud services.
+
+    The request budget is lifted unless set in the options.
+    """
+
+    async def _setup(fake: FakeMelCloud, **options) -> MockConfigEntry:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_TOKEN: fake.token},
+            options={CONF_REQUEST_RATE: 1e6, **options},
+            unique_id="test@test.com",
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        return entry
+
+    return _setup
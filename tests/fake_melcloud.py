@@ -0,0 +1,408 @@
+"""Local stand-in for the MELCloud cloud service."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+import json
+from pathlib import Path
+import random
+from typing import Any
+
+from aiohttp import web
+
+API_PATH = "/Mitsubishi.Wifi.Client"
+TOKEN_HEADER = "X-MitsContextKey"
+
+# Device/Get state keys published with a different name in ListDevices
+ATA_LIST_KEYS = {
+    "SetFanSpeed": "FanSpeed",
+    "VaneHorizontal": "VaneHorizontalDirection",
+    "VaneVertical": "VaneVerticalDirection",
+}
+
+# EffectiveFlags bits of the Device/Set* requests and the state key they write
+ATA_WRITE_FLAGS = {
+    0x01: "Power",
+    0x02: "OperationMode",
+    0x04: "SetTemperature",
+    0x08: "SetFanSpeed",
+    0x10: "VaneVertical",
+    0x100: "VaneHorizontal",
+}
+REPORT_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# Layout of the EnergyCost/Report response for a single day, labelled by hour
+ENERGY_REPORT = json.loads(
+    (Path(__file__).parent / "fixtures" / "energy_report.json").read_text()
+)
+ENERGY_MODES = ("Heating", "Cooling", "Auto", "Dry", "Fan", "Other")
+# Temperatures in the log, logged every ten minutes
+LOG_KEYS = (
+    "RoomTemperature",
+    "OutdoorTemperature",
+    "TankWaterTemperature",
+    "RoomTemperatureZone1",
+    "RoomTemperatureZone2",
+    "FlowTemperature",
+    "ReturnTemperature",
+)
+LOG_INTERVAL = timedelta(minutes=10)
+
+ATW_WRITE_FLAGS = {
+    0x01: "Power",
+    0x20: "SetTankWaterTemperature",
+    0x80: "SetTemperatureZone1",
+    0x200: "SetTemperatureZone2",
+    0x10000: "ForcedHotWaterMode",
+}
+
+
+def _ata_device(device_id: int) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Return capabilities and state of a synthetic ATA device."""
+    capabilities = {
+        "DeviceType": 0,
+        "CanHeat": True,
+        "CanCool": True,
+        "CanDry": True,
+        "ModelSupportsAuto": True,
+        "ModelSupportsVaneVertical": True,
+        "ModelSupportsVaneHorizontal": device_id % 2 == 0,
+        "SwingFunction": True,
+        "HasAutomaticFanSpeed": True,
+        "HasEnergyConsumedMeter": True,
+        "CurrentEnergyConsumed": 1000 * device_id,
+        "MinTempHeat": 10,
+        "MaxTempHeat": 31,
+        "MinTempCoolDry": 16,
+        "MaxTempCoolDry": 31,
+        "MinTempAutomatic": 16,
+        "MaxTempAutomatic": 31,
+        "TemperatureIncrement": 0.5,
+        "WifiSignalStrength": -60,
+        "HasError": False,
+    }
+    state = {
+        "Power": device_id % 3 != 0,
+        "RoomTemperature": 20.0 + device_id % 5,
+        "SetTemperature": 21.0,
+        "OperationMode": 1,
+        "SetFanSpeed": 0,
+        "NumberOfFanSpeeds": 5,
+        "VaneHorizontal": 0,
+        "VaneVertical": 0,
+    }
+    return capabilities, state
+
+
+def _atw_device(device_id: int) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Return capabilities and state of a synthetic ATW device."""
+    capabilities = {
+        "DeviceType": 1,
+        "CanCool": False,
+        "HasThermostatZone1": True,
+        "HasZone2": True,
+        "HasThermostatZone2": device_id % 2 == 0,
+        "MaxTankTemperature": 60.0,
+        "FlowTemperature": 35.0,
+        "ReturnTemperature": 30.0,
+        "TemperatureIncrement": 0.5,
+        "WifiSignalStrength": -55,
+        "HasError": False,
+    }
+    state = {
+        "Power": True,
+        "OperationMode": 2,
+        "RoomTemperatureZone1": 20.5,
+        "RoomTemperatureZone2": 19.5,
+        "SetTemperatureZone1": 21.0,
+        "SetTemperatureZone2": 20.0,
+        "OperationModeZone1": 0,
+        "OperationModeZone2": 0,
+        "IdleZone1": False,
+        "IdleZone2": True,
+        "TankWaterTemperature": 48.0,
+        "SetTankWaterTemperature": 50.0,
+        "ForcedHotWaterMode": False,
+        "OutdoorTemperature": 8.0,
+        "HolidayMode": False,
+    }
+    return capabilities, state
+
+
+class FakeMelCloud:
+    """aiohttp application emulating the MELCloud API for N synthetic devices.
+
+    Every 10th device is an Air-to-Water unit, the others are Air-to-Air.
+    Latency is added to every request and errors can be injected either at a
+    random rate or for the next requests of a given endpoint.
+    """
+
+    def __init__(
+        self,
+        num_devices: int = 1,
+        *,
+        num_buildings: int = 1,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the fake service."""
+        self.token = "fake-token"
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests: Counter[str] = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        # Client address and port of the connections serving requests
+        self.connections: set[tuple[str, int]] = set()
+        self._random = random.Random(seed)
+        self._fail_next: dict[str, list[tuple[int, dict[str, str]]]] = {}
+        # State keys silently ignored by Device/Set*, like a unit refusing a command
+        self.read_only: set[str] = set()
+        # Device/Get requests answered before a write is delivered to the unit
+        self.delivery_polls = 0
+        self._pending: dict[int, list[Any]] = {}
+        self._list_polls = 0
+        # Energy consumed by every device in an hour, in kWh, half heating and
+        # half cooling
+        self.energy_per_hour = 0.5
+
+        self.num_buildings = num_buildings
+        self.devices: dict[int, dict[str, Any]] = {}
+        self.states: dict[int, dict[str, Any]] = {}
+        self._created = 0
+        for _ in range(num_devices):
+            self.add_device()
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_post(f"{API_PATH}/Login/ClientLogin", self._login)
+        self.app.router.add_get(f"{API_PATH}/User/GetUserDetails", self._user)
+        self.app.router.add_get(f"{API_PATH}/User/ListDevices", self._list_devices)
+        self.app.router.add_post(f"{API_PATH}/Device/ListDeviceUnits", self._units)
+        self.app.router.add_get(f"{API_PATH}/Device/Get", self._get)
+        self.app.router.add_post(f"{API_PATH}/Device/SetAta", self._set)
+        self.app.router.add_post(f"{API_PATH}/Device/SetAtw", self._set)
+        self.app.router.add_post(f"{API_PATH}/EnergyCost/Report", self._energy_report)
+        self.app.router.add_post(
+            f"{API_PATH}/Report/GetTemperatureLog2", self._temperature_log
+        )
+
+    def add_device(self) -> int:
+        """Add a device to the account, every tenth one is ATW, return its ID."""
+        index = self._created
+        self._created += 1
+        device_id = 1000 + index
+        if index % 10 == 9:
+            capabilities, state = _atw_device(device_id)
+        else:
+            capabilities, state = _ata_device(device_id)
+        self.devices[device_id] = {
+            "DeviceID": device_id,
+            "DeviceName": f"Device {device_id}",
+            "BuildingID": 1 + index % self.num_buildings,
+            "MacAddress": f"00:00:00:00:{device_id // 256:02x}:{device_id % 256:02x}",
+            "SerialNumber": str(device_id),
+            "AccessLevel": 4,
+            "Device": capabilities,
+        }
+        self.states[device_id] = state
+        return device_id
+
+    def remove_device(self, device_id: int) -> None:
+        """Remove a device from the account."""
+        del self.devices[device_id]
+        del self.states[device_id]
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of requests served."""
+        return sum(self.requests.values())
+
+    def reset_counters(self) -> None:
+        """Reset request counters."""
+        self.requests.clear()
+        self.peak_in_flight = self.in_flight
+        self.connections.clear()
+
+    def fail_next(
+        self,
+        endpoint: str,
+        count: int = 1,
+        status: int = 500,
+        retry_after: int | None = None,
+    ) -> None:
+        """Fail the next requests sent to an endpoint, e.g. "User/ListDevices"."""
+        headers = {} if retry_after is None else {"Retry-After": str(retry_after)}
+        self._fail_next.setdefault(endpoint, []).extend([(status, headers)] * count)
+
+    def change_devices(self, count: int) -> list[int]:
+        """Change the room temperature of the first devices."""
+        changed = list(self.states)[:count]
+        for device_id in changed:
+            state = self.states[device_id]
+            for key in ("RoomTemperature", "RoomTemperatureZone1"):
+                if key in state:
+                    state[key] += 0.5
+        return changed
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        """Count requests and inject latency and errors."""
+        endpoint = request.path.removeprefix(f"{API_PATH}/")
+        self.requests[endpoint] += 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if failures := self._fail_next.get(endpoint):
+                status, headers = failures.pop(0)
+                return web.Response(
+                    status=status, headers=headers, text="Injected error"
+                )
+            if self.error_rate and self._random.random() < self.error_rate:
+                raise web.HTTPInternalServerError()
+            if (
+                endpoint != "Login/ClientLogin"
+                and request.headers.get(TOKEN_HEADER) != self.token
+            ):
+                raise web.HTTPUnauthorized()
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    def _device_state(self, device_id: int) -> dict[str, Any]:
+        """Return the Device/Get state of a device."""
+        return {
+            "DeviceID": device_id,
+            "DeviceType": self.devices[device_id]["Device"]["DeviceType"],
+            "EffectiveFlags": 0,
+            "HasPendingCommand": device_id in self._pending,
+            "LastCommunication": "2024-01-01T00:00:00.000",
+            **self.states[device_id],
+        }
+
+    def _list_entry(self, device_id: int) -> dict[str, Any]:
+        """Return the ListDevices entry of a device.
+
+        Like MELCloud, the time stamp, the wifi signal and the energy counter
+        change at every poll whatever the state of the device.
+        """
+        entry = self.devices[device_id]
+        device = dict(entry["Device"])
+        for key, value in self.states[device_id].items():
+            device[ATA_LIST_KEYS.get(key, key)] = value
+        device["LastTimeStamp"] = (
+            datetime(2024, 1, 1) + timedelta(minutes=self._list_polls)
+        ).strftime("%Y-%m-%dT%H:%M:%S")
+        device["WifiSignalStrength"] -= self._list_polls % 7
+        if "CurrentEnergyConsumed" in device:
+            device["CurrentEnergyConsumed"] += self._list_polls
+        return {**entry, "Device": device}
+
+    async def _login(self, request: web.Request) -> web.Response:
+        """Handle Login/ClientLogin."""
+        return web.json_response(
+            {"ErrorId": None, "LoginData": {"ContextKey": self.token}}
+        )
+
+    async def _user(self, request: web.Request) -> web.Response:
+        """Handle User/GetUserDetails."""
+        return web.json_response({"UseFahrenheit": False})
+
+    async def _list_devices(self, request: web.Request) -> web.Response:
+        """Handle User/ListDevices grouping devices per building."""
+        self._list_polls += 1
+        buildings: dict[int, list[dict[str, Any]]] = {}
+        for device_id, entry in self.devices.items():
+            buildings.setdefault(entry["BuildingID"], []).append(
+                self._list_entry(device_id)
+            )
+        return web.json_response(
+            [
+                {
+                    "ID": building_id,
+                    "Structure": {"Devices": devices, "Areas": [], "Floors": []},
+                }
+                for building_id, devices in buildings.items()
+            ]
+        )
+
+    async def _units(self, request: web.Request) -> web.Response:
+        """Handle Device/ListDeviceUnits."""
+        body = await request.json()
+        device_id = body["deviceId"]
+        return web.json_response(
+            [{"ModelNumber": 1, "Model": f"MODEL-{device_id}", "SerialNumber": "1"}]
+        )
+
+    async def _get(self, request: web.Request) -> web.Response:
+        """Handle Device/Get."""
+        device_id = int(request.query["id"])
+        if device_id not in self.devices:
+            raise web.HTTPNotFound()
+        if (pending := self._pending.get(device_id)) is not None:
+            if pending[0]:
+                pending[0] -= 1
+            else:
+                self.states[device_id].update(self._pending.pop(device_id)[1])
+        return web.json_response(self._device_state(device_id))
+
+    async def _set(self, request: web.Request) -> web.Response:
+        """Handle Device/SetAta and Device/SetAtw applying the flagged fields."""
+        body = await request.json()
+        device_id = body["DeviceID"]
+        if device_id not in self.devices:
+            raise web.HTTPNotFound()
+        if self.devices[device_id]["Device"]["DeviceType"] == 1:
+            write_flags = ATW_WRITE_FLAGS
+        else:
+            write_flags = ATA_WRITE_FLAGS
+        flags = body.get("EffectiveFlags", 0)
+        writes = {
+            key: body[key]
+            for flag, key in write_flags.items()
+            if flags & flag and key in body and key not in self.read_only
+        }
+        if self.delivery_polls:
+            self._pending[device_id] = [self.delivery_polls, writes]
+        else:
+            self.states[device_id].update(writes)
+        return web.json_response(self._device_state(device_id))
+
+    async def _energy_report(self, request: web.Request) -> web.Response:
+        """Handle EnergyCost/Report for a single day of a device."""
+        body = await request.json()
+        if body["DeviceID"] not in self.devices:
+            raise web.HTTPBadRequest()
+        start = datetime.strptime(body["FromDate"], REPORT_DATE_FORMAT)
+        end = datetime.strptime(body["ToDate"], REPORT_DATE_FORMAT)
+        if start.date() != end.date():
+            # Reports of several days are labelled by day, never requested
+            raise web.HTTPBadRequest()
+        consumed = {mode: [0.0] * 24 for mode in ENERGY_MODES}
+        consumed["Heating"] = consumed["Cooling"] = [self.energy_per_hour / 2] * 24
+        report = {
+            **ENERGY_REPORT,
+            "FromDate": body["FromDate"],
+            "ToDate": body["ToDate"],
+            **consumed,
+        }
+        for mode, values in consumed.items():
+            report[f"Total{mode}Consumed"] = sum(values)
+        return web.json_response(report)
+
+    async def _temperature_log(self, request: web.Request) -> web.Response:
+        """Handle Report/GetTemperatureLog2, rows laid out like the fixture."""
+        body = await request.json()
+        device_id = body["DeviceID"]
+        values = {**self.devices[device_id]["Device"], **self.states[device_id]}
+        temperatures = {key: values[key] for key in LOG_KEYS if key in values}
+        time = datetime.strptime(body["FromDate"], REPORT_DATE_FORMAT)
+        end = datetime.strptime(body["ToDate"], REPORT_DATE_FORMAT)
+        rows = []
+        while time < end:
+            rows.append({"Time": time.strftime(REPORT_DATE_FORMAT), **temperatures})
+            time += LOG_INTERVAL
+        return web.json_response(rows)
@@ -0,0 +1,67 @@
+"""Test the MELCloud API client."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from custom_components.melcloud_custom.api import TokenManager
+
+
+async def test_token_renewed_once():
+    """Test concurrent rejections wait for a single login."""
+    token_manager = TokenManager("old-token")
+    token_manager.request_login = MagicMock()
+
+    waiters = [
+        asyncio.create_task(token_manager.async_renew("old-token")) for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    token_manager.request_login.assert_called_once()
+
+    token_manager.async_set_token("new-token")
+    assert await asyncio.gather(*waiters) == ["new-token"] * 5
+    assert await token_manager.async_renew("old-token") == "new-token"
+    token_manager.request_login.assert_called_once()
+
+
+async def test_token_renewal_no_wait():
+    """Test requests not allowed to wait fail while the login is pending."""
+    token_manager = TokenManager("old-token")
+    token_manager.request_login = MagicMock()
+
+    assert await token_manager.async_renew("old-token", wait=False) is None
+    token_manager.request_login.assert_called_once()
+    waiter = asyncio.create_task(token_manager.async_renew("old-token"))
+    assert await token_manager.async_renew("old-token", wait=False) is None
+    token_manager.request_login.assert_called_once()
+
+    token_manager.async_set_token("new-token")
+    assert await waiter == "new-token"
+    assert await token_manager.async_renew("old-token", wait=False) == "new-token"
+
+
+async def test_token_renewal_timeout():
+    """Test requests give up when the token is not renewed in time."""
+    token_manager = TokenManager("old-token", timedelta(seconds=0.01))
+    assert await token_manager.async_renew("old-token") is None
+
+    token_manager.request_login = MagicMock()
+    assert await token_manager.async_renew("old-token") is None
+    token_manager.request_login.assert_called_once()
+
+
+async def test_token_renewal_timeout_retry():
+    """Test a renewal given up is requested again by the next rejection."""
+    token_manager = TokenManager("old-token", timedelta(seconds=0.01))
+    token_manager.request_login = MagicMock()
+
+    waiters = [
+        asyncio.create_task(token_manager.async_renew("old-token")) for _ in range(3)
+    ]
+    assert await asyncio.gather(*waiters) == [None] * 3
+    token_manager.request_login.assert_called_once()
+
+    waiter = asyncio.create_task(token_manager.async_renew("old-token"))
+    await asyncio.sleep(0)
+    assert token_manager.request_login.call_count == 2
+    token_manager.async_set_token("new-token")
+    assert await waiter == "new-token"
@@ -47,3 +47,8 @@ def test_zone_unique_ids(mock_device, mock_zone_1, mock_zone_2):
         ATW_ZONE_SENSORS[0],  # room_temperature
     )
     assert sensor_2.unique_id == "1234-11:11:11:11:11:11-room_temperature-zone-2"
+
+    # The shared description is left untouched for the next devices
+    assert ATW_ZONE_SENSORS[0].key == "room_temperature"
+    sensor_3 = AtwZoneSensor(mock_device, mock_zone_2, ATW_ZONE_SENSORS[0])
+    assert sensor_3.unique_id == sensor_2.unique_id
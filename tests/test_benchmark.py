@@ -0,0 +1,160 @@
+"""Benchmark the MELCloud integration against the fake MELCloud service."""
+import asyncio
+from contextlib import contextmanager
+import statistics
+import time
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.helpers.entity import Entity
+
+from custom_components.melcloud_custom.const import (
+    CONF_DEDICATED_SESSION,
+    DOMAIN,
+    MEL_ACCOUNT,
+    SESSION_LIMIT_PER_HOST,
+)
+from custom_components.melcloud_custom.coordinator import MelCloudDeviceCoordinator
+
+BENCHMARK_SIZES = [
+    1,
+    10,
+    pytest.param(100, marks=pytest.mark.slow),
+    pytest.param(500, marks=pytest.mark.slow),
+]
+TRANSPORT_DEVICES = 20
+TRANSPORT_ROUNDS = 5
+
+
+class Measure:
+    """Wall time, event loop busy time and entity state writes of a block."""
+
+    def __init__(self) -> None:
+        """Initialize the measure."""
+        self.wall_time = 0.0
+        self.busy_time = 0.0
+        self.listener_time = 0.0
+        self.state_writes = 0
+
+
+@contextmanager
+def measure():
+    """Measure a block of code running in the event loop.
+
+    Busy time is the CPU time of the event loop thread, it includes the time
+    spent by the fake service running in the same loop. Listener time is the
+    part spent by the device entities deciding to write their state and
+    writing it.
+    """
+    result = Measure()
+    write_ha_state = Entity.async_write_ha_state
+    update_listeners = MelCloudDeviceCoordinator.async_update_listeners
+    update_listeners_for = MelCloudDeviceCoordinator.async_update_listeners_for
+
+    def _counting_write(entity):
+        result.state_writes += 1
+        write_ha_state(entity)
+
+    def _timed(update):
+        def _timed_update(*args):
+            start = time.thread_time()
+            update(*args)
+            result.listener_time += time.thread_time() - start
+
+        return _timed_update
+
+    start_wall = time.perf_counter()
+    start_busy = time.thread_time()
+    with patch.object(Entity, "async_write_ha_state", _counting_write), patch.object(
+        MelCloudDeviceCoordinator,
+        "async_update_listeners",
+        _timed(update_listeners),
+    ), patch.object(
+        MelCloudDeviceCoordinator,
+        "async_update_listeners_for",
+        _timed(update_listeners_for),
+    ):
+        yield result
+    result.busy_time = time.thread_time() - start_busy
+    result.wall_time = time.perf_counter() - start_wall
+
+
+@pytest.mark.parametrize("device_count", BENCHMARK_SIZES)
+async def test_benchmark_scaling(
+    hass, melcloud_server, setup_melcloud, benchmark_report, device_count
+):
+    """Measure setup and a polling cycle for a growing number of devices."""
+    fake = await melcloud_server(device_count)
+
+    with measure() as setup:
+        entry = await setup_melcloud(fake)
+    setup_requests = fake.total_requests
+
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    fake.change_devices(max(1, device_count // 10))
+    fake.reset_counters()
+    with measure() as cycle:
+        await mel_account.async_refresh()
+        await hass.async_block_till_done()
+    cycle_requests = fake.total_requests
+
+    benchmark_report.append(
+        {
+            "devices": device_count,
+            "setup_s": setup.wall_time,
+            "setup_busy_s": setup.busy_time,
+            "setup_requests": setup_requests,
+            "cycle_requests": cycle_requests,
+            "cycle_writes": cycle.state_writes,
+            "cycle_busy_s": cycle.busy_time,
+            "cycle_listeners_s": cycle.listener_time,
+        }
+    )
+    # User details and device list, then state and units of every device
+    assert setup_requests == 2 + 2 * device_count
+    assert cycle_requests == 1
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.parametrize("dedicated_session", [False, True])
+async def test_benchmark_transport(
+    hass, melcloud_server, setup_melcloud, benchmark_report, dedicated_session
+):
+    """Compare connection reuse and latency of the shared and dedicated sessions."""
+    fake = await melcloud_server(TRANSPORT_DEVICES, latency=0.005)
+    entry = await setup_melcloud(fake, **{CONF_DEDICATED_SESSION: dedicated_session})
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    client = mel_account.client
+    devices = [
+        mel_device.device
+        for mel_devices in mel_account.mel_devices.values()
+        for mel_device in mel_devices
+    ]
+    latencies = []
+
+    async def _timed_get(device):
+        start = time.perf_counter()
+        await client.fetch_device_state(device)
+        latencies.append(time.perf_counter() - start)
+
+    fake.reset_counters()
+    for _ in range(TRANSPORT_ROUNDS):
+        await asyncio.gather(*(_timed_get(device) for device in devices))
+        await mel_account.async_refresh()
+    requests = fake.total_requests
+
+    benchmark_report.append(
+        {
+            "session": "dedicated" if dedicated_session else "shared",
+            "requests": requests,
+            "connections": len(fake.connections),
+            "reuse_rate": 1 - len(fake.connections) / requests,
+            "p95_latency_s": statistics.quantiles(latencies, n=20)[-1],
+        }
+    )
+    if dedicated_session:
+        assert len(fake.connections) <= SESSION_LIMIT_PER_HOST
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert client._session.closed is dedicated_session
@@ -0,0 +1,149 @@
+"""Test the MELCloud circuit breaker."""
+from aiohttp import ClientConnectionError, ClientResponseError
+from pymelcloud import DEVICE_TYPE_ATA
+import pytest
+
+from homeassistant.const import STATE_UNAVAILABLE
+
+from custom_components.melcloud_custom.breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from custom_components.melcloud_custom.const import (
+    CONF_SET_DEBOUNCE,
+    DOMAIN,
+    MEL_ACCOUNT,
+    MEL_DEVICES,
+)
+
+
+def _fail(breaker, err=None, probe=False):
+    """Send a failing request through the breaker."""
+    err = err or ClientConnectionError()
+    with pytest.raises(type(err)), breaker.request(probe):
+        raise err
+
+
+def test_circuit_breaker():
+    """Test the breaker opens, probes with backoff and closes."""
+    breaker = CircuitBreaker(threshold=3)
+    for _ in range(2):
+        _fail(breaker)
+    # Client errors prove MELCloud is reachable
+    _fail(breaker, ClientResponseError(None, (), status=400))
+    assert breaker.failures == 0
+
+    changes = []
+    breaker.async_add_listener(lambda: changes.append(breaker.state))
+    for _ in range(3):
+        _fail(breaker)
+    assert changes == [STATE_OPEN]
+    assert 15 <= breaker.retry_in <= 30
+    with pytest.raises(CircuitOpenError), breaker.request(probe=True):
+        pass
+
+    # A failed probe doubles the backoff time
+    breaker.retry_at = 0
+    with pytest.raises(CircuitOpenError), breaker.request():
+        pass
+    _fail(breaker, ClientResponseError(None, (), status=503), probe=True)
+    assert changes == [STATE_OPEN, STATE_OPEN]
+    assert breaker.open_count == 2
+    assert 30 <= breaker.retry_in <= 60
+
+    breaker.retry_at = 0
+    with breaker.request(probe=True):
+        assert breaker.state == STATE_HALF_OPEN
+        with pytest.raises(CircuitOpenError), breaker.request(probe=True):
+            pass
+    assert changes == [STATE_OPEN, STATE_OPEN, STATE_CLOSED]
+    assert breaker.open_count == 0
+
+
+def test_circuit_breaker_rate_limit():
+    """Test rate limits back off and authentication errors are not successes."""
+    breaker = CircuitBreaker(threshold=3)
+    _fail(breaker)
+    _fail(breaker, ClientResponseError(None, (), status=401))
+    assert breaker.failures == 1
+    _fail(breaker, ClientResponseError(None, (), status=429))
+    assert breaker.failures == 2
+    assert not breaker.is_open
+
+    # Retry-After opens the breaker at once for the time asked
+    breaker = CircuitBreaker(threshold=3)
+    _fail(
+        breaker,
+        ClientResponseError(None, (), status=429, headers={"Retry-After": "120"}),
+    )
+    assert breaker.state == STATE_OPEN
+    assert 119 <= breaker.retry_in <= 120
+
+    # A rejected probe opens it again
+    breaker.retry_at = 0
+    _fail(breaker, ClientResponseError(None, (), status=403), probe=True)
+    assert breaker.state == STATE_OPEN
+    assert breaker.open_count == 2
+
+
+async def test_circuit_breaker_outage(hass, melcloud_server, setup_melcloud):
+    """Test an outage stops requests and switches availability at once."""
+    fake = await melcloud_server(3)
+    entry = await setup_melcloud(fake, **{CONF_SET_DEBOUNCE: 0})
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    mel_device = hass.data[DOMAIN][entry.entry_id][MEL_DEVICES][DEVICE_TYPE_ATA][0]
+    breaker = mel_account.client.breaker
+    entity_ids = ["climate.device_1000", "climate.device_1001", "climate.device_1002"]
+
+    # Devices are unavailable after a second failure, before the breaker opens
+    fake.fail_next("User/ListDevices", 3)
+    for unavailable in (False, True):
+        await mel_account.async_refresh()
+        await hass.async_block_till_done()
+        assert not breaker.is_open
+        assert (
+            hass.states.get("climate.device_1000").state == STATE_UNAVAILABLE
+        ) is unavailable
+
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    assert breaker.is_open
+    assert all(
+        hass.states.get(entity_id).state == STATE_UNAVAILABLE
+        for entity_id in entity_ids
+    )
+    assert mel_account.update_interval.total_seconds() <= 31
+
+    # No request is sent until the backoff time elapses
+    fake.reset_counters()
+    assert not await mel_device.async_set({"target_temperature": 23})
+    await mel_account.async_refresh()
+    assert fake.total_requests == 0
+
+    breaker.retry_at = 0
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    assert fake.requests["User/ListDevices"] == 1
+    assert not breaker.is_open
+    assert all(
+        hass.states.get(entity_id).state != STATE_UNAVAILABLE
+        for entity_id in entity_ids
+    )
+    assert mel_account.update_interval == mel_account.scan_interval
+
+
+async def test_circuit_breaker_retry_after(hass, melcloud_server, setup_melcloud):
+    """Test polling is suspended for the time a rate limited account is told."""
+    fake = await melcloud_server(2)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+
+    fake.fail_next("User/ListDevices", status=429, retry_after=600)
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    assert mel_account.client.breaker.is_open
+    assert 600 <= mel_account.update_interval.total_seconds() <= 601
+    assert hass.states.get("climate.device_1000").state == STATE_UNAVAILABLE
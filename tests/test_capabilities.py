@@ -0,0 +1,28 @@
+"""Test the MELCloud device capability tables."""
+from homeassistant.components.climate import HVACMode
+
+from custom_components.melcloud_custom.const import DOMAIN, MEL_ACCOUNT
+
+
+async def test_capabilities_rebuilt_on_change(hass, melcloud_server, setup_melcloud):
+    """Test capabilities are only computed again when the configuration changes."""
+    fake = await melcloud_server(1)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    mel_device = mel_account.mel_devices["ata"][0]
+
+    capabilities = mel_device.capabilities
+    assert HVACMode.COOL in capabilities.hvac_modes
+    assert capabilities.temperature_range("heat") == (10, 31)
+
+    fake.change_devices(1)
+    await mel_account.async_refresh()
+    assert mel_device.capabilities is capabilities
+
+    fake.devices[1000]["Device"]["CanCool"] = False
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    assert mel_device.capabilities is not capabilities
+    assert HVACMode.COOL not in mel_device.capabilities.hvac_modes
+    state = hass.states.get("climate.device_1000")
+    assert HVACMode.COOL not in state.attributes["hvac_modes"]
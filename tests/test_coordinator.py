@@ -0,0 +1,261 @@
+"""Test the MELCloud account coordinator."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pymelcloud import DEVICE_TYPE_ATA
+
+from homeassistant.const import CONF_SCAN_INTERVAL, STATE_UNAVAILABLE
+
+from custom_components.melcloud_custom.const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_MIN_SCAN_INTERVAL,
+    DOMAIN,
+    FAILED_POLLS_UNAVAILABLE,
+    MEL_ACCOUNT,
+)
+from custom_components.melcloud_custom.coordinator import (
+    AdaptivePolling,
+    MelCloudAccountCoordinator,
+    state_from_device_conf,
+)
+
+DEVICE_CONFS = [
+    {
+        "DeviceID": 1,
+        "Device": {"DeviceType": 0, "Power": True, "FanSpeed": 3},
+    },
+    {
+        "DeviceID": 2,
+        "Device": {"DeviceType": 0, "Power": False, "FanSpeed": 0},
+    },
+]
+
+
+def test_state_from_device_conf():
+    """Test device list values are mapped to Device/Get state keys."""
+    state = state_from_device_conf(DEVICE_CONFS[0], None)
+    assert state == {
+        "DeviceID": 1,
+        "DeviceType": 0,
+        "EffectiveFlags": 0,
+        "Power": True,
+        "SetFanSpeed": 3,
+    }
+
+    prev_state = {"DeviceID": 2, "Power": True, "RoomTemperature": 20.0}
+    state = state_from_device_conf(DEVICE_CONFS[1], prev_state)
+    assert state["Power"] is False
+    assert state["RoomTemperature"] == 20.0
+    assert prev_state["Power"] is True
+
+
+async def test_single_request_per_cycle(hass):
+    """Test a poll fetches the device list once and updates every device."""
+    client = MagicMock()
+    client.fetch_device_confs = AsyncMock(return_value=DEVICE_CONFS)
+    coordinator = MelCloudAccountCoordinator(hass, client, timedelta(minutes=15))
+
+    mel_devices = [MagicMock(device_id=1), MagicMock(device_id=2)]
+    for mel_device in mel_devices:
+        mel_device.refresh_due.return_value = False
+    coordinator.mel_devices = {DEVICE_TYPE_ATA: mel_devices}
+    unsub = coordinator.async_add_listener(coordinator.async_fan_out)
+
+    await coordinator.async_refresh()
+
+    assert client.fetch_device_confs.await_count == 1
+    mel_devices[0].async_apply_device_conf.assert_called_once_with(DEVICE_CONFS[0])
+    mel_devices[1].async_apply_device_conf.assert_called_once_with(DEVICE_CONFS[1])
+
+    # A failed poll leaves the devices to the circuit breaker
+    client.fetch_device_confs.side_effect = TimeoutError()
+    await coordinator.async_refresh()
+
+    for mel_device in mel_devices:
+        mel_device.async_apply_device_conf.assert_called_once()
+        mel_device.async_set_update_error.assert_not_called()
+    unsub()
+
+
+def test_adaptive_polling():
+    """Test intervals shrink on changes and stretch for idle devices."""
+    adaptive = AdaptivePolling(600, 60, 3600)
+
+    assert adaptive.update(1, True, True) == 60
+    assert adaptive.update(2, False, False) == 1200
+    assert adaptive.interval == timedelta(seconds=60)
+
+    for _ in range(5):
+        adaptive.update(1, True, False)
+        adaptive.update(2, False, False)
+    assert adaptive.intervals == {1: 600, 2: 3600}
+    assert adaptive.interval == timedelta(seconds=600)
+
+
+def test_adaptive_polling_ramp():
+    """Test the interval doubles at every idle poll up to its limit."""
+    adaptive = AdaptivePolling(600, 60, 3600)
+
+    adaptive.update(1, True, True)
+    assert [adaptive.update(1, True, False) for _ in range(5)] == [
+        120,
+        240,
+        480,
+        600,
+        600,
+    ]
+
+    adaptive.update(1, False, True)
+    assert [adaptive.update(1, False, False) for _ in range(7)] == [
+        120,
+        240,
+        480,
+        960,
+        1920,
+        3600,
+        3600,
+    ]
+
+
+async def test_adaptive_polling_activity(hass, melcloud_server, setup_melcloud):
+    """Test drifting temperatures keep the scan interval, operations reset it."""
+    fake = await melcloud_server(5)
+    entry = await setup_melcloud(
+        fake,
+        **{
+            CONF_ADAPTIVE_POLLING: True,
+            CONF_SCAN_INTERVAL: 600,
+            CONF_MIN_SCAN_INTERVAL: 60,
+        },
+    )
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+
+    for _ in range(3):
+        fake.change_devices(5)
+        await mel_account.async_refresh()
+        assert mel_account.update_interval >= timedelta(seconds=600)
+
+    fake.states[1003]["SetTemperature"] = 24
+    await mel_account.async_refresh()
+    assert mel_account.update_interval == timedelta(seconds=60)
+
+
+async def test_change_driven_refresh(hass, melcloud_server, setup_melcloud):
+    """Test the full device state is only fetched on hints or when too old."""
+    fake = await melcloud_server(1)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    mel_device = mel_account.mel_devices[DEVICE_TYPE_ATA][0]
+
+    fake.reset_counters()
+    fake.change_devices(1)
+    await mel_account.async_refresh()
+    await asyncio.gather(*hass._background_tasks)
+    assert fake.requests == {"User/ListDevices": 1}
+
+    fake.reset_counters()
+    fake.devices[1000]["Device"]["HasError"] = True
+    await mel_account.async_refresh()
+    await asyncio.gather(*hass._background_tasks)
+    await hass.async_block_till_done()
+    assert fake.requests == {"User/ListDevices": 1, "Device/Get": 1}
+    assert hass.states.get("binary_sensor.device_1000_error_state").state == "on"
+
+    fake.reset_counters()
+    await mel_account.async_refresh()
+    await asyncio.gather(*hass._background_tasks)
+    assert fake.requests == {"User/ListDevices": 1}
+
+    # Safety net
+    fake.reset_counters()
+    mel_device._refreshed_at -= mel_account.conf_refresh_interval.total_seconds()
+    await mel_account.async_refresh()
+    await asyncio.gather(*hass._background_tasks)
+    assert fake.requests == {"User/ListDevices": 1, "Device/Get": 1}
+
+
+async def test_refresh_phases(hass, melcloud_server, setup_melcloud):
+    """Test safety net refreshes are spread over the interval."""
+    fake = await melcloud_server(4)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    mel_devices = mel_account.mel_devices[DEVICE_TYPE_ATA]
+    assert [mel_device.refresh_phase for mel_device in mel_devices] == [
+        0,
+        0.25,
+        0.5,
+        0.75,
+    ]
+
+    for interval in (timedelta(seconds=100), timedelta(seconds=1000)):
+        seconds = interval.total_seconds()
+        for mel_device in mel_devices:
+            mel_device._refreshed_at = 10 * seconds
+        for step, expected in ((0.3, 1001), (0.6, 1002), (0.8, 1003), (1.1, 1000)):
+            with patch(
+                "custom_components.melcloud_custom.monotonic",
+                return_value=(10 + step) * seconds,
+            ):
+                due = [
+                    mel_device.device_id
+                    for mel_device in mel_devices
+                    if mel_device.refresh_due(interval)
+                ]
+            assert due == [expected]
+            for mel_device in mel_devices:
+                if mel_device.device_id == expected:
+                    mel_device._refreshed_at = (10 + step) * seconds
+
+
+async def test_unchanged_devices_skipped(hass, melcloud_server, setup_melcloud):
+    """Test only the devices changed since the previous poll are updated."""
+    fake = await melcloud_server(10)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    mel_devices = [
+        mel_device
+        for mel_devices_type in mel_account.mel_devices.values()
+        for mel_device in mel_devices_type
+    ]
+    await mel_account.async_refresh()
+
+    updated = []
+    for mel_device in mel_devices:
+        mel_device.coordinator.async_add_listener(
+            lambda device_id=mel_device.device_id: updated.append(device_id)
+        )
+    await mel_account.async_refresh()
+    assert updated == []
+
+    changed = fake.change_devices(2)
+    await mel_account.async_refresh()
+    assert sorted(set(updated)) == changed
+
+    # A failed device is updated by the next poll, even if unchanged
+    mel_devices[5].async_set_update_error(Exception("failed"))
+    updated.clear()
+    await mel_account.async_refresh()
+    assert set(updated) == {mel_devices[5].device_id}
+    assert mel_devices[5].coordinator.last_update_success
+
+
+async def test_failed_polls_unavailable(hass, melcloud_server, setup_melcloud):
+    """Test devices become unavailable after consecutive failed polls."""
+    fake = await melcloud_server(2)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+
+    # Errors not counted by the circuit breaker
+    fake.fail_next("User/ListDevices", FAILED_POLLS_UNAVAILABLE, status=400)
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get("climate.device_1000").state != STATE_UNAVAILABLE
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    assert not mel_account.client.breaker.is_open
+    assert hass.states.get("climate.device_1000").state == STATE_UNAVAILABLE
+
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get("climate.device_1000").state != STATE_UNAVAILABLE
@@ -0,0 +1,57 @@
+"""Test the MELCloud device data snapshots."""
+import dataclasses
+
+import pytest
+
+from custom_components.melcloud_custom.const import DOMAIN, MEL_ACCOUNT
+from custom_components.melcloud_custom.data import AtaDeviceData
+
+
+async def test_device_data_snapshot(hass, melcloud_server, setup_melcloud):
+    """Test the coordinator data is replaced, never mutated, on change."""
+    fake = await melcloud_server(1)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+
+    # The first poll after the devices were read at setup is applied in full
+    await mel_account.async_refresh()
+    mel_device = mel_account.mel_devices["ata"][0]
+    coordinator = mel_device.coordinator
+    updates = []
+    coordinator.async_add_listener(lambda: updates.append(coordinator.data))
+
+    data = coordinator.data
+    assert isinstance(data, AtaDeviceData)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        data.room_temperature = 0
+
+    # An equal snapshot is not published
+    assert not mel_device.async_apply_device_conf(
+        {**mel_device.device._device_conf, "LastTimeStamp": "2024-01-01T00:01:00"}
+    )
+    assert coordinator.data is data
+    assert not updates
+
+    # Meter values changing alone only update their own sensors
+    await mel_account.async_refresh()
+    assert coordinator.data.wifi_signal != data.wifi_signal
+    assert coordinator.data.total_energy_consumed > data.total_energy_consumed
+    assert (
+        dataclasses.replace(
+            coordinator.data,
+            wifi_signal=data.wifi_signal,
+            total_energy_consumed=data.total_energy_consumed,
+        )
+        == data
+    )
+    assert not updates
+    data = coordinator.data
+
+    fake.change_devices(1)
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.data is not data
+    assert coordinator.data.room_temperature == data.room_temperature + 0.5
+    assert updates == [coordinator.data]
+    state = hass.states.get("climate.device_1000")
+    assert state.attributes["current_temperature"] == coordinator.data.room_temperature
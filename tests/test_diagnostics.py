@@ -0,0 +1,105 @@
+"""Test the MELCloud performance metrics and diagnostics."""
+from datetime import timedelta
+import json
+
+from pymelcloud import DEVICE_TYPE_ATA
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util.dt import utcnow
+
+from custom_components.melcloud_custom.const import (
+    CONF_SET_DEBOUNCE,
+    DOMAIN,
+    MEL_ACCOUNT,
+    MEL_DEVICES,
+)
+from custom_components.melcloud_custom.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.melcloud_custom.metrics import LatencyHistogram
+
+
+def test_latency_histogram():
+    """Test durations are counted in fixed buckets."""
+    histogram = LatencyHistogram()
+    for seconds in (0.05, 0.3, 0.3, 60):
+        histogram.observe(seconds)
+
+    result = histogram.as_dict()
+    assert result["count"] == 4
+    assert result["last_s"] == 60
+    assert result["max_s"] == 60
+    assert result["buckets"]["le_0.1"] == 1
+    assert result["buckets"]["le_0.5"] == 2
+    assert result["buckets"]["le_inf"] == 1
+
+
+async def test_diagnostics(hass, melcloud_server, setup_melcloud):
+    """Test requests, cycles and writes are measured and exposed redacted."""
+    fake = await melcloud_server(1)
+    entry = await setup_melcloud(fake, **{CONF_SET_DEBOUNCE: 0})
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    mel_device = hass.data[DOMAIN][entry.entry_id][MEL_DEVICES][DEVICE_TYPE_ATA][0]
+
+    await mel_account.async_refresh()
+    fake.fail_next("User/ListDevices")
+    await mel_account.async_refresh()
+    assert await mel_device.async_set({"target_temperature": 23})
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["entry"]["data"]["token"] == REDACTED
+    assert diagnostics["devices"][0]["MacAddress"] == REDACTED
+    assert diagnostics["devices"][0]["DeviceID"] == 1000
+
+    metrics = diagnostics["metrics"]
+    assert metrics["requests"]["User/ListDevices"] == 3
+    assert metrics["errors"] == {"User/ListDevices": 1}
+    assert metrics["peak_in_flight"] >= 1
+    assert metrics["latency"]["Device/Set"]["count"] == 1
+    assert metrics["cycles"]["count"] == 2
+    assert metrics["write_confirm"]["count"] == 1
+
+    # Diagnostic sensors are optional
+    registry = er.async_get(hass)
+    entity_id = "sensor.melcloud_mock_title_failed_requests"
+    assert registry.async_get(entity_id).disabled
+    registry.async_update_entity(entity_id, disabled_by=None)
+    await hass.config_entries.async_reload(entry.entry_id)
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, utcnow() + timedelta(seconds=31))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "0"
+
+
+async def test_diagnostics_redacted(hass, melcloud_server, setup_melcloud):
+    """Test the location and owner of the devices are not exposed."""
+    fake = await melcloud_server(1)
+    private = {
+        "Address1": "1 Private Street",
+        "City": "Private City",
+        "Latitude": 51.4778,
+        "Longitude": -0.0014,
+        "OwnerEmail": "owner@example.com",
+        "OwnerName": "Private Owner",
+    }
+    fake.devices[1000].update(private)
+    fake.devices[1000]["Device"].update(
+        {
+            "LocalIPAddress": "192.168.1.50",
+            "MacAddress": "00:00:00:00:03:e8",
+            "SerialNumber": "1000",
+        }
+    )
+    entry = await setup_melcloud(fake)
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    device = diagnostics["devices"][0]
+    for key in private:
+        assert device[key] == REDACTED
+    for key in ("LocalIPAddress", "MacAddress", "SerialNumber"):
+        assert device["Device"][key] == REDACTED
+    dump = json.dumps(diagnostics)
+    for value in (*private.values(), "192.168.1.50", "00:00:00:00:03:e8"):
+        assert json.dumps(value) not in dump
@@ -0,0 +1,170 @@
+"""Test the MELCloud energy report ingestion."""
+import asyncio
+from datetime import timedelta
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import homeassistant.util.dt as dt_util
+
+from custom_components.melcloud_custom.const import DOMAIN, ENERGY_HISTORY, MEL_ACCOUNT
+from custom_components.melcloud_custom.energy import (
+    EnergyReports,
+    hourly_consumption,
+)
+
+PATCH_STATISTICS = (
+    "custom_components.melcloud_custom.energy.async_add_external_statistics"
+)
+PATCH_BACKFILL = (
+    "custom_components.melcloud_custom.history.TemperatureHistory.async_backfill"
+)
+ENERGY_REPORT = json.loads(
+    (Path(__file__).parent / "fixtures" / "energy_report.json").read_text()
+)
+
+
+def _last_sums(add_statistics):
+    """Return the last sum imported for every device."""
+    return {
+        call.args[1]["statistic_id"]: call.args[2][-1]["sum"]
+        for call in add_statistics.call_args_list
+    }
+
+
+def _hours(start, end):
+    """Return the number of hours from a start hour to an end hour included."""
+    return int((end - start).total_seconds()) // 3600 + 1
+
+
+async def test_hourly_consumption(hass):
+    """Test a day report is summed over the modes for every hour."""
+    hass.config.set_time_zone("UTC")
+    day = dt_util.start_of_local_day(dt_util.parse_datetime("2024-01-15T00:00:00Z"))
+
+    consumed = hourly_consumption(ENERGY_REPORT, day)
+    assert len(consumed) == 24
+    assert consumed[day] == 0.3
+    assert consumed[day + timedelta(hours=7)] == 0.9
+    assert round(sum(consumed.values()), 1) == (
+        ENERGY_REPORT["TotalHeatingConsumed"] + ENERGY_REPORT["TotalOtherConsumed"]
+    )
+
+    # Reports labelled by day, or not matching their labels, are rejected
+    report = {**ENERGY_REPORT, "Labels": list(range(1, 25))}
+    assert hourly_consumption(report, day) is None
+    assert hourly_consumption({**ENERGY_REPORT, "Labels": [0, 1]}, day) is None
+    assert hourly_consumption({"Labels": list(range(24))}, day) is None
+    assert hourly_consumption({}, day) is None
+
+
+async def test_energy_reports_setup(hass, melcloud_server, setup_melcloud):
+    """Test the history is imported at setup, a device and a day at a time."""
+    hass.config.set_time_zone("UTC")
+    hass.config.components.add("recorder")
+    fake = await melcloud_server(4, num_buildings=2)
+    fake.devices[1003]["Device"]["HasEnergyConsumedMeter"] = False
+    with patch(PATCH_STATISTICS) as add_statistics, patch(PATCH_BACKFILL) as backfill:
+        entry = await setup_melcloud(fake)
+        await asyncio.gather(*entry._background_tasks)
+
+    days = ENERGY_HISTORY.days + 1
+    assert fake.requests["EnergyCost/Report"] == 3 * days
+    assert len(_last_sums(add_statistics)) == 3
+    backfill.assert_called_once()
+
+
+async def test_energy_reports_cursor(
+    hass, hass_storage, melcloud_server, setup_melcloud, caplog
+):
+    """Test reports are requested from the persisted cursors."""
+    hass.config.set_time_zone("UTC")
+    fake = await melcloud_server(3, num_buildings=2)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    history = _hours(dt_util.start_of_local_day() - ENERGY_HISTORY, hour)
+
+    energy_reports = EnergyReports(hass, entry.entry_id, mel_account)
+    await energy_reports.async_load()
+    fake.reset_counters()
+    with patch(PATCH_STATISTICS) as add_statistics:
+        await energy_reports.async_update()
+    assert fake.requests["EnergyCost/Report"] == 3 * (ENERGY_HISTORY.days + 1)
+    assert _last_sums(add_statistics)["melcloud_custom:energy_1001"] == history * 0.5
+    assert energy_reports.cursors == {"1000": hour, "1001": hour, "1002": hour}
+    assert energy_reports.sums["1001"] == (history - 1) * 0.5
+    statistics = add_statistics.call_args_list[0].args[2]
+    assert [statistic["start"] for statistic in statistics[:2]] == [
+        dt_util.start_of_local_day() - ENERGY_HISTORY,
+        dt_util.start_of_local_day() - ENERGY_HISTORY + timedelta(hours=1),
+    ]
+
+    # Only the current day is requested again
+    fake.reset_counters()
+    with patch(PATCH_STATISTICS) as add_statistics:
+        await energy_reports.async_update()
+    assert fake.requests["EnergyCost/Report"] == 3
+    assert _last_sums(add_statistics)["melcloud_custom:energy_1001"] == history * 0.5
+
+    # A downtime is caught up from the cursor, a day at a time
+    cursor = hour - timedelta(hours=50)
+    hass_storage[f"{DOMAIN}.{entry.entry_id}.energy"] = {
+        "version": 1,
+        "data": {
+            "cursors": {
+                device_id: cursor.isoformat() for device_id in ("1000", "1001", "1002")
+            },
+            "sums": {"1000": 10.0},
+        },
+    }
+    energy_reports = EnergyReports(hass, entry.entry_id, mel_account)
+    await energy_reports.async_load()
+    fake.reset_counters()
+    with patch(PATCH_STATISTICS) as add_statistics:
+        await energy_reports.async_update()
+    days = (dt_util.start_of_local_day() - dt_util.start_of_local_day(cursor)).days
+    assert fake.requests["EnergyCost/Report"] == 3 * (days + 1)
+    last_sums = _last_sums(add_statistics)
+    assert last_sums["melcloud_custom:energy_1000"] == 10.0 + 51 * 0.5
+    assert last_sums["melcloud_custom:energy_1001"] == 51 * 0.5
+
+    # Reports not labelled by hour are not imported, the device is caught up
+    # from its own cursor by the next run
+    fetch_energy_report = mel_account.client.fetch_energy_report
+
+    async def _fetch_energy_report(device_id, *args):
+        if device_id == 1000:
+            return {}
+        return await fetch_energy_report(device_id, *args)
+
+    energy_reports.cursors["1000"] = cursor
+    with patch.object(
+        mel_account.client, "fetch_energy_report", side_effect=_fetch_energy_report
+    ), patch(PATCH_STATISTICS) as add_statistics:
+        await energy_reports.async_update()
+    assert set(_last_sums(add_statistics)) == {
+        "melcloud_custom:energy_1001",
+        "melcloud_custom:energy_1002",
+    }
+    assert energy_reports.cursors["1000"] == cursor
+    assert "Energy report of Device 1000 not recognised" in caplog.text
+
+
+async def test_energy_reports_legacy_cursor(
+    hass, hass_storage, melcloud_server, setup_melcloud
+):
+    """Test the single cursor saved by older versions applies to every device."""
+    fake = await melcloud_server(2)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    cursor = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    hass_storage[f"{DOMAIN}.{entry.entry_id}.energy"] = {
+        "version": 1,
+        "data": {"cursor": cursor.isoformat(), "sums": {"1000": 10.0, "1001": 5.0}},
+    }
+
+    energy_reports = EnergyReports(hass, entry.entry_id, mel_account)
+    await energy_reports.async_load()
+    assert energy_reports.cursors == {"1000": cursor, "1001": cursor}
+    assert energy_reports.sums == {"1000": 10.0, "1001": 5.0}
@@ -0,0 +1,77 @@
+"""Test the MELCloud base entity."""
+from unittest.mock import PropertyMock, patch
+
+from pymelcloud import DEVICE_TYPE_ATA
+
+from homeassistant.components.climate import ClimateEntity
+from homeassistant.const import Platform
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.melcloud_custom.const import DOMAIN, MEL_ACCOUNT
+
+
+async def test_unchanged_state_not_written(hass, melcloud_server, setup_melcloud):
+    """Test only entities whose values changed write their state."""
+    fake = await melcloud_server(3)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    # The first poll after the devices were read at setup is applied in full
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    state_writes = mel_account.entity_state_writes
+
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    assert mel_account.entity_state_writes == state_writes
+
+    # Unchanged entities are not rendered to find out they are unchanged
+    coordinator = mel_account.mel_devices[DEVICE_TYPE_ATA][0].coordinator
+    suppressed = coordinator.state_writes["suppressed"]
+    with patch.object(
+        ClimateEntity, "state_attributes", new_callable=PropertyMock
+    ) as state_attributes:
+        coordinator.async_update_listeners()
+    state_attributes.assert_not_called()
+    # The climate and the error state binary sensor
+    assert coordinator.state_writes["suppressed"] == suppressed + 2
+    state_writes = mel_account.entity_state_writes
+
+    fake.change_devices(1)
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    # Only the climate of the changed device, its sensors are disabled by default
+    state_writes = mel_account.entity_state_writes - state_writes
+    assert state_writes["written"] == 1
+    assert state_writes["suppressed"] > 0
+    assert (
+        hass.states.get("climate.device_1000").attributes["current_temperature"] == 20.5
+    )
+
+
+async def test_meter_values_written(hass, melcloud_server, setup_melcloud):
+    """Test meter values changing alone only write their own sensors."""
+    fake = await melcloud_server(1)
+    entity_registry = er.async_get(hass)
+    for key in ("energy", "wifi_signal"):
+        entity_registry.async_get_or_create(
+            Platform.SENSOR,
+            DOMAIN,
+            f"1000-00:00:00:00:03:e8-{key}",
+            suggested_object_id=f"device_1000_{key}",
+        )
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    energy = hass.states.get("sensor.device_1000_energy")
+    climate = hass.states.get("climate.device_1000")
+
+    state_writes = mel_account.entity_state_writes
+    await mel_account.async_refresh()
+    await hass.async_block_till_done()
+    state_writes = mel_account.entity_state_writes - state_writes
+    assert state_writes == {"written": 2}
+    assert float(hass.states.get("sensor.device_1000_energy").state) > float(
+        energy.state
+    )
+    assert hass.states.get("climate.device_1000").last_updated == climate.last_updated
@@ -0,0 +1,117 @@
+"""Test the MELCloud temperature history backfill."""
+from datetime import timedelta
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import homeassistant.util.dt as dt_util
+
+from custom_components.melcloud_custom.const import DOMAIN, MEL_ACCOUNT
+from custom_components.melcloud_custom.history import (
+    TemperatureHistory,
+    log_temperatures,
+)
+
+PATCH_HISTORY = "custom_components.melcloud_custom.history"
+TEMPERATURE_LOG = json.loads(
+    (Path(__file__).parent / "fixtures" / "temperature_log.json").read_text()
+)
+
+
+async def _async_run(target, *args):
+    """Run an executor job of the recorder."""
+    return target(*args)
+
+
+def _metadata(statistic_id):
+    """Return the statistics metadata of a temperature sensor."""
+    return {
+        "has_mean": True,
+        "has_sum": False,
+        "name": None,
+        "source": "recorder",
+        "statistic_id": statistic_id,
+        "unit_of_measurement": "°C",
+    }
+
+
+async def test_log_temperatures(hass):
+    """Test the rows of a temperature log are read in local time."""
+    hass.config.set_time_zone("UTC")
+    fields = {"RoomTemperature", "OutdoorTemperature"}
+
+    rows, skipped = log_temperatures(TEMPERATURE_LOG, fields)
+    assert skipped == 0
+    assert len(rows) == 12
+    assert rows[0] == (
+        dt_util.parse_datetime("2024-01-15T00:00:00Z"),
+        {"RoomTemperature": 20.0, "OutdoorTemperature": 4.5},
+    )
+    assert rows[3][1] == {"RoomTemperature": 20.6}
+    assert rows[8][1] == {"OutdoorTemperature": 5.3}
+
+    # Rows not recognised are counted, not returned
+    log = [
+        *TEMPERATURE_LOG,
+        {"Time": "yesterday", "RoomTemperature": 20.0},
+        {"Time": "2024-01-15T02:00:00", "RoomTemperature": "20,5"},
+        {"RoomTemperature": 20.0},
+        [0, 20.0],
+    ]
+    rows, skipped = log_temperatures(log, fields)
+    assert len(rows) == 12
+    assert skipped == 4
+    assert log_temperatures({"Data": []}, fields) is None
+
+
+async def test_temperature_history(hass, melcloud_server, setup_melcloud, caplog):
+    """Test a gap is filled a day at a time with hourly statistics."""
+    fake = await melcloud_server(1)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    end -= timedelta(hours=1)
+    last_hour = end - timedelta(hours=50)
+
+    fake.reset_counters()
+    with patch(f"{PATCH_HISTORY}.get_instance") as get_instance, patch(
+        f"{PATCH_HISTORY}._last_statistics",
+        side_effect=lambda hass, statistic_id: (_metadata(statistic_id), last_hour),
+    ), patch(f"{PATCH_HISTORY}.async_import_statistics") as import_statistics:
+        get_instance.return_value.async_add_executor_job = _async_run
+        await TemperatureHistory(hass, mel_account).async_backfill()
+
+    assert fake.requests["Report/GetTemperatureLog2"] == 3
+    statistics = [
+        statistic
+        for call in import_statistics.call_args_list
+        for statistic in call.args[2]
+    ]
+    assert {
+        call.args[1]["statistic_id"] for call in import_statistics.call_args_list
+    } == {"sensor.device_1000_room_temperature"}
+    assert len(statistics) == 49
+    assert statistics[0]["start"] == last_hour + timedelta(hours=1)
+    assert statistics[-1]["start"] == end - timedelta(hours=1)
+    assert all(statistic["mean"] == 20.0 for statistic in statistics)
+
+    # Sensors without statistics are not filled
+    fake.reset_counters()
+    with patch(f"{PATCH_HISTORY}.get_instance") as get_instance, patch(
+        f"{PATCH_HISTORY}._last_statistics", return_value=None
+    ):
+        get_instance.return_value.async_add_executor_job = _async_run
+        await TemperatureHistory(hass, mel_account).async_backfill()
+    assert fake.requests["Report/GetTemperatureLog2"] == 0
+
+    # A log not recognised is not imported
+    with patch(f"{PATCH_HISTORY}.get_instance") as get_instance, patch(
+        f"{PATCH_HISTORY}._last_statistics",
+        side_effect=lambda hass, statistic_id: (_metadata(statistic_id), last_hour),
+    ), patch(f"{PATCH_HISTORY}.log_temperatures", return_value=None), patch(
+        f"{PATCH_HISTORY}.async_import_statistics"
+    ) as import_statistics:
+        get_instance.return_value.async_add_executor_job = _async_run
+        await TemperatureHistory(hass, mel_account).async_backfill()
+    import_statistics.assert_not_called()
+    assert "Temperature log of Device 1000 not recognised" in caplog.text
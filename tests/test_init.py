@@ -0,0 +1,343 @@
+"""Test the MELCloud integration setup."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from pymelcloud import DEVICE_TYPE_ATA
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_TOKEN, STATE_UNAVAILABLE, Platform
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util.dt import utcnow
+
+from custom_components.melcloud_custom import (
+    SCAN_INTERVAL,
+    _async_bootstrap_devices,
+    mel_devices_setup,
+)
+from custom_components.melcloud_custom.const import (
+    CONF_SET_DEBOUNCE,
+    DOMAIN,
+    MEL_ACCOUNT,
+    MEL_DEVICES,
+    MEL_PLATFORMS,
+)
+from custom_components.melcloud_custom.scheduler import RequestScheduler
+
+
+def _mock_mel_device(name, delay, running, concurrency):
+    """Return a device wrapper whose first refresh takes some time.
+
+    The number of refreshes running at every start is added to concurrency.
+    """
+
+    async def _refresh():
+        running.append(name)
+        concurrency.append(len(running))
+        await asyncio.sleep(delay)
+        running.remove(name)
+
+    mel_device = MagicMock()
+    mel_device.name = name
+    mel_device.coordinator.async_refresh = MagicMock(side_effect=_refresh)
+    return mel_device
+
+
+async def test_bootstrap_concurrency_and_deadline(hass):
+    """Test bootstrap is bounded and slow devices complete in background."""
+    running = []
+    concurrency = []
+    fast_devices = [
+        _mock_mel_device(f"fast{i}", 0, running, concurrency) for i in range(4)
+    ]
+    slow_device = _mock_mel_device("slow", 0.2, running, concurrency)
+
+    await _async_bootstrap_devices(hass, [*fast_devices, slow_device], 2, 0.05)
+
+    assert "slow" in running
+    assert len(concurrency) == 5
+    assert max(concurrency) == 2
+    for mel_device in fast_devices:
+        mel_device.coordinator.async_refresh.assert_called_once()
+
+    await asyncio.sleep(0.3)
+    assert not running
+
+
+async def test_write_coalescing(hass, melcloud_server, setup_melcloud):
+    """Test concurrent writes are merged and unchanged values dropped."""
+    fake = await melcloud_server(1)
+    entry = await setup_melcloud(fake, **{CONF_SET_DEBOUNCE: 0})
+    mel_device = hass.data[DOMAIN][entry.entry_id][MEL_DEVICES][DEVICE_TYPE_ATA][0]
+
+    fake.reset_counters()
+    results = await asyncio.gather(
+        mel_device.async_set({"operation_mode": "cool"}),
+        mel_device.async_set({"target_temperature": 23}),
+        mel_device.async_set({"fan_speed": "3", "power": True}),
+    )
+    assert results == [True, True, True]
+    assert fake.requests == {"Device/SetAta": 1, "Device/Get": 1}
+    assert fake.states[1000]["OperationMode"] == 3
+    assert fake.states[1000]["SetTemperature"] == 23
+    assert fake.states[1000]["SetFanSpeed"] == 3
+
+    fake.reset_counters()
+    assert await mel_device.async_set({"power": True, "target_temperature": 23})
+    assert fake.total_requests == 0
+
+    fake.fail_next("Device/SetAta")
+    assert not await mel_device.async_set({"target_temperature": 20})
+
+
+async def test_optimistic_write(hass, melcloud_server, setup_melcloud):
+    """Test writes update the affected entities at once and roll back."""
+    fake = await melcloud_server(1)
+    entry = await setup_melcloud(fake, **{CONF_SET_DEBOUNCE: 0})
+    mel_device = hass.data[DOMAIN][entry.entry_id][MEL_DEVICES][DEVICE_TYPE_ATA][0]
+    coordinator = mel_device.coordinator
+
+    climate_updates = []
+    sensor_updates = []
+    coordinator.async_add_listener(
+        lambda: climate_updates.append(mel_device.device.target_temperature),
+        frozenset({"target_temperature"}),
+    )
+    coordinator.async_add_listener(lambda: sensor_updates.append(None))
+
+    task = asyncio.create_task(mel_device.async_set({"target_temperature": 24}))
+    await asyncio.sleep(0)
+    assert climate_updates == [24]
+    assert await task
+    assert climate_updates == [24, 24]
+    assert not sensor_updates
+
+    fake.read_only.add("SetTemperature")
+    task = asyncio.create_task(mel_device.async_set({"target_temperature": 18}))
+    await asyncio.sleep(0)
+    assert mel_device.device.target_temperature == 18
+    assert not await task
+    assert mel_device.device.target_temperature == 24
+
+    fake.fail_next("Device/SetAta")
+    assert not await mel_device.async_set({"target_temperature": 20})
+    assert mel_device.device.target_temperature == 24
+    assert not sensor_updates
+
+
+async def test_unload_pending_write(hass, melcloud_server, setup_melcloud):
+    """Test writes still debounced are dropped and reported failed on unload."""
+    fake = await melcloud_server(1)
+    entry = await setup_melcloud(fake, **{CONF_SET_DEBOUNCE: 5})
+    mel_device = hass.data[DOMAIN][entry.entry_id][MEL_DEVICES][DEVICE_TYPE_ATA][0]
+
+    fake.reset_counters()
+    task = asyncio.create_task(mel_device.async_set({"target_temperature": 24}))
+    await asyncio.sleep(0)
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert not await task
+    await asyncio.sleep(0)
+    assert not mel_device._write_tasks
+    assert fake.total_requests == 0
+
+
+async def test_setup_from_snapshot(hass, hass_storage, melcloud_server, setup_melcloud):
+    """Test devices are set up from the snapshot and reconciled later."""
+    fake = await melcloud_server(2)
+    entry = await setup_melcloud(fake)
+    async_fire_time_changed(hass, utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+    snapshot = hass_storage[f"{DOMAIN}.{entry.entry_id}.snapshot"]["data"]
+
+    fake.change_devices(1)
+    fake.reset_counters()
+    mel_account = await mel_devices_setup(
+        hass, fake.token, RequestScheduler(1e6, 10), SCAN_INTERVAL, snapshot=snapshot
+    )
+    assert fake.total_requests == 0
+    mel_device = mel_account.mel_devices[DEVICE_TYPE_ATA][0]
+    assert mel_device.device.room_temperature == 20.0
+    assert mel_device.device.units
+
+    unsub = mel_account.async_add_listener(mel_account.async_fan_out)
+    await mel_account.async_refresh()
+    assert fake.requests == {"User/ListDevices": 1}
+    assert mel_device.device.room_temperature == 20.5
+    unsub()
+
+
+async def test_snapshot_max_age(hass, hass_storage, melcloud_server, setup_melcloud):
+    """Test old snapshots are ignored and a failed reconcile drops the state."""
+    fake = await melcloud_server(1)
+    entry = await setup_melcloud(fake)
+    async_fire_time_changed(hass, utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+    snapshot = hass_storage[f"{DOMAIN}.{entry.entry_id}.snapshot"]["data"]
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+    snapshot["saved_at"] = (utcnow() - timedelta(days=2)).isoformat()
+    fake.reset_counters()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert fake.requests["Device/Get"] == 1
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+    snapshot["saved_at"] = utcnow().isoformat()
+    fake.reset_counters()
+    fake.fail_next("User/ListDevices")
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await asyncio.gather(*entry._background_tasks)
+    await hass.async_block_till_done()
+    assert fake.requests == {"User/ListDevices": 1}
+    assert hass.states.get("climate.device_1000").state == STATE_UNAVAILABLE
+
+
+async def test_token_renewal(hass, melcloud_server, setup_melcloud):
+    """Test rejected requests wait for a single reauth and are sent again."""
+    fake = await melcloud_server(3)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    mel_devices = mel_account.mel_devices[DEVICE_TYPE_ATA]
+
+    fake.token = "renewed-token"
+    fake.reset_counters()
+    refresh = asyncio.gather(
+        mel_account.async_refresh(),
+        *(mel_device.coordinator.async_refresh() for mel_device in mel_devices),
+    )
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+    flows = hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    assert len(flows) == 1
+    assert flows[0]["context"]["source"] == "reauth"
+    result = await hass.config_entries.flow.async_configure(
+        flows[0]["flow_id"], {"password": "test-password", "language": "EN"}
+    )
+    assert result["reason"] == "reauth_successful"
+    assert entry.data[CONF_TOKEN] == "renewed-token"
+
+    await refresh
+    assert mel_account.last_update_success
+    assert all(dev.coordinator.last_update_success for dev in mel_devices)
+    assert fake.requests["Login/ClientLogin"] == 1
+    assert fake.requests["User/ListDevices"] == 2
+    assert fake.requests["Device/Get"] == 6
+
+
+async def test_fast_follow(hass, melcloud_server, setup_melcloud):
+    """Test a write not delivered yet is followed until MELCloud delivers it."""
+    fake = await melcloud_server(2)
+    entry = await setup_melcloud(fake, **{CONF_SET_DEBOUNCE: 0})
+    mel_device = hass.data[DOMAIN][entry.entry_id][MEL_DEVICES][DEVICE_TYPE_ATA][0]
+    fake.delivery_polls = 2
+    fake.reset_counters()
+
+    assert await mel_device.async_set({"target_temperature": 24})
+    assert fake.requests["Device/Get"] == 1
+    assert mel_device.device.target_temperature == 24
+
+    # Still pending at the first follow poll, delivered at the second one
+    now = utcnow()
+    for seconds, gets in ((6, 2), (21, 3), (70, 3), (200, 3)):
+        async_fire_time_changed(hass, now + timedelta(seconds=seconds))
+        await hass.async_block_till_done()
+        assert fake.requests["Device/Get"] == gets
+        assert mel_device.device.target_temperature == 24
+    assert fake.states[1000]["SetTemperature"] == 24
+    assert fake.requests["User/ListDevices"] == 0
+
+
+async def test_device_type_platforms(hass, melcloud_server, setup_melcloud):
+    """Test only the platforms of the device types found are set up."""
+    fake = await melcloud_server(2)
+    entry = await setup_melcloud(fake)
+    assert hass.data[DOMAIN][entry.entry_id][MEL_PLATFORMS] == {
+        Platform.BINARY_SENSOR,
+        Platform.CLIMATE,
+        Platform.SENSOR,
+    }
+    assert not hass.states.async_entity_ids("water_heater")
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+    fake = await melcloud_server(10)
+    entry = await setup_melcloud(fake)
+    assert Platform.WATER_HEATER in hass.data[DOMAIN][entry.entry_id][MEL_PLATFORMS]
+    assert hass.states.async_entity_ids("water_heater")
+
+
+async def test_device_discovery(hass, melcloud_server, setup_melcloud):
+    """Test devices added or removed in MELCloud are followed without reload."""
+    fake = await melcloud_server(9)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    device_registry = dr.async_get(hass)
+    assert Platform.WATER_HEATER not in hass.data[DOMAIN][entry.entry_id][MEL_PLATFORMS]
+
+    fake.remove_device(1001)
+    atw_id = fake.add_device()
+    fake.reset_counters()
+    await mel_account.async_refresh()
+    await asyncio.gather(*entry._background_tasks)
+    await hass.async_block_till_done()
+
+    # The new device alone is fetched, no setup request is sent again
+    assert fake.requests == {
+        "User/ListDevices": 1,
+        "Device/Get": 1,
+        "Device/ListDeviceUnits": 1,
+    }
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("climate.device_1001") is None
+    assert hass.states.get("climate.device_1000") is not None
+    assert hass.states.get(f"water_heater.device_{atw_id}") is not None
+    assert hass.states.get(f"climate.device_{atw_id}_zone_1") is not None
+    assert not device_registry.async_get_device(
+        identifiers={(DOMAIN, "00:00:00:00:03:e9-1001")}
+    )
+    assert [
+        mel_device.device_id
+        for mel_devices in mel_account.mel_devices.values()
+        for mel_device in mel_devices
+    ] == [1000, *range(1002, 1009), atw_id]
+
+
+async def test_device_discovery_unsupported(hass, melcloud_server, setup_melcloud):
+    """Test devices of unsupported types do not count as added at every poll."""
+    fake = await melcloud_server(3)
+    fake.devices[1002]["Device"]["DeviceType"] = 3
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    assert hass.states.get("climate.device_1002") is None
+
+    with patch.object(mel_account, "async_spread_refresh_phases") as spread:
+        await mel_account.async_refresh()
+    spread.assert_not_called()
+
+
+async def test_device_removed_refresh_pending(
+    hass, melcloud_server, setup_melcloud, caplog
+):
+    """Test a removed device is not refreshed after its removal."""
+    fake = await melcloud_server(3)
+    entry = await setup_melcloud(fake)
+    mel_account = hass.data[DOMAIN][entry.entry_id][MEL_ACCOUNT]
+    mel_device = mel_account.mel_devices[DEVICE_TYPE_ATA][1]
+
+    fake.remove_device(1001)
+    device_confs = await mel_account.client.fetch_device_confs()
+    refresh = hass.async_create_background_task(
+        mel_device.coordinator.async_refresh(), "refresh"
+    )
+    mel_device.async_track_refresh(refresh)
+    mel_account.async_set_updated_data(mel_account.index_device_confs(device_confs))
+    await hass.async_block_till_done()
+    assert refresh.cancelled()
+    assert mel_device not in mel_account.mel_devices[DEVICE_TYPE_ATA]
+
+    # Refreshes requested later are ignored
+    fake.reset_counters()
+    await mel_device.coordinator.async_refresh()
+    assert fake.total_requests == 0
+    assert "Unexpected error" not in caplog.text
@@ -0,0 +1,36 @@
+"""Test the MELCloud request scheduler."""
+import asyncio
+
+from custom_components.melcloud_custom.scheduler import (
+    RequestPriority,
+    RequestScheduler,
+)
+
+
+async def test_budget_and_write_priority():
+    """Test requests are throttled and writes overtake queued polls."""
+    scheduler = RequestScheduler(rate=100, burst=2)
+    served = []
+
+    async def _request(name, priority):
+        async with scheduler.request(priority):
+            served.append(name)
+
+    await _request("poll1", RequestPriority.POLL)
+    await _request("poll2", RequestPriority.POLL)
+    assert scheduler.tokens < 1
+
+    tasks = [
+        asyncio.create_task(_request("poll3", RequestPriority.POLL)),
+        asyncio.create_task(_request("poll4", RequestPriority.POLL)),
+    ]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(_request("write", RequestPriority.WRITE)))
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth == 3
+
+    await asyncio.gather(*tasks)
+    assert served == ["poll1", "poll2", "write", "poll3", "poll4"]
+    assert scheduler.requests == {"poll": 4, "write": 1}
+    assert scheduler.queued == {"poll": 2, "write": 1}
+    scheduler.shutdown()
@@ -0,0 +1,125 @@
+"""Test the MELCloud services."""
+from datetime import timedelta
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+import pytest
+
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util.dt import utcnow
+
+from custom_components.melcloud_custom.const import DOMAIN
+from custom_components.melcloud_custom.services import SERVICE_SET_GROUP
+
+
+async def test_set_group_building(hass, melcloud_server, setup_melcloud):
+    """Test a building is written with one request per device and one refresh."""
+    fake = await melcloud_server(10, num_buildings=2)
+    await setup_melcloud(fake)
+    fake.delivery_polls = 1
+    fake.reset_counters()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_GROUP,
+        {"building_id": 2, "power": True, "temperature": 19},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert sorted(response["results"]) == ["1001", "1003", "1005", "1007", "1009"]
+    assert all(result["success"] for result in response["results"].values())
+    assert response["wall_time_s"] >= 0
+    assert fake.requests["Device/SetAta"] == 4
+    assert fake.requests["Device/SetAtw"] == 1
+    assert fake.requests["Device/Get"] == 0
+    assert fake.requests["User/ListDevices"] == 1
+    assert fake.states[1000]["SetTemperature"] == 21
+
+    # Values still pending in MELCloud stay shown until delivered
+    assert fake.states[1001]["SetTemperature"] != 19
+    assert hass.states.get("climate.device_1001").attributes["temperature"] == 19
+    now = utcnow()
+    async_fire_time_changed(hass, now + timedelta(seconds=6))
+    await hass.async_block_till_done()
+    assert fake.requests["Device/Get"] == 5
+    assert hass.states.get("climate.device_1001").attributes["temperature"] == 19
+    async_fire_time_changed(hass, now + timedelta(seconds=21))
+    await hass.async_block_till_done()
+    assert fake.requests["Device/Get"] == 10
+    assert fake.states[1001]["SetTemperature"] == 19
+    assert fake.states[1009]["SetTemperatureZone1"] == 19
+    assert hass.states.get("climate.device_1001").attributes["temperature"] == 19
+
+    # Values the device list already reports are not followed
+    fake.delivery_polls = 0
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_GROUP,
+        {"building_id": 2, "power": False},
+        blocking=True,
+    )
+    fake.reset_counters()
+    async_fire_time_changed(hass, now + timedelta(seconds=120))
+    await hass.async_block_till_done()
+    assert fake.requests["Device/Get"] == 0
+    assert fake.states[1001]["Power"] is False
+
+
+async def test_set_group_devices(hass, melcloud_server, setup_melcloud):
+    """Test devices and zones are selected from the registry and checked."""
+    fake = await melcloud_server(10)
+    fake.devices[1009]["Device"]["HasThermostatZone2"] = True
+    await setup_melcloud(fake)
+    device_registry = dr.async_get(hass)
+    device_ids = [
+        device_registry.async_get_device(
+            identifiers={(DOMAIN, f"00:00:00:00:03:{device_id % 256:02x}-{device_id}")}
+        ).id
+        for device_id in (1000, 1009)
+    ]
+    fake.reset_counters()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_GROUP,
+        {"device_id": device_ids, "hvac_mode": "cool", "fan_mode": "3"},
+        blocking=True,
+        return_response=True,
+    )
+
+    results = response["results"]
+    assert results["1000"]["success"]
+    assert not results["1009"]["success"]
+    assert "not supported" in results["1009"]["error"]
+    assert fake.requests["Device/SetAta"] == 1
+    assert fake.states[1000]["OperationMode"] == 3
+    assert fake.states[1000]["SetFanSpeed"] == 3
+
+    # Zone devices write their own zone, out of range temperatures nothing
+    zone_device_id = device_registry.async_get_device(
+        identifiers={(DOMAIN, "00:00:00:00:03:f1-1009-2")}
+    ).id
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_GROUP,
+        {"device_id": [device_ids[0], zone_device_id], "temperature": 35},
+        blocking=True,
+        return_response=True,
+    )
+    results = response["results"]
+    assert not results["1000"]["success"]
+    assert "out of range" in results["1000"]["error"]
+    assert results["1009"]["success"]
+    assert fake.states[1000]["SetTemperature"] != 35
+    assert fake.states[1009]["SetTemperatureZone2"] == 35
+    assert fake.states[1009]["SetTemperatureZone1"] != 35
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SET_GROUP,
+            {"building_id": 5, "power": False},
+            blocking=True,
+            return_response=True,
+        )